@@ -0,0 +1,38 @@
+"""profile taste vectors
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17
+
+Adds:
+  - profile_embeddings table (running weighted sum of interacted-title
+    embeddings per profile, used as the For You / featured centroid)
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+from sqlalchemy.dialects.postgresql import UUID
+
+from alembic import op
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows are backfilled lazily on first read by recommendation_service.
+    op.create_table(
+        "profile_embeddings",
+        sa.Column("profile_id", UUID(as_uuid=True), sa.ForeignKey("profiles.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("vector_sum", Vector(384), nullable=False),
+        sa.Column("weight_total", sa.Float(), nullable=False, server_default=sa.text("0")),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("NOW()")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("profile_embeddings")
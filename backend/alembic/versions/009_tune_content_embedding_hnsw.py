@@ -0,0 +1,43 @@
+"""tunable HNSW index on content_embeddings
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17
+
+Rebuilds idx_content_embedding_hnsw with the build parameters from Settings
+(VECTOR_HNSW_M / VECTOR_HNSW_EF_CONSTRUCTION). The replacement index is built
+CONCURRENTLY under a temporary name and swapped in, so similarity queries keep
+an index throughout. Re-run via downgrade/upgrade after changing the settings.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.config import settings
+
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _rebuild_hnsw(m: int, ef_construction: int) -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_content_embedding_hnsw_new")
+        op.execute(
+            "CREATE INDEX CONCURRENTLY idx_content_embedding_hnsw_new ON content_embeddings "
+            "USING hnsw (embedding vector_cosine_ops) "
+            f"WITH (m = {int(m)}, ef_construction = {int(ef_construction)})"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_content_embedding_hnsw")
+        op.execute("ALTER INDEX idx_content_embedding_hnsw_new RENAME TO idx_content_embedding_hnsw")
+
+
+def upgrade() -> None:
+    _rebuild_hnsw(settings.vector_hnsw_m, settings.vector_hnsw_ef_construction)
+
+
+def downgrade() -> None:
+    # Original parameters from 001_initial_schema
+    _rebuild_hnsw(16, 64)
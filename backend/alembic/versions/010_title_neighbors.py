@@ -0,0 +1,39 @@
+"""precomputed similar-title neighbours
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17
+
+Adds:
+  - title_neighbors table (top-K cosine neighbours per title, rebuilt by
+    embedding_service.rebuild_title_neighbors after embedding generation)
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+from alembic import op
+
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "title_neighbors",
+        sa.Column("title_id", UUID(as_uuid=True), sa.ForeignKey("titles.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("rank", sa.SmallInteger(), primary_key=True),
+        sa.Column("neighbor_id", UUID(as_uuid=True), sa.ForeignKey("titles.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("similarity", sa.Float(), nullable=False),
+    )
+    # Lets ON DELETE CASCADE from titles find rows by neighbour quickly.
+    op.create_index("ix_title_neighbors_neighbor", "title_neighbors", ["neighbor_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_title_neighbors_neighbor", table_name="title_neighbors")
+    op.drop_table("title_neighbors")
@@ -0,0 +1,55 @@
+"""embedding generation jobs
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17
+
+Adds:
+  - embedding_jobs table (progress of batched embedding generation runs;
+    interrupted jobs are resumed on startup)
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+from alembic import op
+
+revision: str = "011"
+down_revision: Union[str, None] = "010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "embedding_jobs",
+        sa.Column(
+            "id",
+            UUID(as_uuid=True),
+            primary_key=True,
+            server_default=sa.text("gen_random_uuid()"),
+        ),
+        sa.Column("status", sa.String(10), nullable=False, server_default="pending"),
+        sa.Column("regenerate", sa.Boolean(), nullable=False, server_default=sa.text("false")),
+        sa.Column("total_titles", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("processed", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column(
+            "submitted_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("NOW()"),
+        ),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("error_message", sa.Text(), nullable=True),
+        sa.CheckConstraint(
+            "status IN ('pending', 'running', 'complete', 'failed')",
+            name="ck_embedding_jobs_status",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("embedding_jobs")
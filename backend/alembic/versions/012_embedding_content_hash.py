@@ -0,0 +1,52 @@
+"""embedding content hash and generation modes
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17
+
+Adds:
+  - content_embeddings.content_hash (SHA-256 of the text the embedding was
+    built from; NULL for rows created before this revision, which the next
+    refresh re-embeds)
+  - embedding_jobs.mode ('missing' | 'refresh' | 'regenerate'), replacing
+    the regenerate flag
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "012"
+down_revision: Union[str, None] = "011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("content_embeddings", sa.Column("content_hash", sa.String(64), nullable=True))
+
+    op.add_column(
+        "embedding_jobs",
+        sa.Column("mode", sa.String(10), nullable=False, server_default="missing"),
+    )
+    op.execute("UPDATE embedding_jobs SET mode = 'regenerate' WHERE regenerate")
+    op.drop_column("embedding_jobs", "regenerate")
+    op.create_check_constraint(
+        "ck_embedding_jobs_mode",
+        "embedding_jobs",
+        "mode IN ('missing', 'refresh', 'regenerate')",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("ck_embedding_jobs_mode", "embedding_jobs", type_="check")
+    op.add_column(
+        "embedding_jobs",
+        sa.Column("regenerate", sa.Boolean(), nullable=False, server_default=sa.text("false")),
+    )
+    op.execute("UPDATE embedding_jobs SET regenerate = (mode = 'regenerate')")
+    op.drop_column("embedding_jobs", "mode")
+
+    op.drop_column("content_embeddings", "content_hash")
@@ -0,0 +1,50 @@
+"""full-text and trigram indexes for keyword search
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-17
+
+Adds:
+  - pg_trgm extension
+  - titles.search_vector (generated tsvector over title, synopsis_short and
+    synopsis_long, weighted A/B/C) with a GIN index
+  - trigram GIN indexes on titles.title and title_cast.person_name, used by
+    ILIKE substring matching and word-similarity fuzzy matching
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "013"
+down_revision: Union[str, None] = "012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR_EXPR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(synopsis_short, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(synopsis_long, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.execute(
+        f"ALTER TABLE titles ADD COLUMN search_vector tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_VECTOR_EXPR}) STORED"
+    )
+    op.execute("CREATE INDEX idx_titles_search_vector ON titles USING gin (search_vector)")
+    op.execute("CREATE INDEX idx_titles_title_trgm ON titles USING gin (title gin_trgm_ops)")
+    op.execute(
+        "CREATE INDEX idx_title_cast_person_name_trgm "
+        "ON title_cast USING gin (person_name gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_title_cast_person_name_trgm")
+    op.execute("DROP INDEX IF EXISTS idx_titles_title_trgm")
+    op.execute("DROP INDEX IF EXISTS idx_titles_search_vector")
+    op.execute("ALTER TABLE titles DROP COLUMN IF EXISTS search_vector")
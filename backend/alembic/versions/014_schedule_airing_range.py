@@ -0,0 +1,70 @@
+"""time-range index for schedule lookups
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-17
+
+Adds:
+  - ck_schedule_entries_time_order (end_time > start_time).  tstzrange()
+    rejects an end before the start, so the upgrade stops and reports any
+    such rows instead of failing half-way through the column rewrite; fix or
+    delete them and re-run.
+  - btree_gist extension (uuid equality inside a GiST index)
+  - schedule_entries.airing (generated tstzrange [start_time, end_time))
+  - GiST index on (channel_id, airing) serving "on air at" containment and
+    window overlap lookups for EPG now/next, start-over and catch-up
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "014"
+down_revision: Union[str, None] = "013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            bad_count bigint;
+            sample text;
+        BEGIN
+            SELECT count(*), string_agg(id::text, ', ') FILTER (WHERE rn <= 10)
+              INTO bad_count, sample
+              FROM (
+                  SELECT id, row_number() OVER (ORDER BY start_time) AS rn
+                    FROM schedule_entries
+                   WHERE end_time <= start_time
+              ) bad;
+            IF bad_count > 0 THEN
+                RAISE EXCEPTION '% schedule_entries rows have end_time <= start_time (e.g. %)',
+                    bad_count, sample
+                    USING HINT = 'Correct or delete these rows, then re-run the migration.';
+            END IF;
+        END $$
+        """
+    )
+    op.create_check_constraint(
+        "ck_schedule_entries_time_order", "schedule_entries", "end_time > start_time"
+    )
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+
+    op.execute(
+        "ALTER TABLE schedule_entries ADD COLUMN airing tstzrange "
+        "GENERATED ALWAYS AS (tstzrange(start_time, end_time, '[)')) STORED"
+    )
+    op.execute(
+        "CREATE INDEX idx_schedule_channel_airing "
+        "ON schedule_entries USING gist (channel_id, airing)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_schedule_channel_airing")
+    op.execute("ALTER TABLE schedule_entries DROP COLUMN IF EXISTS airing")
+    op.drop_constraint("ck_schedule_entries_time_order", "schedule_entries", type_="check")
@@ -0,0 +1,55 @@
+"""trigram and full-text indexes for EPG schedule search
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-17
+
+Adds:
+  - trigram GIN indexes on schedule_entries.title and series_title, used by
+    ILIKE substring matching in EPG search
+  - schedule_entries.search_vector (generated tsvector over title and
+    series_title, weighted A, and synopsis, weighted B) with a GIN index
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "015"
+down_revision: Union[str, None] = "014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR_EXPR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(series_title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(synopsis, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.execute(
+        "CREATE INDEX idx_schedule_title_trgm "
+        "ON schedule_entries USING gin (title gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX idx_schedule_series_title_trgm "
+        "ON schedule_entries USING gin (series_title gin_trgm_ops)"
+    )
+    op.execute(
+        f"ALTER TABLE schedule_entries ADD COLUMN search_vector tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_VECTOR_EXPR}) STORED"
+    )
+    op.execute(
+        "CREATE INDEX idx_schedule_search_vector "
+        "ON schedule_entries USING gin (search_vector)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_schedule_search_vector")
+    op.execute("ALTER TABLE schedule_entries DROP COLUMN IF EXISTS search_vector")
+    op.execute("DROP INDEX IF EXISTS idx_schedule_series_title_trgm")
+    op.execute("DROP INDEX IF EXISTS idx_schedule_title_trgm")
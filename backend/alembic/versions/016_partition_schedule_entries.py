@@ -0,0 +1,138 @@
+"""range-partition schedule_entries by day
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-17
+
+Rebuilds schedule_entries as a table partitioned by RANGE (start_time) with
+one partition per UTC day (schedule_entries_pYYYYMMDD) plus a default
+partition, and copies the existing rows across.  Partitions are created from
+the earliest existing day through SCHEDULE_PARTITION_PREMAKE_DAYS ahead; the
+lifespan maintenance loop (app.services.schedule_partitions) keeps creating
+future days and drops days past the retention horizon.
+
+A partitioned table's unique keys must include the partition key, so:
+  - the primary key becomes (id, start_time)
+  - the foreign keys from tstv_sessions and recordings to schedule_entries.id
+    are dropped; the cascade they provided is applied explicitly by the
+    admin delete endpoint and when a partition is dropped
+
+Constraints and indexes from 001, 014 and 015 are recreated on the partitioned parent.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.config import settings
+
+revision: str = "016"
+down_revision: Union[str, None] = "015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Stored columns, in table order (airing and search_vector are generated)
+COLUMNS = (
+    "id, channel_id, title, synopsis, genre, start_time, end_time, age_rating, "
+    "is_new, is_repeat, series_title, season_number, episode_number, "
+    "catchup_eligible, startover_eligible, series_id"
+)
+
+DEPENDENT_FKS = (
+    ("tstv_sessions", "tstv_sessions_schedule_entry_id_fkey"),
+    ("recordings", "recordings_schedule_entry_id_fkey"),
+)
+
+
+def _create_constraints_and_indexes(primary_key: str) -> None:
+    op.execute(f"ALTER TABLE schedule_entries ADD CONSTRAINT schedule_entries_pkey PRIMARY KEY ({primary_key})")
+    op.execute(
+        "ALTER TABLE schedule_entries ADD CONSTRAINT schedule_entries_channel_id_start_time_key "
+        "UNIQUE (channel_id, start_time)"
+    )
+    op.execute(
+        "ALTER TABLE schedule_entries ADD CONSTRAINT ck_schedule_entries_time_order "
+        "CHECK (end_time > start_time)"
+    )
+    op.execute(
+        "ALTER TABLE schedule_entries ADD CONSTRAINT schedule_entries_channel_id_fkey "
+        "FOREIGN KEY (channel_id) REFERENCES channels (id) ON DELETE CASCADE"
+    )
+    op.execute("CREATE INDEX idx_schedule_channel_time ON schedule_entries (channel_id, start_time, end_time)")
+    op.execute("CREATE INDEX idx_schedule_time_range ON schedule_entries (start_time, end_time)")
+    op.execute("CREATE INDEX idx_schedule_channel_airing ON schedule_entries USING gist (channel_id, airing)")
+    op.execute("CREATE INDEX idx_schedule_title_trgm ON schedule_entries USING gin (title gin_trgm_ops)")
+    op.execute(
+        "CREATE INDEX idx_schedule_series_title_trgm ON schedule_entries USING gin (series_title gin_trgm_ops)"
+    )
+    op.execute("CREATE INDEX idx_schedule_search_vector ON schedule_entries USING gin (search_vector)")
+
+
+def upgrade() -> None:
+    for table, constraint in DEPENDENT_FKS:
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint}")
+
+    op.execute("ALTER TABLE schedule_entries RENAME TO schedule_entries_unpartitioned")
+    op.execute(
+        "CREATE TABLE schedule_entries "
+        "(LIKE schedule_entries_unpartitioned INCLUDING DEFAULTS INCLUDING GENERATED) "
+        "PARTITION BY RANGE (start_time)"
+    )
+    op.execute("CREATE TABLE schedule_entries_default PARTITION OF schedule_entries DEFAULT")
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            d date;
+            last_day date;
+        BEGIN
+            SELECT coalesce(min(start_time AT TIME ZONE 'UTC')::date, (now() AT TIME ZONE 'UTC')::date),
+                   greatest(
+                       coalesce(max(start_time AT TIME ZONE 'UTC')::date, (now() AT TIME ZONE 'UTC')::date),
+                       (now() AT TIME ZONE 'UTC')::date + {int(settings.schedule_partition_premake_days)}
+                   )
+              INTO d, last_day
+              FROM schedule_entries_unpartitioned;
+            WHILE d <= last_day LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF schedule_entries FOR VALUES FROM (%L) TO (%L)',
+                    'schedule_entries_p' || to_char(d, 'YYYYMMDD'),
+                    d::timestamp AT TIME ZONE 'UTC',
+                    (d + 1)::timestamp AT TIME ZONE 'UTC'
+                );
+                d := d + 1;
+            END LOOP;
+        END $$
+        """
+    )
+    op.execute(
+        f"INSERT INTO schedule_entries ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM schedule_entries_unpartitioned"
+    )
+    op.execute("DROP TABLE schedule_entries_unpartitioned")
+    _create_constraints_and_indexes("id, start_time")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE schedule_entries RENAME TO schedule_entries_partitioned")
+    op.execute(
+        "CREATE TABLE schedule_entries "
+        "(LIKE schedule_entries_partitioned INCLUDING DEFAULTS INCLUDING GENERATED)"
+    )
+    op.execute(
+        f"INSERT INTO schedule_entries ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM schedule_entries_partitioned"
+    )
+    op.execute("DROP TABLE schedule_entries_partitioned")
+    _create_constraints_and_indexes("id")
+
+    for table, constraint in DEPENDENT_FKS:
+        # Rows whose entries were dropped with an expired partition
+        op.execute(
+            f"DELETE FROM {table} t WHERE NOT EXISTS "
+            f"(SELECT 1 FROM schedule_entries s WHERE s.id = t.schedule_entry_id)"
+        )
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {constraint} FOREIGN KEY (schedule_entry_id) "
+            f"REFERENCES schedule_entries (id) ON DELETE CASCADE"
+        )
@@ -0,0 +1,57 @@
+"""embedding job heartbeats and single active job
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-17
+
+Adds:
+  - embedding_jobs.heartbeat_at (advanced with every committed chunk; a
+    running job whose heartbeat is older than EMBEDDING_JOB_STALE_SECONDS is
+    considered abandoned and may be claimed by another process)
+  - uq_embedding_jobs_active: at most one pending or running job.  Extra
+    active jobs left by earlier concurrent submissions are marked failed
+    (the oldest one is kept).
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "017"
+down_revision: Union[str, None] = "016"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "embedding_jobs",
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.execute("UPDATE embedding_jobs SET heartbeat_at = started_at WHERE status = 'running'")
+    op.execute(
+        """
+        UPDATE embedding_jobs
+        SET status = 'failed',
+            error_message = 'Superseded by an earlier active job',
+            completed_at = NOW()
+        WHERE status IN ('pending', 'running')
+          AND id <> (
+              SELECT id FROM embedding_jobs
+              WHERE status IN ('pending', 'running')
+              ORDER BY submitted_at, id
+              LIMIT 1
+          )
+        """
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX uq_embedding_jobs_active ON embedding_jobs ((true)) "
+        "WHERE status IN ('pending', 'running')"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS uq_embedding_jobs_active")
+    op.drop_column("embedding_jobs", "heartbeat_at")
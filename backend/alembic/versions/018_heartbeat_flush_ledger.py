@@ -0,0 +1,40 @@
+"""heartbeat flush ledger
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-17
+
+Adds:
+  - heartbeat_flushes (one row per settled heartbeat aggregator flush; makes
+    replaying an in-flight flush left in Redis by a crash idempotent)
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+from alembic import op
+
+revision: str = "018"
+down_revision: Union[str, None] = "017"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "heartbeat_flushes",
+        sa.Column("flush_id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("applied", sa.Boolean(), nullable=False),
+        sa.Column(
+            "settled_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("NOW()"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("heartbeat_flushes")
@@ -27,6 +27,67 @@ class Settings(BaseSettings):
 
     # AI / Embeddings
     embedding_model: str = "all-MiniLM-L6-v2"
+    # Batch generation: texts per model.encode call and encoder processes
+    embedding_batch_size: int = 64
+    embedding_workers: int = 2
+    # A running job whose last chunk committed longer ago than this is treated
+    # as abandoned and re-claimed by the resume loop (also its poll interval)
+    embedding_job_stale_seconds: int = 600
+    # Semantic search query embeddings: in-process LRU, optional Redis tier
+    # (TTL 0 disables it) and micro-batching window for concurrent misses
+    query_embedding_cache_size: int = 10_000
+    query_embedding_redis_ttl_seconds: int = 86_400
+    query_embedding_batch_window_ms: float = 5.0
+    query_embedding_max_batch: int = 32
+
+    # Search — keyword backend: "fts" (tsvector + pg_trgm indexes, migration 013)
+    # or "ilike" (unindexed substring scan)
+    search_backend: str = "fts"
+    # Hybrid search per-leg budgets; a leg that overruns is dropped from the results
+    search_keyword_timeout_ms: int = 1000
+    search_semantic_timeout_ms: int = 600
+    # Search response cache (Redis, keyed by catalog version); 0 disables it
+    search_cache_ttl_seconds: int = 600
+    # Autocomplete index: how often to check the catalog version for a rebuild
+    suggest_refresh_check_seconds: int = 10
+    # SVOD package index: how often to check the package version for a rebuild
+    package_index_refresh_check_seconds: int = 5
+    # Concurrent streams: a session with no heartbeat for this long is abandoned;
+    # Redis stream state is flushed to stream_sessions on the interval below
+    stream_abandon_seconds: int = 120
+    stream_flush_interval_seconds: int = 5
+    stream_flush_batch_size: int = 1000
+    stream_reaper_interval_seconds: int = 30
+    # Viewing-time heartbeats: aggregated in Redis and bulk-flushed to Postgres;
+    # a profile's cached balance row is re-read from Postgres after this long
+    heartbeat_flush_interval_seconds: int = 10
+    heartbeat_flush_batch_size: int = 1000
+    heartbeat_balance_cache_seconds: int = 300
+    # EPG now/next snapshot: rebuilt at programme boundaries, and after a
+    # schedule change seen within this many seconds
+    epg_snapshot_check_seconds: int = 5
+    # EPG grid: per-day schedule blobs in Redis (orphaned by schedule version bumps)
+    epg_grid_cache_ttl_seconds: int = 3600
+    # schedule_entries daily partitions (migration 016): created this many days
+    # ahead, dropped once older than the widest channel CUTV window plus grace
+    schedule_partition_premake_days: int = 14
+    schedule_partition_retention_grace_hours: int = 24
+    schedule_partition_maintenance_seconds: int = 3600
+    # Longest programme the schedule accepts; bounds start_time in time-range
+    # lookups so only the partitions that can hold a match are scanned
+    schedule_max_programme_hours: int = 24
+
+    # pgvector ANN index (HNSW) — build parameters are read by migration 009;
+    # ef_search is applied to every pooled connection (higher = better recall)
+    vector_hnsw_m: int = 16
+    vector_hnsw_ef_construction: int = 128
+    vector_ef_search: int = 40
+
+    # Recommendations — materialized global rails (trending / new releases / genre)
+    rail_cache_refresh_seconds: int = 300
+    # Similar titles stored per title in title_neighbors; several times the
+    # largest similar-titles page so restricted tiers rarely exhaust the list
+    title_neighbor_depth: int = 200
 
     # HLS / SimLive
     hls_segment_dir: str = "/hls_data"
@@ -3,6 +3,7 @@ from collections.abc import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
+from app import vector_codec
 from app.config import settings
 
 engine = create_async_engine(
@@ -12,8 +13,13 @@ engine = create_async_engine(
     max_overflow=settings.db_max_overflow,
     pool_pre_ping=True,
     pool_recycle=settings.db_pool_recycle,
-    connect_args={"statement_cache_size": 100},
+    connect_args={
+        "statement_cache_size": 100,
+        # HNSW candidate list size for every vector query on this connection
+        "server_settings": {"hnsw.ef_search": str(settings.vector_ef_search)},
+    },
 )
+vector_codec.install(engine)
 async_session_factory = async_sessionmaker(engine, expire_on_commit=False)
 
 
@@ -38,6 +38,31 @@ async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
     )
     _app.state.redis = redis_client
 
+    # Shared tier for cached semantic-search query embeddings
+    from app.services.query_embedder import query_embedder
+
+    query_embedder.redis = redis_client
+
+    # Search response cache and catalog version counter
+    from app.services.search_cache import search_cache
+
+    search_cache.redis = redis_client
+
+    # EPG grid day blobs, tagged with the schedule version
+    from app.services.epg_grid_cache import epg_grid_cache
+
+    epg_grid_cache.redis = redis_client
+
+    # Concurrent stream counter (live sessions in Redis, write-behind to stream_sessions)
+    from app.services.stream_counter import stream_counter
+
+    stream_counter.redis = redis_client
+
+    # Viewing-time heartbeat aggregator (write-behind to viewing_sessions / balances)
+    from app.services.heartbeat_aggregator import heartbeat_aggregator
+
+    heartbeat_aggregator.redis = redis_client
+
     # Feature 016: Attempt to restore SimLive channels on startup (non-blocking)
     try:
         from app.services.simlive_manager import SimLiveManager
@@ -95,15 +120,201 @@ async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
 
     cleanup_task = asyncio.create_task(_segment_cleanup_loop())
 
+    # Materialized home rails: build immediately, then refresh on a schedule
+    _rails_logger = logging.getLogger("app.recommendations.rails")
+
+    async def _rail_refresh_loop() -> None:
+        """Rebuild the global rail cache every rail_cache_refresh_seconds."""
+        from app.services.rail_cache import rail_cache
+
+        while True:
+            try:
+                async with async_session_factory() as session:
+                    await rail_cache.rebuild(session)
+                await asyncio.sleep(settings.rail_cache_refresh_seconds)
+            except asyncio.CancelledError:
+                break
+            except Exception:
+                _rails_logger.exception("Rail cache rebuild failed")
+                await asyncio.sleep(settings.rail_cache_refresh_seconds)
+
+    rail_task = asyncio.create_task(_rail_refresh_loop())
+
+    # Autocomplete prefix index: build now, rebuild whenever the catalog version moves
+    _suggest_logger = logging.getLogger("app.search.suggest")
+
+    async def _suggest_refresh_loop() -> None:
+        """Rebuild the suggest index when the catalog version changes."""
+        from app.services.suggest_index import suggest_index
+
+        while True:
+            try:
+                version = await search_cache.catalog_version()
+                if suggest_index.built_at is None or version != suggest_index.version:
+                    async with async_session_factory() as session:
+                        await suggest_index.rebuild(session, version)
+                await asyncio.sleep(settings.suggest_refresh_check_seconds)
+            except asyncio.CancelledError:
+                break
+            except Exception:
+                _suggest_logger.exception("Suggest index rebuild failed")
+                await asyncio.sleep(settings.suggest_refresh_check_seconds)
+
+    suggest_task = asyncio.create_task(_suggest_refresh_loop())
+
+    # SVOD package membership index: build now, rebuild when an admin changes packages
+    _packages_logger = logging.getLogger("app.entitlements.packages")
+
+    async def _package_index_refresh_loop() -> None:
+        """Rebuild the package index when the package version changes."""
+        from app.services.package_index import package_index
+
+        while True:
+            try:
+                version = await package_index.current_version(redis_client)
+                if not package_index.ready or version != package_index.version:
+                    async with async_session_factory() as session:
+                        await package_index.rebuild(session, version)
+                await asyncio.sleep(settings.package_index_refresh_check_seconds)
+            except asyncio.CancelledError:
+                break
+            except Exception:
+                _packages_logger.exception("Package index rebuild failed")
+                await asyncio.sleep(settings.package_index_refresh_check_seconds)
+
+    package_task = asyncio.create_task(_package_index_refresh_loop())
+
+    # EPG now/next snapshot: rebuild at each programme boundary or schedule change
+    _epg_logger = logging.getLogger("app.epg.snapshot")
+
+    async def _epg_snapshot_loop() -> None:
+        """Keep the now/next snapshot current for /epg/now."""
+        from app.services.epg_snapshot import epg_snapshot
+
+        while True:
+            try:
+                version = await epg_snapshot.current_version(redis_client)
+                if epg_snapshot.current() is None or version != epg_snapshot.version:
+                    async with async_session_factory() as session:
+                        await epg_snapshot.rebuild(session, version)
+                await asyncio.sleep(
+                    min(settings.epg_snapshot_check_seconds, epg_snapshot.seconds_until_stale())
+                )
+            except asyncio.CancelledError:
+                break
+            except Exception:
+                _epg_logger.exception("EPG snapshot rebuild failed")
+                await asyncio.sleep(settings.epg_snapshot_check_seconds)
+
+    epg_task = asyncio.create_task(_epg_snapshot_loop())
+
+    # schedule_entries partitions: create days ahead, drop days past the catch-up horizon
+    _partitions_logger = logging.getLogger("app.epg.partitions")
+
+    async def _schedule_partition_loop() -> None:
+        """Run partition maintenance every schedule_partition_maintenance_seconds."""
+        from app.services.schedule_partitions import maintain
+
+        while True:
+            try:
+                async with async_session_factory() as session:
+                    created, dropped = await maintain(session, redis=redis_client)
+                if created or dropped:
+                    _partitions_logger.info(
+                        "Schedule partitions: %d created, %d dropped", created, dropped
+                    )
+                await asyncio.sleep(settings.schedule_partition_maintenance_seconds)
+            except asyncio.CancelledError:
+                break
+            except Exception:
+                _partitions_logger.exception("Schedule partition maintenance failed")
+                await asyncio.sleep(settings.schedule_partition_maintenance_seconds)
+
+    partition_task = asyncio.create_task(_schedule_partition_loop())
+
+    # Stream sessions: flush Redis state to stream_sessions, reap abandoned sessions
+    _streams_logger = logging.getLogger("app.entitlements.streams")
+
+    async def _stream_flush_loop() -> None:
+        """Write pending stream starts/ends/heartbeats every stream_flush_interval_seconds."""
+        while True:
+            try:
+                await asyncio.sleep(settings.stream_flush_interval_seconds)
+                async with async_session_factory() as session:
+                    await stream_counter.flush(session)
+            except asyncio.CancelledError:
+                break
+            except Exception:
+                _streams_logger.exception("Stream session flush failed")
+
+    async def _stream_reaper_loop() -> None:
+        """Evict abandoned stream sessions every stream_reaper_interval_seconds."""
+        while True:
+            try:
+                await asyncio.sleep(settings.stream_reaper_interval_seconds)
+                async with async_session_factory() as session:
+                    evicted, swept = await stream_counter.reap(session)
+                if evicted or swept:
+                    _streams_logger.info(
+                        "Stream reaper: %d sessions evicted, %d rows ended", evicted, swept
+                    )
+            except asyncio.CancelledError:
+                break
+            except Exception:
+                _streams_logger.exception("Stream reaper failed")
+
+    # Viewing-time heartbeats: flush aggregated seconds every heartbeat_flush_interval_seconds
+    _heartbeat_logger = logging.getLogger("app.viewing_time.flush")
+
+    async def _heartbeat_flush_loop() -> None:
+        """Bulk-write aggregated heartbeat state to Postgres."""
+        from app.services.metrics_service import perf_metrics
+
+        while True:
+            try:
+                await asyncio.sleep(settings.heartbeat_flush_interval_seconds)
+                async with async_session_factory() as session:
+                    rows, statements = await heartbeat_aggregator.flush(session)
+                if rows:
+                    perf_metrics.record_heartbeat_flush(rows, statements)
+            except asyncio.CancelledError:
+                break
+            except Exception:
+                _heartbeat_logger.exception("Heartbeat flush failed")
+
+    heartbeat_flush_task = asyncio.create_task(_heartbeat_flush_loop())
+    stream_flush_task = asyncio.create_task(_stream_flush_loop())
+    stream_reaper_task = asyncio.create_task(_stream_reaper_loop())
+
+    # Resume embedding jobs whose worker died or never started (progress is committed per chunk)
+    from app.services.embedding_service import resume_embedding_jobs, shutdown_embedding_pool
+
+    embedding_task = asyncio.create_task(resume_embedding_jobs())
+
     yield
 
     # Shutdown: cancel background tasks, close Redis, dispose engine
-    for task in (expiry_task, cleanup_task):
+    for task in (
+        expiry_task, cleanup_task, rail_task, suggest_task, package_task, epg_task,
+        partition_task, stream_flush_task, stream_reaper_task, heartbeat_flush_task, embedding_task,
+    ):
         task.cancel()
         try:
             await task
         except asyncio.CancelledError:
             pass
+    try:
+        async with async_session_factory() as session:
+            await stream_counter.flush(session)
+    except Exception:
+        _streams_logger.exception("Final stream session flush failed")
+    try:
+        async with async_session_factory() as session:
+            await heartbeat_aggregator.flush(session)
+    except Exception:
+        _heartbeat_logger.exception("Final heartbeat flush failed")
+    shutdown_embedding_pool()
+    query_embedder.close()
     await redis_client.aclose()
     await engine.dispose()
 
@@ -1,8 +1,8 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, func
-from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy import Boolean, Computed, DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -39,6 +39,17 @@ class Title(Base):
     theme_tags: Mapped[list[str] | None] = mapped_column(ARRAY(Text))
     ai_description: Mapped[str | None] = mapped_column(Text)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    # Keyword search document (migration 013); never loaded with the row.
+    search_vector = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(synopsis_short, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(synopsis_long, '')), 'C')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
 
     genres: Mapped[list["TitleGenre"]] = relationship(back_populates="title", cascade="all, delete-orphan")
     cast_members: Mapped[list["TitleCast"]] = relationship(back_populates="title", cascade="all, delete-orphan")
@@ -2,7 +2,19 @@ import uuid
 from datetime import datetime
 
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import DateTime, ForeignKey, String, func
+from sqlalchemy import (
+    CheckConstraint,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    SmallInteger,
+    String,
+    Text,
+    func,
+    text,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -19,4 +31,88 @@ class ContentEmbedding(Base):
     )
     embedding = mapped_column(Vector(EMBEDDING_DIM), nullable=False)
     model_version: Mapped[str] = mapped_column(String(50), nullable=False, default="all-MiniLM-L6-v2")
+    # SHA-256 of the _build_embedding_text output this embedding was built from.
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class TitleNeighbor(Base):
+    """Precomputed top-K nearest neighbour of a title by embedding cosine similarity.
+
+    Rebuilt wholesale after embedding generation; parental filtering is
+    applied when reading, so one list serves every rating tier.
+    """
+
+    __tablename__ = "title_neighbors"
+    __table_args__ = (Index("ix_title_neighbors_neighbor", "neighbor_id"),)
+
+    title_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("titles.id", ondelete="CASCADE"), primary_key=True
+    )
+    rank: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    neighbor_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("titles.id", ondelete="CASCADE"), nullable=False
+    )
+    similarity: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+class ProfileEmbedding(Base):
+    """Running weighted sum of a profile's interacted-title embeddings.
+
+    The taste centroid is ``vector_sum / weight_total``; both columns are
+    maintained incrementally as bookmarks, ratings and watchlist entries change.
+    """
+
+    __tablename__ = "profile_embeddings"
+
+    profile_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("profiles.id", ondelete="CASCADE"), primary_key=True
+    )
+    vector_sum = mapped_column(Vector(EMBEDDING_DIM), nullable=False)
+    weight_total: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
+class EmbeddingJob(Base):
+    """Progress of a batched embedding generation run.
+
+    Chunks are committed as they complete, so a job left ``running`` by a
+    restart resumes from the titles that are still pending.  ``heartbeat_at``
+    advances with every chunk; a partial unique index (migration 017) allows
+    only one pending or running job at a time.
+    """
+
+    __tablename__ = "embedding_jobs"
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('pending', 'running', 'complete', 'failed')",
+            name="ck_embedding_jobs_status",
+        ),
+        CheckConstraint(
+            "mode IN ('missing', 'refresh', 'regenerate')",
+            name="ck_embedding_jobs_mode",
+        ),
+        Index(
+            "uq_embedding_jobs_active",
+            text("(true)"),
+            unique=True,
+            postgresql_where=text("status IN ('pending', 'running')"),
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    status: Mapped[str] = mapped_column(String(10), nullable=False, default="pending")
+    mode: Mapped[str] = mapped_column(String(10), nullable=False, default="missing")
+    total_titles: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    processed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    submitted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -1,8 +1,8 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint, func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Boolean, CheckConstraint, Computed, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import TSTZRANGE, TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -32,9 +32,12 @@ class Channel(Base):
 
 
 class ScheduleEntry(Base):
+    # Range-partitioned by start_time in Postgres (migration 016), where the
+    # primary key is (id, start_time); id alone identifies a row here.
     __tablename__ = "schedule_entries"
     __table_args__ = (
         UniqueConstraint("channel_id", "start_time"),
+        CheckConstraint("end_time > start_time", name="ck_schedule_entries_time_order"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -56,6 +59,25 @@ class ScheduleEntry(Base):
     startover_eligible: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True, server_default="true")
     series_id: Mapped[str | None] = mapped_column(String(100), nullable=True)
 
+    # [start_time, end_time) for GiST containment/overlap lookups (migration 014);
+    # never loaded with the row.
+    airing = mapped_column(
+        TSTZRANGE,
+        Computed("tstzrange(start_time, end_time, '[)')", persisted=True),
+        deferred=True,
+    )
+    # EPG search document (migration 015); never loaded with the row.
+    search_vector = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(series_title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(synopsis, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+
     channel: Mapped["Channel"] = relationship(back_populates="schedule_entries")
 
 
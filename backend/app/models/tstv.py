@@ -22,9 +22,8 @@ class TSTVSession(Base):
         ForeignKey("profiles.id", ondelete="SET NULL"), nullable=True
     )
     channel_id: Mapped[str] = mapped_column(String(20), nullable=False)
-    schedule_entry_id: Mapped[uuid.UUID] = mapped_column(
-        ForeignKey("schedule_entries.id", ondelete="CASCADE"), nullable=False
-    )
+    # No FK: schedule_entries is partitioned (migration 016); see schedule_partitions
+    schedule_entry_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
     session_type: Mapped[str] = mapped_column(String(20), nullable=False)
     started_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
@@ -46,9 +45,8 @@ class Recording(Base):
     user_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
-    schedule_entry_id: Mapped[uuid.UUID] = mapped_column(
-        ForeignKey("schedule_entries.id", ondelete="CASCADE"), nullable=False
-    )
+    # No FK: schedule_entries is partitioned (migration 016); see schedule_partitions
+    schedule_entry_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
     channel_id: Mapped[str] = mapped_column(String(20), nullable=False)
     requested_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
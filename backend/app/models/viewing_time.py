@@ -100,6 +100,21 @@ class ViewingSession(Base):
     )
 
 
+class HeartbeatFlush(Base):
+    """Outcome of one heartbeat aggregator flush, keyed by its in-flight id.
+
+    ``applied`` rows are written in the same transaction as the flushed
+    increments; ``applied = false`` rows are written by recovery to fence off
+    a flush that never committed before its in-flight state is re-queued.
+    """
+
+    __tablename__ = "heartbeat_flushes"
+
+    flush_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    applied: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    settled_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
 class TimeGrant(Base):
     __tablename__ = "time_grants"
 
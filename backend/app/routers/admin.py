@@ -4,19 +4,23 @@ packages, offers, and user subscription management (Feature 012)."""
 import uuid
 from datetime import date
 
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, status
 from sqlalchemy import and_, delete, func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.dependencies import DB, AdminUser, RedisClient
+from app.services.embedding_service import invalidate_taste_vectors, refresh_title_embeddings
+from app.services.epg_snapshot import epg_snapshot
+from app.services.package_index import package_index
+from app.services.search_cache import search_cache
 from app.services.search_service import escape_like
 from app.models.catalog import Title, TitleGenre
-from app.models.embedding import ContentEmbedding
+from app.models.embedding import ContentEmbedding, EmbeddingJob
 from app.models.entitlement import ContentPackage, PackageContent, TitleOffer, UserEntitlement
 from app.models.epg import Channel, ScheduleEntry
 from app.models.user import Profile, User
 from app.schemas.admin import (
-    EmbeddingGenerationResponse,
+    EmbeddingJobResponse,
     PerformanceMetricsResponse,
     PlatformStatsResponse,
     TitleAdminResponse,
@@ -41,6 +45,7 @@ from app.schemas.epg import (
     ScheduleEntryCreateRequest,
     ScheduleEntryResponse,
     ScheduleEntryUpdateRequest,
+    check_programme_times,
 )
 
 router = APIRouter()
@@ -128,8 +133,10 @@ async def list_titles(
 
 
 @router.post("/titles", response_model=TitleAdminResponse, status_code=201)
-async def create_title(body: TitleCreateRequest, db: DB, user: AdminUser):
-    """Create a new VOD title."""
+async def create_title(
+    body: TitleCreateRequest, db: DB, user: AdminUser, background_tasks: BackgroundTasks
+):
+    """Create a new VOD title and embed it in the background."""
 
 
     title = Title(
@@ -161,6 +168,8 @@ async def create_title(body: TitleCreateRequest, db: DB, user: AdminUser):
 
     await db.commit()
     await db.refresh(title)
+    await search_cache.bump_catalog_version()
+    background_tasks.add_task(refresh_title_embeddings, [title.id])
 
     return TitleAdminResponse(
         id=title.id,
@@ -215,8 +224,14 @@ async def get_title(title_id: uuid.UUID, db: DB, user: AdminUser):
 
 
 @router.put("/titles/{title_id}", response_model=TitleAdminResponse)
-async def update_title(title_id: uuid.UUID, body: TitleUpdateRequest, db: DB, user: AdminUser):
-    """Update an existing VOD title."""
+async def update_title(
+    title_id: uuid.UUID,
+    body: TitleUpdateRequest,
+    db: DB,
+    user: AdminUser,
+    background_tasks: BackgroundTasks,
+):
+    """Update an existing VOD title; its embedding is refreshed in the background if the text changed."""
 
 
     result = await db.execute(select(Title).where(Title.id == title_id))
@@ -238,6 +253,8 @@ async def update_title(title_id: uuid.UUID, body: TitleUpdateRequest, db: DB, us
 
     await db.commit()
     await db.refresh(title)
+    await search_cache.bump_catalog_version()
+    background_tasks.add_task(refresh_title_embeddings, [title_id])
 
     # Check embedding existence.
     emb = await db.execute(
@@ -268,8 +285,12 @@ async def delete_title(title_id: uuid.UUID, db: DB, user: AdminUser):
     if title is None:
         raise HTTPException(status_code=404, detail="Title not found")
 
+    # The title's interactions cascade away, so nothing would ever subtract
+    # its embedding from the profiles' running taste sums.
+    await invalidate_taste_vectors(db, [title_id])
     await db.delete(title)
     await db.commit()
+    await search_cache.bump_catalog_version()
 
 
 # ---------------------------------------------------------------------------
@@ -337,7 +358,7 @@ async def list_channels(db: DB, user: AdminUser):
 
 
 @router.post("/channels", response_model=ChannelResponse, status_code=201)
-async def create_channel(body: ChannelCreateRequest, db: DB, user: AdminUser):
+async def create_channel(body: ChannelCreateRequest, db: DB, user: AdminUser, redis: RedisClient):
     """Create a new channel."""
 
 
@@ -352,6 +373,7 @@ async def create_channel(body: ChannelCreateRequest, db: DB, user: AdminUser):
     db.add(channel)
     await db.commit()
     await db.refresh(channel)
+    await epg_snapshot.invalidate(redis)
 
     return ChannelResponse(
         id=channel.id,
@@ -366,7 +388,9 @@ async def create_channel(body: ChannelCreateRequest, db: DB, user: AdminUser):
 
 
 @router.put("/channels/{channel_id}", response_model=ChannelResponse)
-async def update_channel(channel_id: uuid.UUID, body: ChannelUpdateRequest, db: DB, user: AdminUser):
+async def update_channel(
+    channel_id: uuid.UUID, body: ChannelUpdateRequest, db: DB, user: AdminUser, redis: RedisClient
+):
     """Update an existing channel."""
 
 
@@ -380,6 +404,7 @@ async def update_channel(channel_id: uuid.UUID, body: ChannelUpdateRequest, db:
 
     await db.commit()
     await db.refresh(channel)
+    await epg_snapshot.invalidate(redis)
 
     return ChannelResponse(
         id=channel.id,
@@ -429,7 +454,9 @@ async def list_schedule(
 
 
 @router.post("/schedule", response_model=ScheduleEntryResponse, status_code=201)
-async def create_schedule_entry(body: ScheduleEntryCreateRequest, db: DB, user: AdminUser):
+async def create_schedule_entry(
+    body: ScheduleEntryCreateRequest, db: DB, user: AdminUser, redis: RedisClient
+):
     """Create a new schedule entry."""
 
 
@@ -450,11 +477,14 @@ async def create_schedule_entry(body: ScheduleEntryCreateRequest, db: DB, user:
     db.add(entry)
     await db.commit()
     await db.refresh(entry)
+    await epg_snapshot.invalidate(redis)
     return entry
 
 
 @router.put("/schedule/{entry_id}", response_model=ScheduleEntryResponse)
-async def update_schedule_entry(entry_id: uuid.UUID, body: ScheduleEntryUpdateRequest, db: DB, user: AdminUser):
+async def update_schedule_entry(
+    entry_id: uuid.UUID, body: ScheduleEntryUpdateRequest, db: DB, user: AdminUser, redis: RedisClient
+):
     """Update a schedule entry."""
 
 
@@ -463,16 +493,25 @@ async def update_schedule_entry(entry_id: uuid.UUID, body: ScheduleEntryUpdateRe
     if entry is None:
         raise HTTPException(status_code=404, detail="Schedule entry not found")
 
-    for field, value in body.model_dump(exclude_unset=True).items():
+    changes = body.model_dump(exclude_unset=True)
+    start_time = changes.get("start_time", entry.start_time)
+    end_time = changes.get("end_time", entry.end_time)
+    try:
+        check_programme_times(start_time, end_time)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+    for field, value in changes.items():
         setattr(entry, field, value)
 
     await db.commit()
     await db.refresh(entry)
+    await epg_snapshot.invalidate(redis)
     return entry
 
 
 @router.delete("/schedule/{entry_id}", status_code=204)
-async def delete_schedule_entry(entry_id: uuid.UUID, db: DB, user: AdminUser):
+async def delete_schedule_entry(entry_id: uuid.UUID, db: DB, user: AdminUser, redis: RedisClient):
     """Delete a schedule entry."""
 
 
@@ -481,8 +520,14 @@ async def delete_schedule_entry(entry_id: uuid.UUID, db: DB, user: AdminUser):
     if entry is None:
         raise HTTPException(status_code=404, detail="Schedule entry not found")
 
+    # tstv_sessions / recordings have no FK to the partitioned schedule table
+    for dependent in ("tstv_sessions", "recordings"):
+        await db.execute(
+            text(f"DELETE FROM {dependent} WHERE schedule_entry_id = :id"), {"id": entry_id}
+        )
     await db.delete(entry)
     await db.commit()
+    await epg_snapshot.invalidate(redis)
 
 
 # ---------------------------------------------------------------------------
@@ -490,23 +535,71 @@ async def delete_schedule_entry(entry_id: uuid.UUID, db: DB, user: AdminUser):
 # ---------------------------------------------------------------------------
 
 
-@router.post("/embeddings/generate", response_model=EmbeddingGenerationResponse)
+def _embedding_job_response(job) -> EmbeddingJobResponse:
+    return EmbeddingJobResponse(
+        job_id=job.id,
+        status=job.status,
+        mode=job.mode,
+        total_titles=job.total_titles,
+        processed=job.processed,
+        submitted_at=job.submitted_at,
+        started_at=job.started_at,
+        completed_at=job.completed_at,
+        error_message=job.error_message,
+    )
+
+
+@router.post(
+    "/embeddings/generate",
+    response_model=EmbeddingJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
 async def generate_embeddings(
     db: DB,
     user: AdminUser,
-    regenerate: bool = Query(False, description="Delete all existing embeddings and regenerate from scratch"),
+    background_tasks: BackgroundTasks,
+    mode: str = Query(
+        "missing",
+        pattern="^(missing|refresh|regenerate)$",
+        description="missing: titles without an embedding; refresh: also titles whose "
+        "text or model changed; regenerate: every title",
+    ),
+    regenerate: bool = Query(False, description="Shorthand for mode=regenerate"),
 ):
-    """Trigger embedding generation for all titles that do not yet have one.
-
-    Pass ``?regenerate=true`` to rebuild every embedding (e.g. after changing
-    the text composition).
+    """Start a background job that embeds titles selected by *mode*.
+
+    ``refresh`` compares each title's current embedding text hash and the
+    configured model with what is stored, so only edited titles are
+    re-encoded.  ``regenerate`` rebuilds every embedding (e.g. after changing
+    the text composition).  The precomputed similar-title table is rebuilt
+    when the job finishes.  Only one job runs at a time: if a job with the
+    same mode is already pending or running it is returned instead of
+    starting another, and a request for a different mode is rejected with
+    409 naming the active job.  Poll ``/embeddings/jobs/{job_id}`` for
+    progress.
     """
+    from app.services.embedding_service import create_embedding_job, run_embedding_job
 
+    requested = "regenerate" if regenerate else mode
+    job, created = await create_embedding_job(db, mode=requested)
+    if not created and job.mode != requested:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Embedding job {job.id} (mode={job.mode}) is already {job.status}; "
+            f"mode={requested} was not started",
+        )
+    if created:
+        background_tasks.add_task(run_embedding_job, job.id)
+    return _embedding_job_response(job)
 
-    from app.services.embedding_service import generate_all_embeddings
 
-    count = await generate_all_embeddings(db, regenerate=regenerate)
-    return EmbeddingGenerationResponse(new_embeddings_created=count)
+@router.get("/embeddings/jobs/{job_id}", response_model=EmbeddingJobResponse)
+async def get_embedding_job(job_id: uuid.UUID, db: DB, user: AdminUser):
+    """Return the status and progress of an embedding job."""
+    job = await db.get(EmbeddingJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Embedding job not found")
+    return _embedding_job_response(job)
 
 
 # ---------------------------------------------------------------------------
@@ -516,10 +609,11 @@ async def generate_embeddings(
 
 @router.get("/metrics", response_model=PerformanceMetricsResponse)
 async def get_performance_metrics(_user: AdminUser):
-    """Return in-process performance metrics (heartbeat stats, config cache)."""
+    """Return in-process performance metrics (heartbeat stats, config and query-embedding caches)."""
     import time
 
     from app.services.metrics_service import config_cache, perf_metrics
+    from app.services.query_embedder import query_embedder
 
     snapshot = perf_metrics.snapshot()
     return PerformanceMetricsResponse(
@@ -530,6 +624,7 @@ async def get_performance_metrics(_user: AdminUser):
             "current_size": config_cache.current_size,
             "max_size": config_cache.max_size,
         },
+        query_embedding_cache=query_embedder.snapshot(),
     )
 
 
@@ -567,7 +662,9 @@ async def list_packages(db: DB, user: AdminUser) -> list[PackageResponse]:
 
 
 @router.post("/packages", response_model=PackageResponse, status_code=201)
-async def create_package(body: PackageCreate, db: DB, user: AdminUser) -> PackageResponse:
+async def create_package(
+    body: PackageCreate, db: DB, user: AdminUser, redis: RedisClient
+) -> PackageResponse:
     """Create a new subscription package."""
     pkg = ContentPackage(
         name=body.name,
@@ -580,12 +677,13 @@ async def create_package(body: PackageCreate, db: DB, user: AdminUser) -> Packag
     db.add(pkg)
     await db.commit()
     await db.refresh(pkg)
+    await package_index.refresh(db, redis)
     return await _package_response(pkg, db)
 
 
 @router.put("/packages/{package_id}", response_model=PackageResponse)
 async def update_package(
-    package_id: uuid.UUID, body: PackageUpdate, db: DB, user: AdminUser
+    package_id: uuid.UUID, body: PackageUpdate, db: DB, user: AdminUser, redis: RedisClient
 ) -> PackageResponse:
     """Update a package's name, description, or tier."""
     result = await db.execute(select(ContentPackage).where(ContentPackage.id == package_id))
@@ -597,11 +695,14 @@ async def update_package(
         setattr(pkg, field, value)
     await db.commit()
     await db.refresh(pkg)
+    await package_index.refresh(db, redis)  # tier may have changed
     return await _package_response(pkg, db)
 
 
 @router.delete("/packages/{package_id}", status_code=204)
-async def delete_package(package_id: uuid.UUID, db: DB, user: AdminUser) -> None:
+async def delete_package(
+    package_id: uuid.UUID, db: DB, user: AdminUser, redis: RedisClient
+) -> None:
     """Delete a package. Fails with 409 if active user entitlements exist."""
     from datetime import datetime, timezone
 
@@ -627,6 +728,7 @@ async def delete_package(package_id: uuid.UUID, db: DB, user: AdminUser) -> None
 
     await db.delete(pkg)
     await db.commit()
+    await package_index.refresh(db, redis)
 
 
 # ---------------------------------------------------------------------------
@@ -696,6 +798,7 @@ async def assign_title_to_package(
     body: dict,
     db: DB,
     user: AdminUser,
+    redis: RedisClient,
 ):
     """Assign a title to a package."""
     title_id = body.get("title_id")
@@ -727,6 +830,7 @@ async def assign_title_to_package(
 
     db.add(PackageContent(package_id=package_id, content_type="vod_title", content_id=title_id))
     await db.commit()
+    await package_index.refresh(db, redis)
     return {"package_id": str(package_id), "title_id": str(title_id), "content_type": "vod_title"}
 
 
@@ -736,6 +840,7 @@ async def remove_title_from_package(
     title_id: uuid.UUID,
     db: DB,
     user: AdminUser,
+    redis: RedisClient,
 ) -> None:
     """Remove a title from a package."""
     result = await db.execute(
@@ -753,6 +858,7 @@ async def remove_title_from_package(
 
     await db.delete(assignment)
     await db.commit()
+    await package_index.refresh(db, redis)
 
 
 # ---------------------------------------------------------------------------
@@ -18,12 +18,16 @@ from app.schemas.catalog import (
     PaginatedResponse,
     SeasonResponse,
     SemanticSearchResponse,
+    SuggestionItem,
+    SuggestResponse,
     TitleDetail,
     TitleListItem,
     UserAccess,
 )
 from app.services import catalog_service, recommendation_service, search_service
 from app.services.rating_utils import resolve_profile_rating
+from app.services.search_cache import search_cache
+from app.services.suggest_index import suggest_index
 
 router = APIRouter()
 
@@ -150,12 +154,10 @@ async def list_titles(
         search_query=q,
     )
 
-    items = []
-    for t in titles:
-        access_options, user_access = await entitlement_service.get_access_options(
-            t.id, user.id if user else None, db, redis
-        )
-        items.append(_title_to_list_item(t, access_options, user_access))
+    access = await entitlement_service.get_access_options_bulk(
+        [t.id for t in titles], user.id if user else None, db, redis
+    )
+    items = [_title_to_list_item(t, *access[t.id]) for t in titles]
 
     return PaginatedResponse(items=items, total=total, page=page, page_size=page_size)
 
@@ -197,12 +199,10 @@ async def featured_titles(
     from app.services import entitlement_service
 
     titles = await catalog_service.get_featured_titles(db)
-    items = []
-    for t in titles:
-        access_options, user_access = await entitlement_service.get_access_options(
-            t.id, user.id if user else None, db, redis
-        )
-        items.append(_title_to_list_item(t, access_options, user_access))
+    access = await entitlement_service.get_access_options_bulk(
+        [t.id for t in titles], user.id if user else None, db, redis
+    )
+    items = [_title_to_list_item(t, *access[t.id]) for t in titles]
     return items
 
 
@@ -215,29 +215,76 @@ async def search_titles(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
 ) -> PaginatedResponse[TitleListItem]:
-    """Search titles by keyword."""
+    """Search titles by keyword.
+
+    The matching page is served from the search cache while the catalog
+    version is unchanged; access options are always computed per request.
+    """
     from app.services import entitlement_service
 
-    titles, total = await catalog_service.get_titles(
-        db, page=page, page_size=page_size, search_query=q,
-    )
-    items = []
-    for t in titles:
-        access_options, user_access = await entitlement_service.get_access_options(
-            t.id, user.id if user else None, db, redis
+    version = await search_cache.catalog_version()
+    cached = await search_cache.get(version, "search", q, page=page, page_size=page_size)
+    if cached is None:
+        titles, total = await catalog_service.get_titles(
+            db, page=page, page_size=page_size, search_query=q,
         )
-        items.append(_title_to_list_item(t, access_options, user_access))
-    return PaginatedResponse(items=items, total=total, page=page, page_size=page_size)
+        cached = {
+            "items": [_title_to_list_item(t).model_dump(mode="json") for t in titles],
+            "total": total,
+        }
+        await search_cache.put(version, "search", q, cached, page=page, page_size=page_size)
+
+    items = [TitleListItem.model_validate(entry) for entry in cached["items"]]
+    access = await entitlement_service.get_access_options_bulk(
+        [item.id for item in items], user.id if user else None, db, redis
+    )
+    for item in items:
+        item.access_options, item.user_access = access[item.id]
+    return PaginatedResponse(items=items, total=cached["total"], page=page, page_size=page_size)
+
+
+@router.get("/suggest", response_model=SuggestResponse)
+async def suggest(
+    db: DB,
+    q: str = Query(..., min_length=1, max_length=100, description="Typed prefix"),
+    limit: int = Query(8, ge=1, le=20, description="Max completions"),
+    profile_id: uuid.UUID | None = Query(None, description="Restrict title completions to this profile's ratings"),
+) -> SuggestResponse:
+    """Search-as-you-type completions over title, cast and genre names.
+
+    Served from the in-memory prefix index; the database is only touched to
+    resolve *profile_id*'s parental rating.
+    """
+    allowed_ratings = await resolve_profile_rating(db, profile_id) if profile_id else None
+    items = suggest_index.suggest(q, limit, allowed_ratings)
+    return SuggestResponse(
+        query=q,
+        items=[SuggestionItem(text=i.text, kind=i.kind, title_id=i.title_id) for i in items],
+    )
 
 
 @router.get("/search/semantic", response_model=SemanticSearchResponse)
 async def semantic_search(
     user: OptionalCurrentUser,
-    db: DB,
     q: str = Query(..., min_length=1, description="Search query (natural language supported)"),
     mode: str = Query("hybrid", pattern="^(keyword|semantic|hybrid)$", description="Search mode"),
     page_size: int = Query(20, ge=1, le=100, description="Max results"),
 ) -> SemanticSearchResponse:
-    """Hybrid semantic + keyword search with match explanations."""
-    results = await search_service.hybrid_search(db, query_text=q, mode=mode, limit=page_size)
-    return SemanticSearchResponse(items=results, total=len(results), query=q, mode=mode)
+    """Hybrid semantic + keyword search with match explanations and per-leg timings.
+
+    Responses are cached per catalog version; degraded responses (a leg timed
+    out or failed) are not cached.
+    """
+    version = await search_cache.catalog_version()
+    cached = await search_cache.get(version, "semantic", q, mode=mode, page_size=page_size)
+    if cached is not None:
+        return SemanticSearchResponse(
+            items=cached["items"], total=len(cached["items"]), query=q, mode=mode, cached=True
+        )
+
+    results, legs = await search_service.hybrid_search(query_text=q, mode=mode, limit=page_size)
+    if all(leg["status"] in ("ok", "skipped") for leg in legs.values()):
+        await search_cache.put(
+            version, "semantic", q, {"items": results}, mode=mode, page_size=page_size
+        )
+    return SemanticSearchResponse(items=results, total=len(results), query=q, mode=mode, legs=legs)
@@ -1,17 +1,20 @@
-"""EPG router -- channels, schedule, now-playing, favourites."""
+"""EPG router -- channels, schedule, grid, now-playing, favourites."""
 
 import uuid
-from datetime import date
+from datetime import date, datetime, timedelta, timezone
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 
 from app.dependencies import DB, CurrentUser, OptionalVerifiedProfileId, VerifiedProfileId
 from app.schemas.epg import (
     ChannelResponse,
+    EpgGridResponse,
     NowPlayingResponse,
     ScheduleEntryResponse,
 )
 from app.services import epg_service
+from app.services.epg_grid_cache import epg_grid_cache
+from app.services.epg_snapshot import epg_snapshot
 
 router = APIRouter()
 
@@ -45,9 +48,80 @@ async def get_schedule(
     return entries
 
 
+@router.get("/grid", response_model=EpgGridResponse)
+async def get_grid(
+    request: Request,
+    response: Response,
+    db: DB,
+    start: datetime | None = Query(default=None, description="Window start (defaults to today 00:00 UTC)"),
+    end: datetime | None = Query(default=None, description="Window end (defaults to start + 1 day)"),
+    channel_ids: list[uuid.UUID] | None = Query(default=None, alias="channel_id"),
+):
+    """Return the schedule grid for all (or the given) channels over a window.
+
+    Built from per-day schedule blobs cached in Redis.  Responses carry an
+    ETag tied to the schedule version; a matching ``If-None-Match`` gets a
+    304 without touching the schedule.  When the version cannot be read the
+    grid is built uncached and sent without an ETag.
+    """
+    if start is None:
+        today = datetime.now(timezone.utc).date()
+        start = datetime(today.year, today.month, today.day, tzinfo=timezone.utc)
+    elif start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end is None:
+        end = start + timedelta(days=1)
+    elif end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if end <= start:
+        raise HTTPException(status_code=422, detail="end must be after start")
+    if end - start > timedelta(days=epg_service.GRID_MAX_DAYS):
+        raise HTTPException(
+            status_code=422, detail=f"Window may span at most {epg_service.GRID_MAX_DAYS} days"
+        )
+
+    version = await epg_grid_cache.schedule_version()
+    etag = epg_grid_cache.etag(version, start, end, channel_ids) if version is not None else None
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag is not None and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    channels = await epg_grid_cache.get_channels(version)
+    if channels is None:
+        channels = [
+            ChannelResponse.model_validate(ch).model_dump(mode="json")
+            for ch in await epg_service.get_channels(db)
+        ]
+        await epg_grid_cache.put_channels(version, channels)
+
+    days = epg_service.grid_days(start, end)
+    cached = await epg_grid_cache.get_days(version, days)
+    missing = [d for d in days if d not in cached]
+    if missing:
+        loaded = await epg_service.get_grid_days(db, missing)
+        await epg_grid_cache.put_days(version, loaded)
+        cached.update(loaded)
+
+    if etag is not None:
+        response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return {
+        "start": start,
+        "end": end,
+        "channels": epg_service.build_grid(channels, cached, start, end, channel_ids),
+    }
+
+
 @router.get("/now", response_model=list[NowPlayingResponse])
 async def now_playing(db: DB):
-    """Return what is currently airing on every channel, plus the next programme."""
+    """Return what is currently airing on every channel, plus the next programme.
+
+    Served from the in-memory now/next snapshot; queries only between a
+    programme boundary and the snapshot rebuild that follows it.
+    """
+    snapshot = epg_snapshot.current()
+    if snapshot is not None:
+        return snapshot
     results = await epg_service.get_now_playing(db)
     return results
 
@@ -56,9 +130,22 @@ async def now_playing(db: DB):
 async def search_epg(
     db: DB,
     q: str = Query(min_length=1, description="Search term"),
+    window: str = Query(
+        "all",
+        pattern="^(all|upcoming|catchup)$",
+        description="Restrict to upcoming programmes, the catch-up window, or search all",
+    ),
+    synopsis: bool = Query(False, description="Also match programme synopses"),
+    series: bool = Query(False, description="Also match series titles"),
 ):
-    """Search EPG schedule entries by title (case-insensitive)."""
-    entries = await epg_service.search_schedule(db, q)
+    """Search EPG schedule entries by title (case-insensitive).
+
+    With ``series`` the series title is matched too, so episodes whose own
+    title differs from the series name are found.
+    """
+    entries = await epg_service.search_schedule(
+        db, q, window=window, include_synopsis=synopsis, include_series_title=series
+    )
     return entries
 
 
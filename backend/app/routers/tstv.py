@@ -20,7 +20,7 @@ from app.schemas.tstv import (
     TSTVSessionResponse,
     TSTVSessionUpdate,
 )
-from app.services import manifest_generator
+from app.services import epg_service, manifest_generator
 
 from sqlalchemy import and_, select
 from sqlalchemy.sql import func as sa_func
@@ -56,17 +56,7 @@ async def _get_current_entry(db, channel_id: uuid.UUID) -> tuple[Channel, Schedu
     if channel is None:
         raise HTTPException(status_code=404, detail="Channel not found")
 
-    now = datetime.now(timezone.utc)
-    result = await db.execute(
-        select(ScheduleEntry).where(
-            and_(
-                ScheduleEntry.channel_id == channel_id,
-                ScheduleEntry.start_time <= now,
-                ScheduleEntry.end_time > now,
-            )
-        )
-    )
-    entry = result.scalar_one_or_none()
+    entry = await epg_service.get_current_entry(db, channel_id)
     if entry is None:
         raise HTTPException(status_code=404, detail="No program currently airing on this channel")
 
@@ -167,32 +157,25 @@ async def list_catchup_programs(
     now = datetime.now(timezone.utc)
     cutv_cutoff = now - timedelta(hours=channel.cutv_window_hours)
 
-    # Count total
-    count_q = (
-        select(sa_func.count())
-        .select_from(ScheduleEntry)
-        .where(
-            and_(
-                ScheduleEntry.channel_id == channel_id,
-                ScheduleEntry.end_time <= now,
-                ScheduleEntry.end_time > cutv_cutoff,
-                ScheduleEntry.catchup_eligible.is_(True),
-            )
-        )
+    # Programmes that ended inside the window; the overlap predicate lets the
+    # (channel_id, airing) GiST index narrow the scan and its start_time
+    # bounds prune the daily partitions outside the window.
+    filters = and_(
+        ScheduleEntry.channel_id == channel_id,
+        epg_service.airs_within(cutv_cutoff, now),
+        ScheduleEntry.end_time <= now,
+        ScheduleEntry.end_time > cutv_cutoff,
+        ScheduleEntry.catchup_eligible.is_(True),
     )
+
+    # Count total
+    count_q = select(sa_func.count()).select_from(ScheduleEntry).where(filters)
     total = (await db.execute(count_q)).scalar() or 0
 
     # Fetch page
     q = (
         select(ScheduleEntry)
-        .where(
-            and_(
-                ScheduleEntry.channel_id == channel_id,
-                ScheduleEntry.end_time <= now,
-                ScheduleEntry.end_time > cutv_cutoff,
-                ScheduleEntry.catchup_eligible.is_(True),
-            )
-        )
+        .where(filters)
         .order_by(ScheduleEntry.start_time.desc())
         .offset(offset)
         .limit(limit)
@@ -311,6 +294,7 @@ async def list_catchup_by_date(
 
     # Build filters
     filters = [
+        epg_service.airs_within(day_start, max(day_start, min(day_end, now))),
         ScheduleEntry.end_time <= now,
         ScheduleEntry.start_time >= day_start,
         ScheduleEntry.start_time < day_end,
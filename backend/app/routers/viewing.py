@@ -1,9 +1,11 @@
 """Viewing router -- bookmarks (continue-watching), ratings, watchlist, stream sessions."""
 
+import logging
 import uuid
 from typing import Literal
 
 from fastapi import APIRouter, HTTPException, Query
+from redis.exceptions import RedisError
 from sqlalchemy import and_, delete, select, text, update
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 
@@ -23,8 +25,11 @@ from app.schemas.viewing import (
     RatingResponse,
     WatchlistItemResponse,
 )
-from app.services import bookmark_service
+from app.services import bookmark_service, recommendation_service
 from app.services.recommendation_service import compute_resumption_scores
+from app.services.stream_counter import stream_counter
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -210,6 +215,7 @@ async def rate_title(
         )
     )
     rating = result.scalar_one_or_none()
+    old_weight = await recommendation_service.get_title_weight(db, profile_id, body.title_id)
 
     if rating is None:
         rating = Rating(
@@ -221,6 +227,8 @@ async def rate_title(
     else:
         rating.rating = body.rating
 
+    await db.flush()
+    await recommendation_service.update_taste_vector(db, profile_id, body.title_id, old_weight)
     await db.commit()
     await db.refresh(rating)
     return rating
@@ -289,7 +297,10 @@ async def add_to_watchlist(
     if existing.scalar_one_or_none() is not None:
         return {"detail": "Already in watchlist"}
 
+    old_weight = await recommendation_service.get_title_weight(db, profile_id, title_id)
     db.add(WatchlistItem(profile_id=profile_id, title_id=title_id))
+    await db.flush()
+    await recommendation_service.update_taste_vector(db, profile_id, title_id, old_weight)
     await db.commit()
     return {"detail": "Added to watchlist"}
 
@@ -302,6 +313,7 @@ async def remove_from_watchlist(
     profile_id: VerifiedProfileId,
 ):
     """Remove a title from the profile's watchlist."""
+    old_weight = await recommendation_service.get_title_weight(db, profile_id, title_id)
     await db.execute(
         delete(WatchlistItem).where(
             and_(
@@ -310,6 +322,7 @@ async def remove_from_watchlist(
             )
         )
     )
+    await recommendation_service.update_taste_vector(db, profile_id, title_id, old_weight)
     await db.commit()
 
 
@@ -347,24 +360,26 @@ async def start_stream_session(
             },
         )
 
-    # Stream limit enforcement (FR-022: concurrent stream limit per subscription)
+    # Stream limit enforcement (FR-022: concurrent stream limit per subscription).
+    # The Redis stream counter admits atomically; stream_sessions is the fallback.
+    if stream_counter.enabled:
+        try:
+            max_streams = await entitlement_service.get_max_streams(user.id, db, redis)
+            session_id, started_at = await stream_counter.admit(
+                user.id, body.title_id, body.content_type, max_streams
+            )
+            if session_id is None:
+                active = await stream_counter.active_sessions(user.id)
+                _raise_stream_limit(
+                    [(s["session_id"], s["title_id"], s["started_at"]) for s in active]
+                )
+            return SessionResponse(session_id=session_id, started_at=started_at)
+        except RedisError:
+            logger.warning("Stream counter unavailable, using stream_sessions", exc_info=True)
+
     can_start, active_sessions = await entitlement_service.check_stream_limit(user.id, db)
     if not can_start:
-        raise HTTPException(
-            status_code=429,
-            detail={
-                "detail": "Concurrent stream limit reached",
-                "limit": len(active_sessions),
-                "active_sessions": [
-                    {
-                        "session_id": str(s.id),
-                        "title_id": str(s.title_id) if s.title_id else None,
-                        "started_at": s.started_at.isoformat(),
-                    }
-                    for s in active_sessions
-                ],
-            },
-        )
+        _raise_stream_limit([(s.id, s.title_id, s.started_at) for s in active_sessions])
 
     session = StreamSession(
         user_id=user.id,
@@ -378,14 +393,45 @@ async def start_stream_session(
     return SessionResponse(session_id=session.id, started_at=session.started_at)
 
 
+def _raise_stream_limit(active: list[tuple]) -> None:
+    raise HTTPException(
+        status_code=429,
+        detail={
+            "detail": "Concurrent stream limit reached",
+            "limit": len(active),
+            "active_sessions": [
+                {
+                    "session_id": str(session_id),
+                    "title_id": str(title_id) if title_id else None,
+                    "started_at": started_at.isoformat(),
+                }
+                for session_id, title_id, started_at in active
+            ],
+        },
+    )
+
+
 @router.put("/sessions/{session_id}/heartbeat")
 async def heartbeat_session(
     session_id: uuid.UUID,
     db: DB,
     user: CurrentUser,
 ):
-    """Signal that a stream session is still active (resets 5-min abandonment timer)."""
-    from datetime import datetime, timezone
+    """Signal that a stream session is still active (resets the abandonment timer).
+
+    One Redis round trip; the heartbeat reaches stream_sessions on the next flush.
+    """
+    from datetime import datetime, timedelta, timezone
+
+    if stream_counter.enabled:
+        try:
+            at = await stream_counter.heartbeat(user.id, session_id)
+            if at is not None:
+                return {"last_heartbeat_at": at}
+        except RedisError:
+            logger.warning("Stream counter unavailable, using stream_sessions", exc_info=True)
+
+    # Unknown to Redis (or Redis down): the row is authoritative
     result = await db.execute(
         select(StreamSession).where(
             and_(
@@ -396,12 +442,18 @@ async def heartbeat_session(
         )
     )
     session = result.scalar_one_or_none()
-    if session is None:
+    now = datetime.now(timezone.utc)
+    abandoned_cutoff = now - timedelta(seconds=stream_counter.abandon_seconds)
+    if session is None or (stream_counter.enabled and session.last_heartbeat_at < abandoned_cutoff):
         raise HTTPException(status_code=404, detail="Session not found or already ended")
 
-    now = datetime.now(timezone.utc)
     session.last_heartbeat_at = now
     await db.commit()
+    if stream_counter.enabled:
+        try:
+            await stream_counter.restore(session)
+        except RedisError:
+            logger.warning("Could not restore stream session %s to Redis", session_id, exc_info=True)
     return {"last_heartbeat_at": now}
 
 
@@ -413,6 +465,14 @@ async def stop_stream_session(
 ):
     """End a stream session explicitly (frees the concurrent stream slot)."""
     from datetime import datetime, timezone
+
+    if stream_counter.enabled:
+        try:
+            if await stream_counter.end(user.id, session_id):
+                return
+        except RedisError:
+            logger.warning("Stream counter unavailable, using stream_sessions", exc_info=True)
+
     result = await db.execute(
         select(StreamSession).where(
             and_(
@@ -435,6 +495,32 @@ async def list_stream_sessions(
     user: CurrentUser,
 ):
     """List caller's active stream sessions (for 'stop a session' UI)."""
+    if stream_counter.enabled:
+        try:
+            active = await stream_counter.active_sessions(user.id)
+        except RedisError:
+            logger.warning("Stream counter unavailable, using stream_sessions", exc_info=True)
+        else:
+            title_ids = [s["title_id"] for s in active if s["title_id"]]
+            names = {}
+            if title_ids:
+                rows = await db.execute(
+                    text("SELECT id, title FROM titles WHERE id = ANY(:ids)").bindparams(
+                        ids=title_ids
+                    )
+                )
+                names = {r.id: r.title for r in rows.fetchall()}
+            return [
+                SessionListResponse(
+                    session_id=s["session_id"],
+                    title_id=s["title_id"],
+                    title_name=names.get(s["title_id"]),
+                    started_at=s["started_at"],
+                    last_heartbeat_at=s["last_heartbeat_at"],
+                )
+                for s in active
+            ]
+
     result = await db.execute(
         text(
             """
@@ -1,22 +1,31 @@
-"""Viewing time router — heartbeat, balance, session management, playback eligibility."""
+"""Viewing time router — heartbeat (single and batched), balance, session management, playback eligibility."""
 
 import logging
 import uuid
+from datetime import datetime, timedelta, timezone
 
 from fastapi import APIRouter, HTTPException
-from sqlalchemy import and_, select
+from redis.exceptions import RedisError
+from sqlalchemy import and_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.dependencies import DB, AccountOwner, CurrentUser
+from app.models.stream_sessions import StreamSession
 from app.models.user import Profile
 from app.schemas.viewing_time import (
     EnforcementStatus,
+    HeartbeatBatchItem,
+    HeartbeatBatchRequest,
+    HeartbeatBatchResponse,
     HeartbeatRequest,
     HeartbeatResponse,
     PlaybackEligibilityResponse,
     SessionEndResponse,
+    StreamHeartbeatItem,
     ViewingTimeBalanceResponse,
 )
 from app.services import viewing_time_service
+from app.services.stream_counter import stream_counter
 
 logger = logging.getLogger(__name__)
 
@@ -86,6 +95,114 @@ async def heartbeat(
         )
 
 
+@router.post("/heartbeat/batch", response_model=HeartbeatBatchResponse)
+async def heartbeat_batch(
+    body: HeartbeatBatchRequest,
+    db: DB,
+    user: CurrentUser,
+):
+    """Process several viewing-time and stream-session heartbeats at once.
+
+    Meant for clients multiplexing players (multi-view, several profiles on
+    one device).  Every item gets its own status; a failing item does not
+    fail the batch.  Viewing items fail closed like the single endpoint.
+    """
+    viewing: list[HeartbeatBatchItem] = []
+    if body.viewing:
+        # H-1: Verify every profile belongs to authenticated user (IDOR prevention)
+        owned_result = await db.execute(
+            select(Profile.id).where(
+                and_(
+                    Profile.id.in_({item.profile_id for item in body.viewing}),
+                    Profile.user_id == user.id,
+                )
+            )
+        )
+        owned = set(owned_result.scalars().all())
+        items = [item for item in body.viewing if item.profile_id in owned]
+        try:
+            processed = iter(await viewing_time_service.process_heartbeat_batch(db, items))
+        except Exception:
+            logger.exception("Heartbeat batch processing failed — returning blocked (fail-closed)")
+            await db.rollback()
+            processed = iter(
+                HeartbeatResponse(
+                    session_id=item.session_id or uuid.uuid4(),
+                    enforcement=EnforcementStatus.blocked,
+                    remaining_minutes=0,
+                    used_minutes=0,
+                    is_educational=False,
+                )
+                for item in items
+            )
+        for item in body.viewing:
+            if item.profile_id not in owned:
+                viewing.append(HeartbeatBatchItem(
+                    status=403, detail="Profile not found or access denied"
+                ))
+                continue
+            outcome = next(processed)
+            if isinstance(outcome, HTTPException):
+                viewing.append(HeartbeatBatchItem(status=outcome.status_code, detail=outcome.detail))
+            else:
+                viewing.append(HeartbeatBatchItem(status=200, heartbeat=outcome))
+
+    streams: list[StreamHeartbeatItem] = []
+    if body.streams:
+        beats = await _stream_heartbeats(db, user.id, list(dict.fromkeys(body.streams)))
+        for session_id in body.streams:
+            at = beats.get(session_id)
+            streams.append(StreamHeartbeatItem(
+                session_id=session_id, status=200 if at else 404, last_heartbeat_at=at
+            ))
+
+    return HeartbeatBatchResponse(viewing=viewing, streams=streams)
+
+
+async def _stream_heartbeats(
+    db: AsyncSession, user_id: uuid.UUID, session_ids: list[uuid.UUID]
+) -> dict[uuid.UUID, datetime | None]:
+    """Refresh stream sessions: one Redis round trip, one UPDATE for the rest."""
+    beats: dict[uuid.UUID, datetime | None] = dict.fromkeys(session_ids)
+    if stream_counter.enabled:
+        try:
+            beats.update(await stream_counter.heartbeat_many(user_id, session_ids))
+        except RedisError:
+            logger.warning("Stream counter unavailable, using stream_sessions", exc_info=True)
+
+    missing = [sid for sid, at in beats.items() if at is None]
+    if not missing:
+        return beats
+
+    # Unknown to Redis (or Redis down): the rows are authoritative
+    now = datetime.now(timezone.utc)
+    conditions = [
+        StreamSession.id.in_(missing),
+        StreamSession.user_id == user_id,
+        StreamSession.ended_at.is_(None),
+    ]
+    if stream_counter.enabled:
+        abandoned_cutoff = now - timedelta(seconds=stream_counter.abandon_seconds)
+        conditions.append(StreamSession.last_heartbeat_at >= abandoned_cutoff)
+    result = await db.execute(
+        update(StreamSession)
+        .where(and_(*conditions))
+        .values(last_heartbeat_at=now)
+        .returning(StreamSession)
+        .execution_options(synchronize_session=False)
+    )
+    refreshed = result.scalars().all()
+    await db.commit()
+    for session in refreshed:
+        beats[session.id] = now
+        if stream_counter.enabled:
+            try:
+                await stream_counter.restore(session)
+            except RedisError:
+                logger.warning("Could not restore stream session %s to Redis", session.id, exc_info=True)
+    return beats
+
+
 # ---------------------------------------------------------------------------
 # Session End
 # ---------------------------------------------------------------------------
@@ -86,10 +86,18 @@ class TitlePaginatedResponse(BaseModel):
     page_size: int
 
 
-class EmbeddingGenerationResponse(BaseModel):
-    """Result of a bulk embedding generation run."""
+class EmbeddingJobResponse(BaseModel):
+    """Status and progress of a batched embedding generation job."""
 
-    new_embeddings_created: int
+    job_id: uuid.UUID
+    status: str
+    mode: str
+    total_titles: int
+    processed: int
+    submitted_at: datetime
+    started_at: datetime | None = None
+    completed_at: datetime | None = None
+    error_message: str | None = None
 
 
 # ---------------------------------------------------------------------------
@@ -103,6 +111,9 @@ class HeartbeatMetrics(BaseModel):
     avg_duration_ms: float
     max_duration_ms: float
     p95_duration_ms: float = 0.0
+    flushes: int = 0
+    flushed_rows: int = 0
+    avg_flush_db_ops_per_heartbeat: float = 0.0
 
 
 class CacheMetrics(BaseModel):
@@ -114,9 +125,16 @@ class CacheMetrics(BaseModel):
     max_size: int
 
 
+class QueryEmbeddingCacheMetrics(CacheMetrics):
+    redis_hits: int
+    encode_batches: int
+    avg_batch_size: float
+
+
 class PerformanceMetricsResponse(BaseModel):
     """Response for GET /api/v1/admin/metrics."""
 
     uptime_seconds: float
     heartbeat: HeartbeatMetrics
     config_cache: CacheMetrics
+    query_embedding_cache: QueryEmbeddingCacheMetrics
@@ -116,6 +116,13 @@ class PaginatedResponse(BaseModel, Generic[T]):
 # ── Semantic search schemas ──────────────────────────────────────────────────
 
 
+class MatchHighlights(BaseModel):
+    """Keyword match evidence; matched terms in ``synopsis`` are wrapped in <mark>."""
+
+    synopsis: str | None = None
+    cast: list[str] = []
+
+
 class SearchResultItem(BaseModel):
     """A content title enriched with search match metadata."""
 
@@ -133,9 +140,18 @@ class SearchResultItem(BaseModel):
     genres: list[str] = []
     match_reason: str
     match_type: str
+    highlights: MatchHighlights | None = None
     similarity_score: float | None = None
 
 
+class SearchLegMeta(BaseModel):
+    """Outcome of one hybrid-search leg (keyword or semantic)."""
+
+    status: str  # ok | timeout | error | skipped
+    latency_ms: float
+    hits: int
+
+
 class SemanticSearchResponse(BaseModel):
     """Response wrapper for the semantic search endpoint."""
 
@@ -143,6 +159,24 @@ class SemanticSearchResponse(BaseModel):
     total: int
     query: str
     mode: str
+    legs: dict[str, SearchLegMeta] = {}
+    cached: bool = False
+
+
+# ── Autocomplete schemas ─────────────────────────────────────────────────────
+
+
+class SuggestionItem(BaseModel):
+    """One search-as-you-type completion."""
+
+    text: str
+    kind: str  # title | person | genre
+    title_id: uuid.UUID | None = None
+
+
+class SuggestResponse(BaseModel):
+    query: str
+    items: list[SuggestionItem]
 
 
 # ── Entitlement / access schemas (Feature 012) ───────────────────────────────
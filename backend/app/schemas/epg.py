@@ -1,9 +1,11 @@
 """Pydantic schemas for EPG (Electronic Program Guide) endpoints."""
 
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+from app.config import settings
 
 
 # -- Response schemas ---------------------------------------------------------
@@ -54,6 +56,21 @@ class NowPlayingResponse(BaseModel):
     next_program: ScheduleEntryResponse | None = None
 
 
+class EpgGridRow(BaseModel):
+    """One channel's programmes within the requested grid window."""
+
+    channel: ChannelResponse
+    entries: list[ScheduleEntryResponse]
+
+
+class EpgGridResponse(BaseModel):
+    """Schedule grid for many channels over a time window."""
+
+    start: datetime
+    end: datetime
+    channels: list[EpgGridRow]
+
+
 # -- Request schemas ----------------------------------------------------------
 
 
@@ -79,6 +96,17 @@ class ChannelUpdateRequest(BaseModel):
     hls_live_url: str | None = None
 
 
+def check_programme_times(start_time: datetime, end_time: datetime) -> None:
+    """Raise ValueError unless the programme ends after it starts and within
+    ``schedule_max_programme_hours`` (time-range lookups rely on that bound)."""
+    if end_time <= start_time:
+        raise ValueError("end_time must be after start_time")
+    if end_time - start_time > timedelta(hours=settings.schedule_max_programme_hours):
+        raise ValueError(
+            f"Programmes may last at most {settings.schedule_max_programme_hours} hours"
+        )
+
+
 class ScheduleEntryCreateRequest(BaseModel):
     """Create a schedule entry (admin)."""
 
@@ -95,6 +123,11 @@ class ScheduleEntryCreateRequest(BaseModel):
     season_number: int | None = None
     episode_number: int | None = None
 
+    @model_validator(mode="after")
+    def validate_times(self) -> "ScheduleEntryCreateRequest":
+        check_programme_times(self.start_time, self.end_time)
+        return self
+
 
 class ScheduleEntryUpdateRequest(BaseModel):
     """Update a schedule entry (admin)."""
@@ -110,3 +143,10 @@ class ScheduleEntryUpdateRequest(BaseModel):
     series_title: str | None = None
     season_number: int | None = None
     episode_number: int | None = None
+
+    @model_validator(mode="after")
+    def validate_times(self) -> "ScheduleEntryUpdateRequest":
+        # Partial updates are checked against the stored entry by the endpoint
+        if self.start_time is not None and self.end_time is not None:
+            check_programme_times(self.start_time, self.end_time)
+        return self
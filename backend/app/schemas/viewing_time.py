@@ -55,6 +55,30 @@ class HeartbeatResponse(BaseModel):
     is_educational: bool
 
 
+# -- Batched heartbeats --
+
+class HeartbeatBatchRequest(BaseModel):
+    viewing: list[HeartbeatRequest] = Field(default_factory=list, max_length=100)
+    streams: list[uuid.UUID] = Field(default_factory=list, max_length=100)
+
+
+class HeartbeatBatchItem(BaseModel):
+    status: int
+    detail: str | None = None
+    heartbeat: HeartbeatResponse | None = None
+
+
+class StreamHeartbeatItem(BaseModel):
+    session_id: uuid.UUID
+    status: int
+    last_heartbeat_at: datetime | None = None
+
+
+class HeartbeatBatchResponse(BaseModel):
+    viewing: list[HeartbeatBatchItem]
+    streams: list[StreamHeartbeatItem]
+
+
 # -- Session End --
 
 class SessionEndResponse(BaseModel):
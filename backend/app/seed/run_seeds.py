@@ -136,8 +136,12 @@ async def main(include_embeddings: bool = False) -> None:
         start = time.monotonic()
         from app.seed.seed_embeddings import seed_embeddings
 
+        from app.services.embedding_service import rebuild_title_neighbors
+
         async with async_session_factory() as session:
             embed_counts = await seed_embeddings(session)
+            if embed_counts.get("embeddings"):
+                await rebuild_title_neighbors(session)
         elapsed = time.monotonic() - start
         print(f"  Done in {elapsed:.1f}s.")
 
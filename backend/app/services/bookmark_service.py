@@ -48,6 +48,10 @@ async def upsert_bookmark(
     use_furthest_position = content_type in tstv_types
 
     if bookmark is None:
+        # A new bookmark is the only case that changes the profile's taste vector.
+        from app.services import recommendation_service
+
+        old_weight = await recommendation_service.get_title_weight(db, profile_id, content_id)
         bookmark = Bookmark(
             profile_id=profile_id,
             content_type=content_type,
@@ -57,6 +61,8 @@ async def upsert_bookmark(
             completed=completed,
         )
         db.add(bookmark)
+        await db.flush()
+        await recommendation_service.update_taste_vector(db, profile_id, content_id, old_weight)
     else:
         if use_furthest_position:
             bookmark.position_seconds = max(bookmark.position_seconds, position_seconds)
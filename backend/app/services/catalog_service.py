@@ -2,12 +2,12 @@
 
 import uuid
 
-from sqlalchemy import exists, func, or_, select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.models.catalog import Episode, Genre, Season, Title, TitleCast, TitleGenre
-from app.services.search_service import escape_like
+from app.models.catalog import Episode, Genre, Season, Title, TitleGenre
+from app.services.search_service import keyword_filter
 
 
 async def get_titles(
@@ -23,7 +23,8 @@ async def get_titles(
     """Return a paginated, optionally filtered list of titles.
 
     Supports filtering by genre slug, title type (movie/series), and free-text
-    search across title and synopsis_short using ILIKE.
+    search via ``search_service.keyword_filter`` (ranked when the full-text
+    backend is enabled).
     """
     base = select(Title).options(
         selectinload(Title.genres).selectinload(TitleGenre.genre),
@@ -48,29 +49,20 @@ async def get_titles(
         base = base.where(Title.title_type == title_type)
         count_q = count_q.where(Title.title_type == title_type)
 
+    order_by = (Title.title,)
     if search_query:
-        pattern = f"%{escape_like(search_query)}%"
-        cast_match = exists(
-            select(TitleCast.id).where(
-                TitleCast.title_id == Title.id,
-                TitleCast.person_name.ilike(pattern),
-            )
-        )
-        search_filter = or_(
-            Title.title.ilike(pattern),
-            Title.synopsis_short.ilike(pattern),
-            Title.synopsis_long.ilike(pattern),
-            cast_match,
-        )
+        search_filter, rank = keyword_filter(search_query)
         base = base.where(search_filter)
         count_q = count_q.where(search_filter)
+        if rank is not None:
+            order_by = (rank.desc(), Title.title)
 
     # Total count
     total = (await db.execute(count_q)).scalar_one()
 
     # Paginated results
     offset = (page - 1) * page_size
-    query = base.order_by(Title.title).offset(offset).limit(page_size)
+    query = base.order_by(*order_by).offset(offset).limit(page_size)
     result = await db.execute(query)
     titles = list(result.scalars().unique())
 
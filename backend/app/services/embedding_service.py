@@ -1,13 +1,21 @@
 """Service for generating and managing content embeddings via sentence-transformers."""
 
+import asyncio
+import hashlib
 import logging
+import multiprocessing
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import delete, select, text
+from sqlalchemy import bindparam, func, or_, select, text, true, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.models.catalog import Title, TitleGenre
-from app.models.embedding import ContentEmbedding
+from app.models.catalog import Title
+from app.models.embedding import ContentEmbedding, EmbeddingJob
 
 logger = logging.getLogger(__name__)
 
@@ -53,60 +61,494 @@ def _build_embedding_text(title: Title, genre_names: list[str], cast_names: list
     return " ".join(parts)
 
 
-async def generate_all_embeddings(db: AsyncSession, *, regenerate: bool = False) -> int:
-    """Generate embeddings for every Title that does not yet have one.
+# ---------------------------------------------------------------------------
+# Batch pipeline
+# ---------------------------------------------------------------------------
 
-    If *regenerate* is True, delete all existing embeddings first so every
-    title gets a fresh embedding (useful after changing the text composition).
+# Encoder processes, created on first batch run.  Each worker loads its own
+# copy of the model so inference never runs on the event loop.
+_pool: ProcessPoolExecutor | None = None
 
-    Returns the count of newly created embeddings.
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.embedding_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=get_model,
+        )
+    return _pool
+
+
+def shutdown_embedding_pool() -> None:
+    """Terminate the encoder processes (called on application shutdown)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _encode_batch(texts: list[str], batch_size: int) -> list[list[float]]:
+    """Encode *texts* in a worker process."""
+    vectors = get_model().encode(texts, batch_size=batch_size, normalize_embeddings=True)
+    return vectors.tolist()
+
+
+async def _encode_texts(texts: list[str]) -> list[list[float]]:
+    """Split *texts* across the encoder processes and encode them in parallel."""
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    size = settings.embedding_batch_size
+    batches = [texts[i:i + size] for i in range(0, len(texts), size)]
+    results = await asyncio.gather(
+        *(loop.run_in_executor(pool, _encode_batch, batch, size) for batch in batches)
+    )
+    return [vector for batch in results for vector in batch]
+
+
+def embedding_text_hash(embedding_text: str) -> str:
+    """Fingerprint of the text an embedding was built from."""
+    return hashlib.sha256(embedding_text.encode()).hexdigest()
+
+
+# Generation modes:
+#   missing    — titles without an embedding
+#   refresh    — additionally, titles whose text hash or model version changed
+#   regenerate — every title, re-encoded in place
+EMBEDDING_MODES = ("missing", "refresh", "regenerate")
+
+
+def _candidate_filter(mode: str, refresh_before: datetime | None):
+    """SQL pre-filter on candidate titles; refresh mode also compares hashes in Python."""
+    missing = ContentEmbedding.title_id.is_(None)
+    if mode == "missing":
+        return missing
+    if mode == "regenerate":
+        return or_(missing, ContentEmbedding.created_at < refresh_before)
+    return true()
+
+
+async def _count_candidates(
+    db: AsyncSession, mode: str, refresh_before: datetime | None
+) -> int:
+    result = await db.execute(
+        select(func.count(Title.id))
+        .outerjoin(ContentEmbedding, ContentEmbedding.title_id == Title.id)
+        .where(_candidate_filter(mode, refresh_before))
+    )
+    return result.scalar_one()
+
+
+async def _fetch_candidates(
+    db: AsyncSession,
+    mode: str,
+    refresh_before: datetime | None,
+    after_id: uuid.UUID | None,
+    limit: int,
+    title_ids: list[uuid.UUID] | None,
+) -> list:
+    """Next chunk of (Title, stored hash, stored model) rows in id order."""
+    stmt = (
+        select(Title, ContentEmbedding.content_hash, ContentEmbedding.model_version)
+        .outerjoin(ContentEmbedding, ContentEmbedding.title_id == Title.id)
+        .where(_candidate_filter(mode, refresh_before))
+        .order_by(Title.id)
+        .limit(limit)
+    )
+    if after_id is not None:
+        stmt = stmt.where(Title.id > after_id)
+    if title_ids is not None:
+        stmt = stmt.where(Title.id.in_(title_ids))
+    return list((await db.execute(stmt)).all())
+
+
+async def _build_texts(db: AsyncSession, titles: list[Title]) -> list[str]:
+    """Build embedding text for *titles* with one genre and one cast query."""
+    title_ids = [t.id for t in titles]
+
+    genre_q = await db.execute(
+        text(
+            "SELECT tg.title_id, g.name FROM title_genres tg "
+            "JOIN genres g ON g.id = tg.genre_id "
+            "WHERE tg.title_id IN :ids ORDER BY tg.title_id, g.name"
+        ).bindparams(bindparam("ids", expanding=True)),
+        {"ids": title_ids},
+    )
+    genres: dict[uuid.UUID, list[str]] = {}
+    for title_id, name in genre_q.fetchall():
+        genres.setdefault(title_id, []).append(name)
+
+    cast_q = await db.execute(
+        text(
+            "SELECT title_id, person_name FROM title_cast "
+            "WHERE title_id IN :ids ORDER BY title_id, sort_order"
+        ).bindparams(bindparam("ids", expanding=True)),
+        {"ids": title_ids},
+    )
+    cast: dict[uuid.UUID, list[str]] = {}
+    for title_id, name in cast_q.fetchall():
+        cast.setdefault(title_id, []).append(name)
+
+    return [
+        _build_embedding_text(t, genres.get(t.id, []), cast.get(t.id, []))
+        for t in titles
+    ]
+
+
+async def _upsert_embeddings(
+    db: AsyncSession,
+    title_ids: list[uuid.UUID],
+    vectors: list[list[float]],
+    hashes: list[str],
+) -> None:
+    stmt = pg_insert(ContentEmbedding).values([
+        {
+            "title_id": tid,
+            "embedding": vec,
+            "model_version": settings.embedding_model,
+            "content_hash": content_hash,
+        }
+        for tid, vec, content_hash in zip(title_ids, vectors, hashes)
+    ])
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[ContentEmbedding.title_id],
+            set_={
+                "embedding": stmt.excluded.embedding,
+                "model_version": stmt.excluded.model_version,
+                "content_hash": stmt.excluded.content_hash,
+                "created_at": func.now(),
+            },
+        )
+    )
+
+
+async def invalidate_taste_vectors(db: AsyncSession, title_ids: list[uuid.UUID]) -> None:
+    """Drop stored taste vectors of profiles that interacted with *title_ids*.
+
+    Called when those titles' embeddings are first written or replaced (the
+    stored sums hold the old embedding, or none) and before the titles are
+    deleted.  recommendation_service rebuilds them lazily on the next read.
+    Does not commit.
     """
-    if regenerate:
-        await db.execute(delete(ContentEmbedding))
-        await db.flush()
+    await db.execute(
+        text(
+            """
+            DELETE FROM profile_embeddings WHERE profile_id IN (
+                SELECT profile_id FROM bookmarks WHERE content_id IN :ids
+                UNION SELECT profile_id FROM ratings WHERE title_id IN :ids
+                UNION SELECT profile_id FROM watchlist WHERE title_id IN :ids
+            )
+            """
+        ).bindparams(bindparam("ids", expanding=True)),
+        {"ids": title_ids},
+    )
+
+
+async def generate_all_embeddings(
+    db: AsyncSession,
+    *,
+    mode: str = "missing",
+    title_ids: list[uuid.UUID] | None = None,
+    job: EmbeddingJob | None = None,
+) -> int:
+    """Generate embeddings for titles selected by *mode* (see EMBEDDING_MODES).
+
+    Titles are walked in id order in chunks of
+    ``embedding_batch_size * embedding_workers``: one genre and one cast query
+    per chunk, encoding spread over the encoder process pool, and a single
+    ``INSERT ... ON CONFLICT`` write.  Each chunk is committed on its own, so
+    an interrupted run picks up where it stopped.
+
+    Every embedding stores a hash of its source text; ``refresh`` re-encodes
+    only titles whose text or model changed since.  ``regenerate`` re-encodes
+    every embedding created before the run started (or before *job* was
+    submitted) in place; existing rows keep serving until overwritten.
+    *title_ids* restricts the run to those titles.
+
+    When *job* is given, its ``processed`` counter is advanced by the number
+    of titles examined in each chunk and its heartbeat is refreshed.
+
+    Returns the count of embeddings written.
+    """
+    if mode not in EMBEDDING_MODES:
+        raise ValueError(f"Unknown embedding mode: {mode}")
+
+    refresh_before: datetime | None = None
+    if mode == "regenerate":
+        refresh_before = job.submitted_at if job else (await db.execute(select(func.now()))).scalar_one()
+
+    chunk_size = settings.embedding_batch_size * settings.embedding_workers
+    after_id: uuid.UUID | None = None
+    written = 0
+    while True:
+        rows = await _fetch_candidates(db, mode, refresh_before, after_id, chunk_size, title_ids)
+        if not rows:
+            break
+        after_id = rows[-1][0].id
+
+        texts = await _build_texts(db, [r[0] for r in rows])
+        changed = [
+            (row[0].id, embedding_text, embedding_text_hash(embedding_text))
+            for row, embedding_text in zip(rows, texts)
+            if mode != "refresh"
+            or row.content_hash != embedding_text_hash(embedding_text)
+            or row.model_version != settings.embedding_model
+        ]
+        if changed:
+            ids = [c[0] for c in changed]
+            vectors = await _encode_texts([c[1] for c in changed])
+            await _upsert_embeddings(db, ids, vectors, [c[2] for c in changed])
+            await invalidate_taste_vectors(db, ids)
+            written += len(changed)
+        if job is not None:
+            job.processed += len(rows)
+            job.heartbeat_at = datetime.now(timezone.utc)
+        await db.commit()
+        logger.info("Embedded %d of %d examined titles (%d this run)", len(changed), len(rows), written)
+
+    logger.info("Generated %d embeddings (mode=%s)", written, mode)
+    return written
+
+
+async def refresh_title_embeddings(title_ids: list[uuid.UUID]) -> None:
+    """Re-embed *title_ids* if their text changed and refresh their neighbour lists.
 
-    # Find titles without embeddings.
-    existing_ids_q = select(ContentEmbedding.title_id)
+    Scheduled as a background task by admin title create/update.
+    """
+    from app.database import async_session_factory
+
+    async with async_session_factory() as db:
+        try:
+            written = await generate_all_embeddings(db, mode="refresh", title_ids=title_ids)
+            if written:
+                from app.services.search_cache import search_cache
+
+                await refresh_title_neighbors(db, title_ids)
+                await search_cache.bump_catalog_version()
+        except Exception:
+            logger.exception("Embedding refresh failed for %s", title_ids)
+
+
+async def _active_embedding_job(db: AsyncSession) -> EmbeddingJob | None:
     result = await db.execute(
-        select(Title).where(Title.id.notin_(existing_ids_q))
+        select(EmbeddingJob)
+        .where(EmbeddingJob.status.in_(("pending", "running")))
+        .order_by(EmbeddingJob.submitted_at)
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def create_embedding_job(
+    db: AsyncSession, *, mode: str = "missing"
+) -> tuple[EmbeddingJob, bool]:
+    """Insert a pending EmbeddingJob, or return the one already in progress.
+
+    Returns ``(job, created)``.  The partial unique index
+    ``uq_embedding_jobs_active`` admits one pending or running job, so two
+    concurrent submissions cannot both insert; the loser gets the winner's job.
+    """
+    active = await _active_embedding_job(db)
+    if active is not None:
+        return active, False
+
+    job = EmbeddingJob(mode=mode, status="pending")
+    db.add(job)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        active = await _active_embedding_job(db)
+        if active is None:
+            raise
+        return active, False
+    await db.refresh(job)
+    return job, True
+
+
+def _claimable(stale_before: datetime):
+    """Jobs nobody is working on: pending, or running with a stale heartbeat."""
+    return or_(
+        EmbeddingJob.status == "pending",
+        (EmbeddingJob.status == "running")
+        & (func.coalesce(EmbeddingJob.heartbeat_at, EmbeddingJob.started_at) < stale_before),
     )
-    titles_without_embeddings = result.scalars().all()
-
-    if not titles_without_embeddings:
-        return 0
-
-    created = 0
-    for title in titles_without_embeddings:
-        # Fetch genre names for this title.
-        genre_q = await db.execute(
-            text(
-                "SELECT g.name FROM genres g "
-                "JOIN title_genres tg ON tg.genre_id = g.id "
-                "WHERE tg.title_id = :tid"
-            ).bindparams(tid=title.id)
+
+
+async def _claim_embedding_job(db: AsyncSession, job_id: uuid.UUID) -> bool:
+    """Atomically mark *job_id* running if it is unclaimed; True when this caller won."""
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        update(EmbeddingJob)
+        .where(
+            EmbeddingJob.id == job_id,
+            _claimable(now - timedelta(seconds=settings.embedding_job_stale_seconds)),
         )
-        genre_names = [row[0] for row in genre_q.fetchall()]
-
-        # Fetch cast names for this title.
-        cast_q = await db.execute(
-            text(
-                "SELECT person_name FROM title_cast "
-                "WHERE title_id = :tid ORDER BY sort_order"
-            ).bindparams(tid=title.id)
+        .values(
+            status="running",
+            started_at=func.coalesce(EmbeddingJob.started_at, now),
+            heartbeat_at=now,
+            processed=0,
         )
-        cast_names = [row[0] for row in cast_q.fetchall()]
+        .returning(EmbeddingJob.id)
+    )
+    claimed = result.scalar_one_or_none() is not None
+    await db.commit()
+    return claimed
 
-        embedding_text = _build_embedding_text(title, genre_names, cast_names)
-        vector = generate_embedding(embedding_text)
 
-        embedding_row = ContentEmbedding(
-            title_id=title.id,
-            embedding=vector,
-            model_version=settings.embedding_model,
-        )
-        db.add(embedding_row)
-        created += 1
+async def run_embedding_job(job_id: uuid.UUID) -> None:
+    """Execute (or resume) an embedding job on its own session.
+
+    The job is claimed with a conditional ``UPDATE``; if another process
+    already claimed it (or its heartbeat is still fresh) this returns without
+    doing anything.
+    """
+    from app.database import async_session_factory
+
+    async with async_session_factory() as db:
+        if not await _claim_embedding_job(db, job_id):
+            return
+        job = await db.get(EmbeddingJob, job_id, populate_existing=True)
+        if job is None:
+            return
+        try:
+            # Chunks are walked from the start again on resume; already
+            # written titles drop out of the candidate filter (or, in refresh
+            # mode, match their stored hash), so progress restarts from zero.
+            refresh_before = job.submitted_at if job.mode == "regenerate" else None
+            job.total_titles = await _count_candidates(db, job.mode, refresh_before)
+            await db.commit()
+
+            written = await generate_all_embeddings(db, mode=job.mode, job=job)
+            if written:
+                from app.services.search_cache import search_cache
+
+                job.heartbeat_at = datetime.now(timezone.utc)
+                await db.commit()
+                await rebuild_title_neighbors(db)
+                await search_cache.bump_catalog_version()
+
+            job.status = "complete"
+            job.completed_at = datetime.now(timezone.utc)
+            await db.commit()
+        except Exception as exc:
+            logger.exception("Embedding job %s failed", job_id)
+            await db.rollback()
+            job = await db.get(EmbeddingJob, job_id)
+            if job is not None:
+                job.status = "failed"
+                job.error_message = str(exc)[:500]
+                job.completed_at = datetime.now(timezone.utc)
+                await db.commit()
 
+
+async def resume_embedding_jobs() -> None:
+    """Periodically resume jobs no live process is working on.
+
+    Pending jobs whose background task never ran and running jobs whose
+    heartbeat is older than ``embedding_job_stale_seconds`` are claimed and
+    run here; jobs another process is actively advancing are left alone.
+    Runs until cancelled, polling every ``embedding_job_stale_seconds``.
+    """
+    from app.database import async_session_factory
+
+    stale = timedelta(seconds=settings.embedding_job_stale_seconds)
+    while True:
+        try:
+            async with async_session_factory() as db:
+                now = datetime.now(timezone.utc)
+                result = await db.execute(
+                    select(EmbeddingJob.id)
+                    .where(
+                        _claimable(now - stale),
+                        # Leave fresh pending jobs to the request that queued them
+                        (EmbeddingJob.status == "running") | (EmbeddingJob.submitted_at < now - stale),
+                    )
+                    .order_by(EmbeddingJob.submitted_at)
+                )
+                job_ids = list(result.scalars().all())
+
+            for job_id in job_ids:
+                logger.info("Resuming embedding job %s", job_id)
+                await run_embedding_job(job_id)
+            await asyncio.sleep(settings.embedding_job_stale_seconds)
+        except asyncio.CancelledError:
+            break
+        except Exception:
+            logger.exception("Embedding job resume failed")
+            await asyncio.sleep(settings.embedding_job_stale_seconds)
+
+
+# ---------------------------------------------------------------------------
+# Precomputed similar-title neighbours
+# ---------------------------------------------------------------------------
+
+# Neighbours stored per title.  Parental filtering happens at read time, so
+# this is deeper than any single rail to leave headroom for restricted tiers.
+TITLE_NEIGHBOR_DEPTH = settings.title_neighbor_depth
+
+
+_NEIGHBORS_INSERT = """
+    INSERT INTO title_neighbors (title_id, rank, neighbor_id, similarity)
+    SELECT src.title_id,
+           ROW_NUMBER() OVER (PARTITION BY src.title_id ORDER BY nn.distance),
+           nn.title_id,
+           1 - nn.distance
+    FROM content_embeddings src
+    CROSS JOIN LATERAL (
+        SELECT ce.title_id, ce.embedding <=> src.embedding AS distance
+        FROM content_embeddings ce
+        WHERE ce.title_id != src.title_id
+        ORDER BY ce.embedding <=> src.embedding
+        LIMIT :depth
+    ) nn
+"""
+
+
+async def rebuild_title_neighbors(db: AsyncSession, *, depth: int = TITLE_NEIGHBOR_DEPTH) -> int:
+    """Recompute the top-*depth* cosine neighbours of every embedded title.
+
+    Runs one HNSW-backed kNN per title inside a single statement and replaces
+    the whole ``title_neighbors`` table in one transaction, so readers see
+    either the old or the new neighbour lists, never a mix.  Must be re-run
+    whenever embeddings change.  Returns the number of rows written.
+    """
+    from app.services.vector_index import set_ef_search
+
+    # HNSW returns at most ef_search candidates per scan.
+    await set_ef_search(db, max(settings.vector_ef_search, depth * 2))
+    await db.execute(text("DELETE FROM title_neighbors"))
+    result = await db.execute(text(_NEIGHBORS_INSERT).bindparams(depth=depth))
+    await db.commit()
+    logger.info("Rebuilt title neighbours: %d rows (depth=%d)", result.rowcount, depth)
+    return result.rowcount
+
+
+async def refresh_title_neighbors(
+    db: AsyncSession, title_ids: list[uuid.UUID], *, depth: int = TITLE_NEIGHBOR_DEPTH
+) -> int:
+    """Recompute the neighbour lists of *title_ids* only.
+
+    Other titles' lists still reflect the previous embeddings of *title_ids*
+    until the next full rebuild.  Returns the number of rows written.
+    """
+    from app.services.vector_index import set_ef_search
+
+    await set_ef_search(db, max(settings.vector_ef_search, depth * 2))
+    await db.execute(
+        text("DELETE FROM title_neighbors WHERE title_id IN :ids").bindparams(
+            bindparam("ids", expanding=True)
+        ),
+        {"ids": title_ids},
+    )
+    result = await db.execute(
+        text(_NEIGHBORS_INSERT + "    WHERE src.title_id IN :ids\n").bindparams(
+            bindparam("ids", expanding=True), depth=depth
+        ),
+        {"ids": title_ids},
+    )
     await db.commit()
-    logger.info("Generated %d new embeddings", created)
-    return created
+    return result.rowcount
@@ -2,49 +2,167 @@
 
 Design decisions (see specs/012-entitlements-tvod/plan.md for full rationale):
 - check_access_cached: fail-closed on Redis/DB errors (deny access rather than grant)
-- Rental TTL = min(300, seconds_until_expiry) to satisfy SC-003 (60s expiry propagation)
-- get_access_options: direct DB queries (no Redis cache) — returns rich data that the
-  bool cache can't provide; two indexed queries are fast enough at PoC scale
+- Per-user entitlement snapshot (packages, owned titles, rentals with expiry) cached as
+  one Redis key; expiry is checked at read time, which satisfies SC-003 exactly
+- SVOD membership: in-process package index (package_index), refreshed by the admin
+  package endpoints; package_contents is only queried before the first build
+- get_access_options / get_access_options_bulk: offers come straight from the DB, user
+  entitlements from the snapshot; a page of titles is resolved in one set-based query
 - free offer access: direct TitleOffer lookup — no UserEntitlement row is created
-- invalidate_entitlement_cache: SCAN+DELETE has ~100ms consistency window (acceptable
-  for PoC); production would use Lua script for atomic scan-and-delete
+- invalidate_entitlement_cache: per-user version bump + single DEL — no keyspace SCAN
 """
 
+import json
 import logging
 import uuid
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 
 import redis.asyncio
 from sqlalchemy import and_, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.models.entitlement import ContentPackage, PackageContent, TitleOffer, UserEntitlement
 from app.models.stream_sessions import StreamSession
 from app.schemas.catalog import AccessOption, UserAccess
+from app.services.package_index import package_index
 
 logger = logging.getLogger(__name__)
 
-_CACHE_KEY = "ent:{user_id}:{title_id}"
-_CACHE_TTL_DEFAULT = 300  # seconds
+_SNAPSHOT_TTL = 300  # seconds — safety net; invalidation bumps the version
 
 
 # ── Internal helpers ──────────────────────────────────────────────────────────
 
 
-def _cache_key(user_id: uuid.UUID, title_id: uuid.UUID) -> str:
-    return f"ent:{user_id}:{title_id}"
+def _snapshot_key(user_id: uuid.UUID) -> str:
+    return f"entsnap:{user_id}"
 
 
-def _user_glob(user_id: uuid.UUID) -> str:
-    return f"ent:{user_id}:*"
+def _version_key(user_id: uuid.UUID) -> str:
+    return f"entver:{user_id}"
 
 
-async def _raw_check_access(
+def _is_active(expires_at: datetime | None, now: datetime) -> bool:
+    return expires_at is None or expires_at > now
+
+
+@dataclass(slots=True)
+class EntitlementSnapshot:
+    """Everything needed to answer access checks for one user.
+
+    - ``packages``: subscribed package_id → expires_at (None = open-ended)
+    - ``owned``: title_ids bought outright
+    - ``rentals``: title_id → latest rental expires_at
+
+    Expiry is stored rather than pre-filtered, so a rental or subscription
+    stops granting access at its exact expiry even while the snapshot is cached.
+    """
+
+    version: str = "0"
+    packages: dict[uuid.UUID, datetime | None] = field(default_factory=dict)
+    owned: set[uuid.UUID] = field(default_factory=set)
+    rentals: dict[uuid.UUID, datetime] = field(default_factory=dict)
+
+    def active_packages(self, now: datetime) -> set[uuid.UUID]:
+        return {pid for pid, exp in self.packages.items() if _is_active(exp, now)}
+
+    def rental_expiry(self, title_id: uuid.UUID, now: datetime) -> datetime | None:
+        expires_at = self.rentals.get(title_id)
+        return expires_at if expires_at is not None and expires_at > now else None
+
+    def dumps(self) -> str:
+        return json.dumps({
+            "v": self.version,
+            "p": {str(k): v.isoformat() if v else None for k, v in self.packages.items()},
+            "o": [str(t) for t in self.owned],
+            "r": {str(k): v.isoformat() for k, v in self.rentals.items()},
+        })
+
+    @classmethod
+    def loads(cls, raw: str) -> "EntitlementSnapshot":
+        data = json.loads(raw)
+        return cls(
+            version=data["v"],
+            packages={
+                uuid.UUID(k): datetime.fromisoformat(v) if v else None
+                for k, v in data["p"].items()
+            },
+            owned={uuid.UUID(t) for t in data["o"]},
+            rentals={uuid.UUID(k): datetime.fromisoformat(v) for k, v in data["r"].items()},
+        )
+
+
+async def _load_snapshot(
+    user_id: uuid.UUID, db: AsyncSession, version: str = "0"
+) -> EntitlementSnapshot:
+    """Build a user's snapshot from all their currently active entitlements (one query)."""
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        select(UserEntitlement).where(
+            and_(
+                UserEntitlement.user_id == user_id,
+                (UserEntitlement.expires_at.is_(None)) | (UserEntitlement.expires_at > now),
+            )
+        )
+    )
+    snapshot = EntitlementSnapshot(version=version)
+    for ent in result.scalars().all():
+        if ent.source_type == "subscription" and ent.package_id is not None:
+            current = snapshot.packages.get(ent.package_id, now)
+            if ent.expires_at is None or current is None:
+                snapshot.packages[ent.package_id] = None
+            else:
+                snapshot.packages[ent.package_id] = max(current, ent.expires_at)
+        elif ent.source_type == "tvod" and ent.title_id is not None:
+            if ent.expires_at is None:
+                snapshot.owned.add(ent.title_id)
+            else:
+                current = snapshot.rentals.get(ent.title_id)
+                if current is None or ent.expires_at > current:
+                    snapshot.rentals[ent.title_id] = ent.expires_at
+    return snapshot
+
+
+async def get_entitlement_snapshot(
     user_id: uuid.UUID,
+    db: AsyncSession,
+    redis: redis.asyncio.Redis,
+) -> EntitlementSnapshot:
+    """Return the user's entitlement snapshot, from Redis when current.
+
+    The snapshot is tagged with the user's version counter read *before* the
+    DB load, so a concurrent invalidation leaves a stale-tagged entry that the
+    next read ignores.  Redis errors fall back to the DB; DB errors propagate.
+    """
+    version = "0"
+    try:
+        raw, current = await redis.mget(_snapshot_key(user_id), _version_key(user_id))
+        version = current or "0"
+        if raw is not None:
+            snapshot = EntitlementSnapshot.loads(raw)
+            if snapshot.version == version:
+                return snapshot
+    except Exception as exc:
+        logger.warning("Redis read failed for entitlement snapshot of user %s: %s", user_id, exc)
+
+    snapshot = await _load_snapshot(user_id, db, version)
+
+    try:
+        await redis.set(_snapshot_key(user_id), snapshot.dumps(), ex=_SNAPSHOT_TTL)
+    except Exception as exc:
+        logger.warning("Redis write failed for entitlement snapshot of user %s: %s", user_id, exc)
+
+    return snapshot
+
+
+async def _resolve_access(
+    snapshot: EntitlementSnapshot,
     title_id: uuid.UUID,
     db: AsyncSession,
 ) -> tuple[bool, str | None, datetime | None]:
-    """Check access and return (has_access, access_type, expires_at).
+    """Check access against a snapshot and return (has_access, access_type, expires_at).
 
     Access paths (in priority order):
     1. SVOD: active subscription entitlement whose package contains the title
@@ -54,71 +172,43 @@ async def _raw_check_access(
     """
     now = datetime.now(timezone.utc)
 
-    # 1. SVOD — subscription package membership
-    svod_result = await db.execute(
-        select(UserEntitlement).where(
-            and_(
-                UserEntitlement.user_id == user_id,
-                UserEntitlement.source_type == "subscription",
-                UserEntitlement.package_id.is_not(None),
-                (UserEntitlement.expires_at.is_(None)) | (UserEntitlement.expires_at > now),
-            )
-        )
-    )
-    svod_entitlements = svod_result.scalars().all()
-
-    for ent in svod_entitlements:
+    # 1. SVOD — in-process membership index; package_contents until it is built
+    # or for a package created since the last build
+    active_packages = snapshot.active_packages(now)
+    if active_packages and package_index.ready and package_index.knows(active_packages):
+        if package_index.contains(active_packages, title_id):
+            return True, "svod", None
+    elif active_packages:
         pkg_check = await db.execute(
-            select(PackageContent).where(
+            select(PackageContent.package_id).where(
                 and_(
-                    PackageContent.package_id == ent.package_id,
+                    PackageContent.package_id.in_(active_packages),
                     PackageContent.content_type == "vod_title",
                     PackageContent.content_id == title_id,
                 )
-            )
+            ).limit(1)
         )
         if pkg_check.scalar_one_or_none() is not None:
             return True, "svod", None
 
     # 2. TVOD buy (permanent — no expiry)
-    buy_result = await db.execute(
-        select(UserEntitlement).where(
-            and_(
-                UserEntitlement.user_id == user_id,
-                UserEntitlement.source_type == "tvod",
-                UserEntitlement.title_id == title_id,
-                UserEntitlement.expires_at.is_(None),
-            )
-        )
-    )
-    if buy_result.scalar_one_or_none() is not None:
+    if title_id in snapshot.owned:
         return True, "tvod_buy", None
 
     # 3. TVOD rent (time-limited)
-    rent_result = await db.execute(
-        select(UserEntitlement).where(
-            and_(
-                UserEntitlement.user_id == user_id,
-                UserEntitlement.source_type == "tvod",
-                UserEntitlement.title_id == title_id,
-                UserEntitlement.expires_at.is_not(None),
-                UserEntitlement.expires_at > now,
-            )
-        )
-    )
-    rental = rent_result.scalar_one_or_none()
-    if rental is not None:
-        return True, "tvod_rent", rental.expires_at
+    rental_expiry = snapshot.rental_expiry(title_id, now)
+    if rental_expiry is not None:
+        return True, "tvod_rent", rental_expiry
 
     # 4. Free offer
     free_offer = await db.execute(
-        select(TitleOffer).where(
+        select(TitleOffer.id).where(
             and_(
                 TitleOffer.title_id == title_id,
                 TitleOffer.offer_type == "free",
                 TitleOffer.is_active.is_(True),
             )
-        )
+        ).limit(1)
     )
     if free_offer.scalar_one_or_none() is not None:
         return True, "free", None
@@ -126,6 +216,15 @@ async def _raw_check_access(
     return False, None, None
 
 
+async def _raw_check_access(
+    user_id: uuid.UUID,
+    title_id: uuid.UUID,
+    db: AsyncSession,
+) -> tuple[bool, str | None, datetime | None]:
+    """Check access straight from the DB, bypassing the snapshot cache."""
+    return await _resolve_access(await _load_snapshot(user_id, db), title_id, db)
+
+
 # ── Public API ────────────────────────────────────────────────────────────────
 
 
@@ -146,48 +245,80 @@ async def check_access_cached(
     db: AsyncSession,
     redis: redis.asyncio.Redis,
 ) -> bool:
-    """Check access with Redis caching. Fail-closed on any error (deny access).
+    """Check access against the user's cached entitlement snapshot. Fail-closed on any error.
 
-    TTL strategy:
-    - SVOD / TVOD buy: 300 seconds (no natural expiry, invalidated on subscription change)
-    - TVOD rental: min(300, seconds_until_rental_expiry) — ensures cached access
-      expires within 60 seconds of rental expiry (satisfies SC-003)
-    - No access: cached as '0' for 30 seconds to reduce DB load on repeated denials
+    One snapshot serves every title, so a title the user has not checked before
+    is not a cache miss.  Rental and subscription expiry are compared with the
+    current time on each check, so expired access is denied immediately (SC-003).
     """
-    key = _cache_key(user_id, title_id)
-
-    try:
-        cached = await redis.get(key)
-        if cached is not None:
-            return cached == "1"
-    except Exception as exc:
-        logger.warning("Redis read failed for key %s, falling back to DB: %s", key, exc)
-
     try:
-        has_access, access_type, expires_at = await _raw_check_access(user_id, title_id, db)
+        snapshot = await get_entitlement_snapshot(user_id, db, redis)
+        has_access, _, _ = await _resolve_access(snapshot, title_id, db)
     except Exception as exc:
         logger.error("DB entitlement check failed for user=%s title=%s: %s", user_id, title_id, exc)
         return False  # fail-closed
+    return has_access
 
-    # Determine TTL
-    if has_access and access_type == "tvod_rent" and expires_at is not None:
-        now = datetime.now(timezone.utc)
-        secs_until_expiry = max(0, int((expires_at - now).total_seconds()))
-        ttl = min(_CACHE_TTL_DEFAULT, secs_until_expiry)
-        if ttl == 0:
-            # Rental just expired — cache as denied
-            has_access = False
-    elif has_access:
-        ttl = _CACHE_TTL_DEFAULT
-    else:
-        ttl = 30  # short negative-cache TTL
 
-    try:
-        await redis.setex(key, ttl, "1" if has_access else "0")
-    except Exception as exc:
-        logger.warning("Redis write failed for key %s: %s", key, exc)
+_TIER_ORDER = {"basic": 0, "standard": 1, "premium": 2}
 
-    return has_access
+
+def _offer_to_option(offer: TitleOffer) -> AccessOption | None:
+    if offer.offer_type == "free":
+        return AccessOption(type="free", label="Free")
+    if offer.offer_type == "rent":
+        return AccessOption(
+            type="rent",
+            label=f"Rent for ${offer.price_cents / 100:.2f}",
+            price_cents=offer.price_cents,
+            currency=offer.currency,
+            rental_window_hours=offer.rental_window_hours,
+        )
+    if offer.offer_type == "buy":
+        return AccessOption(
+            type="buy",
+            label=f"Buy for ${offer.price_cents / 100:.2f}",
+            price_cents=offer.price_cents,
+            currency=offer.currency,
+        )
+    return None
+
+
+async def _package_membership(
+    ids: list[uuid.UUID], db: AsyncSession
+) -> tuple[dict[uuid.UUID, set[uuid.UUID]], dict[uuid.UUID, list[str]]]:
+    """Packages containing each title, and those packages' tiers.
+
+    Served from the in-process package index; falls back to one set-based
+    query against package_contents until the index has been built.
+    """
+    packages_by_title: dict[uuid.UUID, set[uuid.UUID]] = {}
+    tiers_by_title: dict[uuid.UUID, list[str]] = {}
+    if package_index.ready:
+        for title_id in ids:
+            package_ids = package_index.packages_for(title_id)
+            if package_ids:
+                packages_by_title[title_id] = set(package_ids)
+                tiers_by_title[title_id] = [
+                    t for t in map(package_index.tier, package_ids) if t
+                ]
+        return packages_by_title, tiers_by_title
+
+    membership_result = await db.execute(
+        select(PackageContent.content_id, ContentPackage.id, ContentPackage.tier)
+        .join(ContentPackage, ContentPackage.id == PackageContent.package_id)
+        .where(
+            and_(
+                PackageContent.content_type == "vod_title",
+                PackageContent.content_id.in_(ids),
+            )
+        )
+    )
+    for content_id, package_id, tier in membership_result.all():
+        packages_by_title.setdefault(content_id, set()).add(package_id)
+        if tier:
+            tiers_by_title.setdefault(content_id, []).append(tier)
+    return packages_by_title, tiers_by_title
 
 
 async def get_access_options(
@@ -198,150 +329,107 @@ async def get_access_options(
 ) -> tuple[list[AccessOption], UserAccess | None]:
     """Return structured access options and current user entitlement status.
 
-    Queries DB directly (no Redis cache) — returns richer data than check_access_cached.
-    Two indexed queries: TitleOffers (ix_title_offers_title_active) +
-    UserEntitlements (ix_ue_user_title_expires) at PoC scale.
+    Returns richer data than check_access_cached. Single-title form of get_access_options_bulk.
     """
-    # Fetch all active offers for this title
+    resolved = await get_access_options_bulk([title_id], user_id, db, redis)
+    return resolved[title_id]
+
+
+async def get_access_options_bulk(
+    title_ids: list[uuid.UUID],
+    user_id: uuid.UUID | None,
+    db: AsyncSession,
+    redis: redis.asyncio.Redis,
+) -> dict[uuid.UUID, tuple[list[AccessOption], UserAccess | None]]:
+    """Resolve access options and user entitlement status for a page of titles.
+
+    Runs one set-based query for active offers; package membership and tiers
+    come from the package index and the user's entitlements from their cached
+    snapshot (see get_entitlement_snapshot).  Access is resolved
+    per title in the same priority order as _resolve_access:
+    SVOD → TVOD buy → TVOD rent → free offer, else the lowest required tier.
+    """
+    ids = list(dict.fromkeys(title_ids))
+    if not ids:
+        return {}
+    now = datetime.now(timezone.utc)
+
+    # Active offers for every title on the page (ix_title_offers_title_active)
     offers_result = await db.execute(
         select(TitleOffer).where(
             and_(
-                TitleOffer.title_id == title_id,
+                TitleOffer.title_id.in_(ids),
                 TitleOffer.is_active.is_(True),
             )
         )
     )
-    active_offers = offers_result.scalars().all()
-
-    options: list[AccessOption] = []
-    for offer in active_offers:
-        if offer.offer_type == "free":
-            options.append(AccessOption(type="free", label="Free"))
-        elif offer.offer_type == "rent":
-            options.append(AccessOption(
-                type="rent",
-                label=f"Rent for ${offer.price_cents / 100:.2f}",
-                price_cents=offer.price_cents,
-                currency=offer.currency,
-                rental_window_hours=offer.rental_window_hours,
-            ))
-        elif offer.offer_type == "buy":
-            options.append(AccessOption(
-                type="buy",
-                label=f"Buy for ${offer.price_cents / 100:.2f}",
-                price_cents=offer.price_cents,
-                currency=offer.currency,
-            ))
-
-    # Check SVOD package membership
-    svod_access = False
-    if user_id is not None:
-        svod_check = await db.execute(
-            select(PackageContent).where(
-                and_(
-                    PackageContent.content_type == "vod_title",
-                    PackageContent.content_id == title_id,
-                )
-            )
-        )
-        pkg_ids_with_title = {row.package_id for row in svod_check.scalars().all()}
-
-        if pkg_ids_with_title:
-            now = datetime.now(timezone.utc)
-            svod_ent_result = await db.execute(
-                select(UserEntitlement).where(
-                    and_(
-                        UserEntitlement.user_id == user_id,
-                        UserEntitlement.source_type == "subscription",
-                        UserEntitlement.package_id.in_(pkg_ids_with_title),
-                        (UserEntitlement.expires_at.is_(None)) | (UserEntitlement.expires_at > now),
-                    )
-                )
-            )
-            if svod_ent_result.scalar_one_or_none() is not None:
-                svod_access = True
-
-    # If user has SVOD access, show that
-    if user_id is not None and svod_access:
-        return options, UserAccess(
-            has_access=True,
-            access_type="svod",
-            expires_at=None,
-        )
+    offers_by_title: dict[uuid.UUID, list[TitleOffer]] = {}
+    for offer in offers_result.scalars().all():
+        offers_by_title.setdefault(offer.title_id, []).append(offer)
 
-    # Check TVOD entitlements if authenticated
-    if user_id is not None:
-        now = datetime.now(timezone.utc)
+    packages_by_title, tiers_by_title = await _package_membership(ids, db)
 
-        # Check buy (permanent)
-        buy_result = await db.execute(
-            select(UserEntitlement).where(
-                and_(
-                    UserEntitlement.user_id == user_id,
-                    UserEntitlement.source_type == "tvod",
-                    UserEntitlement.title_id == title_id,
-                    UserEntitlement.expires_at.is_(None),
-                )
+    # The user's entitlements come from the cached snapshot
+    subscribed: set[uuid.UUID] = set()
+    owned: set[uuid.UUID] = set()
+    rentals: dict[uuid.UUID, datetime] = {}
+    if user_id is not None:
+        snapshot = await get_entitlement_snapshot(user_id, db, redis)
+        subscribed = snapshot.active_packages(now)
+        owned = snapshot.owned
+        rentals = {
+            tid: exp for tid in ids if (exp := snapshot.rental_expiry(tid, now)) is not None
+        }
+
+    resolved: dict[uuid.UUID, tuple[list[AccessOption], UserAccess | None]] = {}
+    for title_id in ids:
+        active_offers = offers_by_title.get(title_id, [])
+        options = [o for o in map(_offer_to_option, active_offers) if o is not None]
+
+        if user_id is not None and subscribed & packages_by_title.get(title_id, set()):
+            resolved[title_id] = (
+                options,
+                UserAccess(has_access=True, access_type="svod", expires_at=None),
             )
-        )
-        if buy_result.scalar_one_or_none() is not None:
+        elif title_id in owned:
             # User owns it — suppress rent option (FR-015)
-            options = [o for o in options if o.type != "rent"]
-            return options, UserAccess(has_access=True, access_type="tvod_buy", expires_at=None)
-
-        # Check rent (time-limited)
-        rent_result = await db.execute(
-            select(UserEntitlement).where(
-                and_(
-                    UserEntitlement.user_id == user_id,
-                    UserEntitlement.source_type == "tvod",
-                    UserEntitlement.title_id == title_id,
-                    UserEntitlement.expires_at.is_not(None),
-                    UserEntitlement.expires_at > now,
-                )
+            resolved[title_id] = (
+                [o for o in options if o.type != "rent"],
+                UserAccess(has_access=True, access_type="tvod_buy", expires_at=None),
             )
-        )
-        rental = rent_result.scalar_one_or_none()
-        if rental is not None:
+        elif title_id in rentals:
             # Active rental — suppress duplicate rent option
-            options = [o for o in options if o.type != "rent"]
-            return options, UserAccess(
-                has_access=True,
-                access_type="tvod_rent",
-                expires_at=rental.expires_at,
+            resolved[title_id] = (
+                [o for o in options if o.type != "rent"],
+                UserAccess(
+                    has_access=True, access_type="tvod_rent", expires_at=rentals[title_id]
+                ),
             )
-
-    # Check free offer — free content is accessible without login
-    free_offer_exists = any(o.offer_type == "free" for o in active_offers)
-    if free_offer_exists:
-        return options, UserAccess(has_access=True, access_type="free", expires_at=None)
-
-    # Find the lowest SVOD tier that grants access to this title so the
-    # frontend can show "Upgrade to Standard" / "Subscribe with Basic" etc.
-    _tier_order = {"basic": 0, "standard": 1, "premium": 2}
-    required_tier: str | None = None
-    tier_result = await db.execute(
-        select(ContentPackage.tier).join(
-            PackageContent,
-            and_(
-                PackageContent.package_id == ContentPackage.id,
-                PackageContent.content_type == "vod_title",
-                PackageContent.content_id == title_id,
-            ),
-        )
-    )
-    pkg_tiers = [t for t in tier_result.scalars().all() if t]
-    if pkg_tiers:
-        required_tier = min(pkg_tiers, key=lambda t: _tier_order.get(t, 99))
-
-    # No access — return a UserAccess object even for unauthenticated users so
-    # the frontend can distinguish "locked with no purchase path" from "unknown".
-    return options, UserAccess(
-        has_access=False,
-        access_type=None,
-        expires_at=None,
-        required_tier=required_tier,
-    )
+        elif any(o.offer_type == "free" for o in active_offers):
+            # Free content is accessible without login
+            resolved[title_id] = (
+                options,
+                UserAccess(has_access=True, access_type="free", expires_at=None),
+            )
+        else:
+            # Lowest SVOD tier that grants access so the frontend can show
+            # "Upgrade to Standard" / "Subscribe with Basic" etc.  A UserAccess
+            # object is returned even for unauthenticated users so the frontend
+            # can distinguish "locked with no purchase path" from "unknown".
+            pkg_tiers = tiers_by_title.get(title_id)
+            required_tier = (
+                min(pkg_tiers, key=lambda t: _TIER_ORDER.get(t, 99)) if pkg_tiers else None
+            )
+            resolved[title_id] = (
+                options,
+                UserAccess(
+                    has_access=False,
+                    access_type=None,
+                    expires_at=None,
+                    required_tier=required_tier,
+                ),
+            )
+    return resolved
 
 
 async def create_tvod_entitlement(
@@ -425,19 +513,42 @@ async def create_tvod_entitlement(
     return entitlement
 
 
+async def get_max_streams(
+    user_id: uuid.UUID,
+    db: AsyncSession,
+    redis: redis.asyncio.Redis,
+) -> int:
+    """Concurrent stream limit from the user's most permissive active subscription.
+
+    Resolved from the entitlement snapshot and the package index, so it costs
+    no queries once both are warm.
+    """
+    snapshot = await get_entitlement_snapshot(user_id, db, redis)
+    active_packages = snapshot.active_packages(datetime.now(timezone.utc))
+    if not active_packages:
+        return 0
+    if package_index.ready and package_index.knows(active_packages):
+        return package_index.max_streams(active_packages)
+    result = await db.execute(
+        select(func.max(ContentPackage.max_streams)).where(ContentPackage.id.in_(active_packages))
+    )
+    return result.scalar_one_or_none() or 0
+
+
 async def check_stream_limit(
     user_id: uuid.UUID,
     db: AsyncSession,
 ) -> tuple[bool, list[StreamSession]]:
-    """Check if user can start a new stream.
+    """Check if user can start a new stream against stream_sessions directly.
 
-    First expires abandoned sessions (no heartbeat for 5+ minutes),
+    Fallback for when the Redis stream counter (stream_counter) is unavailable.
+    First expires abandoned sessions (no heartbeat for stream_abandon_seconds),
     then compares active session count against user's package max_streams.
 
     Returns (can_start, active_sessions).
     """
     now = datetime.now(timezone.utc)
-    abandoned_cutoff = now - timedelta(minutes=2)
+    abandoned_cutoff = now - timedelta(seconds=settings.stream_abandon_seconds)
 
     # Expire abandoned sessions atomically (update ended_at)
     await db.execute(
@@ -494,20 +605,15 @@ async def invalidate_entitlement_cache(
     user_id: uuid.UUID,
     redis: redis.asyncio.Redis,
 ) -> None:
-    """Delete all cached entitlement keys for a user.
+    """Invalidate a user's entitlement snapshot.
 
-    Uses SCAN + DELETE. There is a ~100ms consistency window between cursor
-    advances where a concurrent check could read a stale key. Acceptable for
-    PoC (SC-002 requires 10s propagation, not 100ms atomicity).
+    Bumps the user's version counter (so a snapshot being built concurrently
+    is stored stale-tagged and ignored) and deletes the current snapshot.
     """
-    pattern = _user_glob(user_id)
     try:
-        cursor = 0
-        while True:
-            cursor, keys = await redis.scan(cursor, match=pattern, count=100)
-            if keys:
-                await redis.delete(*keys)
-            if cursor == 0:
-                break
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.incr(_version_key(user_id))
+            pipe.delete(_snapshot_key(user_id))
+            await pipe.execute()
     except Exception as exc:
         logger.warning("Cache invalidation failed for user %s: %s", user_id, exc)
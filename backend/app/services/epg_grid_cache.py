@@ -0,0 +1,123 @@
+"""Per-day EPG grid blobs in Redis, tagged with the schedule version.
+
+The grid screen asks for every channel across a multi-day window.  Each UTC
+day's schedule (all channels, entries starting that day) is serialized once,
+zlib-compressed and stored under ``epggrid:{version}:{day}``; the channel
+lineup is stored alongside under ``epggrid:{version}:channels``.  A grid
+request is then one MGET plus in-memory filtering.
+
+The admin channel and schedule endpoints bump the schedule version (see
+``epg_snapshot``), which orphans every blob at once; orphans expire through
+their TTL.  The version also feeds the grid ETag, so an unchanged grid
+revalidates with a single Redis read.  A missing version key starts at a
+random value, so a lost key never reproduces a version clients already hold;
+when the version cannot be read at all, grids are served uncached and
+without an ETag.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import secrets
+import zlib
+from datetime import date, datetime
+
+from app.config import settings
+from app.services.epg_snapshot import SCHEDULE_VERSION_KEY
+
+logger = logging.getLogger(__name__)
+
+
+def _pack(payload) -> str:
+    raw = json.dumps(payload, default=str, separators=(",", ":")).encode()
+    return base64.b64encode(zlib.compress(raw)).decode("ascii")
+
+
+def _unpack(blob: str):
+    return json.loads(zlib.decompress(base64.b64decode(blob)))
+
+
+class EpgGridCache:
+    """Redis-backed grid day cache; a no-op until ``redis`` is set."""
+
+    def __init__(self, ttl: int = settings.epg_grid_cache_ttl_seconds) -> None:
+        self.ttl = ttl
+        self.redis = None  # set by the lifespan handler
+
+    @property
+    def enabled(self) -> bool:
+        return self.redis is not None and self.ttl > 0
+
+    async def schedule_version(self) -> str | None:
+        """Current schedule version, or None when it cannot be read."""
+        if self.redis is None:
+            return None
+        try:
+            version = await self.redis.get(SCHEDULE_VERSION_KEY)
+            if version is None:
+                # never bumped, or Redis lost it; INCR keeps working on the seed
+                await self.redis.set(SCHEDULE_VERSION_KEY, secrets.randbits(48), nx=True)
+                version = await self.redis.get(SCHEDULE_VERSION_KEY)
+            return version
+        except Exception:
+            logger.warning("Schedule version read failed", exc_info=True)
+            return None
+
+    @staticmethod
+    def etag(
+        version: str,
+        start: datetime,
+        end: datetime,
+        channel_ids: list | None,
+    ) -> str:
+        """Weak ETag for a grid request against schedule *version*."""
+        shape = json.dumps(
+            [version, start.isoformat(), end.isoformat(), sorted(map(str, channel_ids or []))]
+        )
+        return f'W/"{hashlib.sha1(shape.encode()).hexdigest()}"'
+
+    async def get_days(self, version: str | None, days: list[date]) -> dict[date, list[dict]]:
+        """Cached entries for each of *days* that is present."""
+        if not self.enabled or version is None or not days:
+            return {}
+        try:
+            blobs = await self.redis.mget([f"epggrid:{version}:{d.isoformat()}" for d in days])
+        except Exception:
+            logger.warning("EPG grid cache read failed", exc_info=True)
+            return {}
+        return {d: _unpack(blob) for d, blob in zip(days, blobs) if blob is not None}
+
+    async def put_days(self, version: str | None, days: dict[date, list[dict]]) -> None:
+        """Store each day's entries under the *version* read before loading them."""
+        if not self.enabled or version is None or not days:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for d, entries in days.items():
+                    pipe.set(f"epggrid:{version}:{d.isoformat()}", _pack(entries), ex=self.ttl)
+                await pipe.execute()
+        except Exception:
+            logger.warning("EPG grid cache write failed", exc_info=True)
+
+    async def get_channels(self, version: str | None) -> list[dict] | None:
+        if not self.enabled or version is None:
+            return None
+        try:
+            blob = await self.redis.get(f"epggrid:{version}:channels")
+        except Exception:
+            logger.warning("EPG grid cache read failed", exc_info=True)
+            return None
+        return _unpack(blob) if blob is not None else None
+
+    async def put_channels(self, version: str | None, channels: list[dict]) -> None:
+        if not self.enabled or version is None:
+            return
+        try:
+            await self.redis.set(f"epggrid:{version}:channels", _pack(channels), ex=self.ttl)
+        except Exception:
+            logger.warning("EPG grid cache write failed", exc_info=True)
+
+
+# Module-level singleton
+epg_grid_cache = EpgGridCache()
@@ -1,12 +1,15 @@
 """Service layer for EPG (channels, schedule, favourites)."""
 
 import uuid
-from datetime import date, datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 
-from sqlalchemy import and_, delete, select
+from sqlalchemy import DateTime, and_, delete, func, literal, literal_column, or_, select, true
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
+from app.config import settings
 from app.models.epg import Channel, ChannelFavorite, ScheduleEntry
+from app.schemas.epg import ScheduleEntryResponse
 from app.services.search_service import escape_like
 
 
@@ -57,6 +60,54 @@ def _channel_dict(ch: Channel) -> dict:
     }
 
 
+def _max_programme() -> timedelta:
+    return timedelta(hours=settings.schedule_max_programme_hours)
+
+
+def on_air(at: datetime, entry=ScheduleEntry):
+    """Predicate: *entry* is airing at *at* (``airing @> at``, GiST-indexed).
+
+    The redundant ``start_time`` bounds (programmes last at most
+    ``schedule_max_programme_hours``) let the planner prune the daily
+    partitions to the one or two that can hold a match.
+    """
+    return and_(
+        entry.airing.op("@>")(literal(at, DateTime(timezone=True))),
+        entry.start_time <= at,
+        entry.start_time > at - _max_programme(),
+    )
+
+
+def airs_within(start: datetime, end: datetime, entry=ScheduleEntry):
+    """Predicate: *entry* overlaps [*start*, *end*) (``airing && range``, GiST-indexed).
+
+    Carries the same partition-pruning ``start_time`` bounds as :func:`on_air`.
+    """
+    return and_(
+        entry.airing.op("&&")(func.tstzrange(start, end, "[)")),
+        entry.start_time < end,
+        entry.start_time > start - _max_programme(),
+    )
+
+
+async def get_current_entry(
+    db: AsyncSession,
+    channel_id: uuid.UUID,
+    now: datetime | None = None,
+) -> ScheduleEntry | None:
+    """Return the programme airing on *channel_id* at *now*, if any."""
+    now = now or datetime.now(timezone.utc)
+    result = await db.execute(
+        select(ScheduleEntry).where(
+            and_(
+                ScheduleEntry.channel_id == channel_id,
+                on_air(now),
+            )
+        )
+    )
+    return result.scalar_one_or_none()
+
+
 async def get_schedule(
     db: AsyncSession,
     channel_id: uuid.UUID,
@@ -80,76 +131,225 @@ async def get_schedule(
     return list(result.scalars().all())
 
 
-async def get_now_playing(db: AsyncSession) -> list[dict]:
-    """Return the currently airing programme (and next) for every channel."""
-    now = datetime.now(timezone.utc)
+# Widest window the grid endpoint serves in one response
+GRID_MAX_DAYS = 7
+
+
+def grid_days(start: datetime, end: datetime) -> list[date]:
+    """UTC days whose entries can overlap [*start*, *end*).
+
+    Includes the day before *start* for programmes that run past midnight.
+    """
+    first = (start - timedelta(days=1)).date()
+    last = (end - timedelta(microseconds=1)).date()
+    return [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+
+async def get_grid_days(db: AsyncSession, days: list[date]) -> dict[date, list[dict]]:
+    """Schedule entries for all channels on each of *days*, keyed by UTC day.
+
+    One query across the span of *days*; entries are JSON-ready
+    :class:`ScheduleEntryResponse` dicts ordered by channel and start time.
+    """
+    if not days:
+        return {}
+    first, last = min(days), max(days)
+    span_start = datetime(first.year, first.month, first.day, tzinfo=timezone.utc)
+    span_end = datetime(last.year, last.month, last.day, tzinfo=timezone.utc) + timedelta(days=1)
+
+    result = await db.execute(
+        select(ScheduleEntry)
+        .where(
+            and_(
+                ScheduleEntry.start_time >= span_start,
+                ScheduleEntry.start_time < span_end,
+            )
+        )
+        .order_by(ScheduleEntry.channel_id, ScheduleEntry.start_time)
+    )
+    by_day: dict[date, list[dict]] = {d: [] for d in days}
+    for entry in result.scalars().all():
+        bucket = by_day.get(entry.start_time.astimezone(timezone.utc).date())
+        if bucket is not None:
+            bucket.append(ScheduleEntryResponse.model_validate(entry).model_dump(mode="json"))
+    return by_day
 
-    # Current programmes.
-    current_q = await db.execute(
+
+def build_grid(
+    channels: list[dict],
+    days: dict[date, list[dict]],
+    start: datetime,
+    end: datetime,
+    channel_ids: list[uuid.UUID] | None = None,
+) -> list[dict]:
+    """Assemble grid rows from cached day blobs.
+
+    Keeps entries overlapping [*start*, *end*) on the requested channels
+    (all channels when *channel_ids* is None), in channel order.
+    """
+    wanted = {str(cid) for cid in channel_ids} if channel_ids else None
+    rows = {
+        str(ch["id"]): {"channel": ch, "entries": []}
+        for ch in channels
+        if wanted is None or str(ch["id"]) in wanted
+    }
+    for day in sorted(days):
+        for entry in days[day]:
+            row = rows.get(entry["channel_id"])
+            if row is None:
+                continue
+            if (
+                datetime.fromisoformat(entry["end_time"]) > start
+                and datetime.fromisoformat(entry["start_time"]) < end
+            ):
+                row["entries"].append(entry)
+    return list(rows.values())
+
+
+async def get_now_playing(
+    db: AsyncSession,
+    now: datetime | None = None,
+) -> list[dict]:
+    """Return the currently airing programme (and next) for every channel.
+
+    One query: current entries joined to their channel, with the following
+    programme picked by a ``LATERAL`` subquery per row.
+    """
+    now = now or datetime.now(timezone.utc)
+
+    current = aliased(ScheduleEntry, name="current_program")
+    following = (
         select(ScheduleEntry)
         .where(
             and_(
-                ScheduleEntry.start_time <= now,
-                ScheduleEntry.end_time > now,
+                ScheduleEntry.channel_id == current.channel_id,
+                ScheduleEntry.start_time >= current.end_time,
             )
         )
-        .order_by(ScheduleEntry.channel_id)
+        .order_by(ScheduleEntry.start_time)
+        .limit(1)
+        .lateral("next_program")
+    )
+    next_entry = aliased(ScheduleEntry, following)
+
+    result = await db.execute(
+        select(current, Channel, next_entry)
+        .join(Channel, Channel.id == current.channel_id)
+        .outerjoin(next_entry, true())
+        .where(on_air(now, current))
+        .order_by(current.channel_id)
     )
-    current_entries = current_q.scalars().all()
 
-    # Build a lookup of channel_id -> current entry.
-    channel_ids = [e.channel_id for e in current_entries]
-    if not channel_ids:
-        return []
+    return [
+        {
+            "channel": {**_channel_dict(channel), "is_favorite": False},
+            "current_program": entry,
+            "next_program": next_prog,
+        }
+        for entry, channel, next_prog in result.tuples().all()
+    ]
 
-    # Fetch channels for those entries.
-    ch_result = await db.execute(
-        select(Channel).where(Channel.id.in_(channel_ids))
+
+async def next_programme_start(db: AsyncSession, after: datetime) -> datetime | None:
+    """Earliest programme start strictly after *after*, on any channel."""
+    result = await db.execute(
+        select(func.min(ScheduleEntry.start_time)).where(ScheduleEntry.start_time > after)
     )
-    channels_by_id = {ch.id: ch for ch in ch_result.scalars().all()}
-
-    results: list[dict] = []
-    for entry in current_entries:
-        channel = channels_by_id.get(entry.channel_id)
-        if channel is None:
-            continue
-
-        # Find the next programme on the same channel.
-        next_q = await db.execute(
-            select(ScheduleEntry)
-            .where(
-                and_(
-                    ScheduleEntry.channel_id == entry.channel_id,
-                    ScheduleEntry.start_time >= entry.end_time,
-                )
+    return result.scalar_one()
+
+
+# Search windows: "upcoming" (airing or still to air), "catchup" (ended within
+# the channel's catch-up window, eligible for playback) or "all" history.
+SEARCH_WINDOWS = ("all", "upcoming", "catchup")
+
+
+def schedule_search_filter(
+    query: str,
+    include_synopsis: bool = False,
+    include_series_title: bool = False,
+):
+    """Match schedule entries whose title contains *query*.
+
+    Substring ILIKE on the titles is served by trigram GIN indexes.  With
+    *include_series_title* the series title is matched too.  With
+    *include_synopsis* the synopsis is searched too: via the generated
+    ``search_vector`` (GIN, websearch-style tsquery) under the ``fts``
+    backend, or by an unindexed ILIKE under ``ilike``.
+    """
+    pattern = f"%{escape_like(query)}%"
+    conditions = [ScheduleEntry.title.ilike(pattern)]
+    if include_series_title:
+        conditions.append(ScheduleEntry.series_title.ilike(pattern))
+    if include_synopsis:
+        if settings.search_backend == "ilike":
+            conditions.append(ScheduleEntry.synopsis.ilike(pattern))
+        else:
+            conditions.append(
+                ScheduleEntry.search_vector.op("@@")(func.websearch_to_tsquery("english", query))
             )
-            .order_by(ScheduleEntry.start_time)
-            .limit(1)
+    return or_(*conditions)
+
+
+def search_window_filter(window: str, now: datetime):
+    """Time restriction for a search *window* (None for "all").
+
+    ``catchup`` needs ``Channel`` joined into the query.
+    """
+    # start_time bounds are implied by the end_time ones (programmes last at
+    # most schedule_max_programme_hours) and are what prunes partitions.
+    if window == "upcoming":
+        return and_(
+            ScheduleEntry.end_time > now,
+            ScheduleEntry.start_time > now - _max_programme(),
         )
-        next_entry = next_q.scalar_one_or_none()
-
-        results.append(
-            {
-                "channel": {**_channel_dict(channel), "is_favorite": False},
-                "current_program": entry,
-                "next_program": next_entry,
-            }
+    if window == "catchup":
+        hour = literal_column("interval '1 hour'")
+        # Lower bound from the widest window on any channel (an initplan, so
+        # partitions are pruned at executor startup); the per-channel bound
+        # below is exact.
+        widest = aliased(Channel)
+        widest_hours = select(func.max(widest.cutv_window_hours)).scalar_subquery()
+        return and_(
+            ScheduleEntry.start_time < now,
+            ScheduleEntry.start_time > now - hour * widest_hours - _max_programme(),
+            ScheduleEntry.end_time <= now,
+            ScheduleEntry.end_time > now - hour * widest_hours,
+            ScheduleEntry.end_time > now - hour * Channel.cutv_window_hours,
+            ScheduleEntry.catchup_eligible.is_(True),
+            Channel.catchup_enabled.is_(True),
         )
-
-    return results
+    return None
 
 
 async def search_schedule(
     db: AsyncSession,
     query: str,
+    window: str = "all",
+    include_synopsis: bool = False,
+    limit: int = 50,
+    include_series_title: bool = False,
 ) -> list[ScheduleEntry]:
-    """Search schedule entries by title (case-insensitive LIKE)."""
-    result = await db.execute(
-        select(ScheduleEntry)
-        .where(ScheduleEntry.title.ilike(f"%{escape_like(query)}%"))
-        .order_by(ScheduleEntry.start_time)
-        .limit(50)
+    """Search schedule entries by title (case-insensitive).
+
+    Series titles and synopses are matched only when asked for.  *window*
+    restricts the search to upcoming or catch-up programmes; its
+    start_time bounds prune the daily partitions outside the window, so
+    expired history is not scanned.  Catch-up results are most recent first.
+    """
+    now = datetime.now(timezone.utc)
+    stmt = select(ScheduleEntry).where(
+        schedule_search_filter(query, include_synopsis, include_series_title)
     )
+    window_filter = search_window_filter(window, now)
+    if window_filter is not None:
+        stmt = stmt.where(window_filter)
+    if window == "catchup":
+        stmt = stmt.join(Channel, Channel.id == ScheduleEntry.channel_id).order_by(
+            ScheduleEntry.start_time.desc()
+        )
+    else:
+        stmt = stmt.order_by(ScheduleEntry.start_time)
+    result = await db.execute(stmt.limit(limit))
     return list(result.scalars().all())
 
 
@@ -0,0 +1,104 @@
+"""In-memory now/next snapshot for the live TV screen.
+
+``/epg/now`` is polled by every client on the live TV screen, but its answer
+only changes at programme boundaries.  The snapshot holds the full now/next
+lineup together with the moment it stops being correct (the earliest current
+programme end or upcoming programme start), so serving it is a memory read.
+
+A lifespan loop rebuilds it at that boundary, and whenever the schedule
+version in Redis moves — the admin schedule and channel endpoints bump it.
+Past its boundary, or before the first build, ``current()`` returns None and
+callers fall back to ``epg_service.get_now_playing``.
+"""
+
+import logging
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.epg import NowPlayingResponse
+from app.services import epg_service
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_VERSION_KEY = "epg:version"
+
+# Stand-in boundary when no programme is scheduled to start or end
+_NEVER = datetime.max.replace(tzinfo=timezone.utc)
+
+
+class NowNextSnapshot:
+    """Now/next lineup valid until ``valid_until``."""
+
+    def __init__(self) -> None:
+        self.version: str | None = None
+        self.built_at: float | None = None
+        self.valid_until: datetime | None = None
+        self._rows: list[NowPlayingResponse] = []
+
+    @property
+    def ready(self) -> bool:
+        return self.built_at is not None
+
+    def current(self, now: datetime | None = None) -> list[NowPlayingResponse] | None:
+        """The lineup, or None if not built or a programme boundary has passed."""
+        if self.valid_until is None:
+            return None
+        if (now or datetime.now(timezone.utc)) >= self.valid_until:
+            return None
+        return self._rows
+
+    def seconds_until_stale(self, now: datetime | None = None) -> float:
+        """Seconds until the next programme boundary (0 if already stale)."""
+        if self.valid_until is None:
+            return 0.0
+        remaining = self.valid_until - (now or datetime.now(timezone.utc))
+        return max(0.0, remaining.total_seconds())
+
+    async def rebuild(self, db: AsyncSession, version: str | None = None) -> int:
+        """Load now/next for every channel and swap in a new snapshot.
+
+        Returns the number of channels on air.
+        """
+        started = time.monotonic()
+        now = datetime.now(timezone.utc)
+
+        items = await epg_service.get_now_playing(db, now)
+        upcoming = await epg_service.next_programme_start(db, now)
+        boundary = min(
+            [item["current_program"].end_time for item in items]
+            + ([upcoming] if upcoming is not None else []),
+            default=_NEVER,
+        )
+
+        self._rows = [NowPlayingResponse.model_validate(item, from_attributes=True) for item in items]
+        self.valid_until = boundary
+        self.version = version
+        self.built_at = time.time()
+        logger.info(
+            "EPG now/next snapshot rebuilt: %d channels in %.1fms, valid until %s",
+            len(items),
+            (time.monotonic() - started) * 1000,
+            boundary.isoformat(),
+        )
+        return len(items)
+
+    async def current_version(self, redis) -> str:
+        """Schedule version in Redis ("0" before the first bump)."""
+        return await redis.get(SCHEDULE_VERSION_KEY) or "0"
+
+    async def invalidate(self, redis) -> None:
+        """Drop the local snapshot and signal the other workers.
+
+        Called by the admin schedule and channel endpoints after their commit.
+        """
+        self.valid_until = None
+        try:
+            await redis.incr(SCHEDULE_VERSION_KEY)
+        except Exception:
+            logger.warning("Schedule version bump failed", exc_info=True)
+
+
+# Module-level singleton
+epg_snapshot = NowNextSnapshot()
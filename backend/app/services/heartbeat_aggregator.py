@@ -0,0 +1,625 @@
+"""Write-behind aggregation of viewing-time heartbeats.
+
+Live viewing-session and daily-balance state is kept in Redis so that a
+heartbeat for a running session is answered from Redis alone; accumulated
+seconds are bulk-flushed to Postgres by a lifespan loop.
+
+- ``vtsess:{session_id}``           hash: profile_id, is_kids, is_educational,
+                                    paused_at, last_hb, pending (unflushed seconds)
+- ``vtbase:{profile_id}:{day}``     hash: used, edu, unlimited — cached copy of the
+                                    ``viewing_time_balances`` row (expires)
+- ``vtpend:{profile_id}:{day}``     hash: used, edu — increments not yet in Postgres
+- ``vt:dirty:sessions`` / ``vt:dirty:balances``  sets of keys with pending increments
+- ``vt:inflight:{flush_id}``        hash: state taken by a flush not yet settled
+- ``vt:inflight``                   zset: in-flight flush ids scored by take time
+
+Enforcement reads ``base + pending``.  A flush moves pending into base in the
+same Lua call that takes it, so the sum a heartbeat sees never jumps.
+
+Crash recovery:
+- App crash: all unflushed state lives in Redis; a dirty session hash does not
+  expire until a flush has taken it.  A flush interrupted after taking its
+  batch leaves an in-flight hash, which a later flush settles once it is older
+  than the grace period.
+- Settling: every flush records its id in ``heartbeat_flushes`` in the same
+  transaction as the increments.  Settling inserts ``applied = false`` for the
+  id (fencing a flush that has not committed yet), then either deletes the
+  in-flight hash (already applied) or re-queues it, so each increment reaches
+  Postgres exactly once.
+- Redis loss: at most one flush interval of increments is lost; session and
+  balance state is re-seeded from Postgres on the next heartbeat.  Dirty
+  sessions whose hash vanished are logged.
+- Shutdown: the lifespan handler runs a final flush.
+"""
+
+import logging
+import time
+import uuid
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.viewing_time import HeartbeatFlush, ViewingSession, ViewingTimeBalance
+
+logger = logging.getLogger(__name__)
+
+DIRTY_SESSIONS_KEY = "vt:dirty:sessions"
+DIRTY_BALANCES_KEY = "vt:dirty:balances"
+INFLIGHT_KEY = "vt:inflight"
+
+_SESSION_TTL = 86400  # seconds — set again each time a flush takes the session
+_PENDING_TTL = 2 * 86400
+# In-flight flushes younger than this belong to a flush that may still be running
+_INFLIGHT_GRACE_SECONDS = 60
+_LEDGER_PRUNE_INTERVAL = 3600
+_LEDGER_RETENTION_SECONDS = 86400
+
+# KEYS[1]=session KEYS[2]=dirty sessions
+# ARGV[1]=now ARGV[2]=is_paused ARGV[3]=grace ARGV[4]=interval ARGV[5]=profile_id ARGV[6]=session_id
+# Returns nil if the session is unknown, -1 if it belongs to another profile,
+# else {should_increment, is_kids, is_educational}.
+_SESSION_BEAT_LUA = """
+local s = redis.call('HMGET', KEYS[1], 'profile_id', 'is_kids', 'is_educational', 'paused_at')
+if not s[1] then
+  return nil
+end
+if s[1] ~= ARGV[5] then
+  return -1
+end
+local now = tonumber(ARGV[1])
+local grace = tonumber(ARGV[3])
+local paused_at = s[4]
+local inc = 1
+if ARGV[2] == '1' then
+  if paused_at == '' then
+    redis.call('HSET', KEYS[1], 'paused_at', ARGV[1])
+  elseif now - tonumber(paused_at) > grace then
+    inc = 0
+  end
+elseif paused_at ~= '' then
+  if now - tonumber(paused_at) > grace then
+    inc = 0
+  end
+  redis.call('HSET', KEYS[1], 'paused_at', '')
+end
+if inc == 1 then
+  redis.call('HINCRBY', KEYS[1], 'pending', ARGV[4])
+end
+redis.call('HSET', KEYS[1], 'last_hb', ARGV[1])
+-- dirty sessions never expire; the flush that takes them restores the TTL
+redis.call('PERSIST', KEYS[1])
+redis.call('SADD', KEYS[2], ARGV[6])
+return {inc, tonumber(s[2]), tonumber(s[3])}
+"""
+
+# KEYS[1]=base KEYS[2]=pending KEYS[3]=dirty balances
+# ARGV[1]=used increment ARGV[2]=edu increment ARGV[3]=member
+# Returns {base_used|false, base_edu, unlimited, pending_used, pending_edu}.
+_BALANCE_BEAT_LUA = """
+if tonumber(ARGV[1]) > 0 or tonumber(ARGV[2]) > 0 then
+  redis.call('HINCRBY', KEYS[2], 'used', ARGV[1])
+  redis.call('HINCRBY', KEYS[2], 'edu', ARGV[2])
+  redis.call('EXPIRE', KEYS[2], %d)
+  redis.call('SADD', KEYS[3], ARGV[3])
+end
+local b = redis.call('HMGET', KEYS[1], 'used', 'edu', 'unlimited')
+local p = redis.call('HMGET', KEYS[2], 'used', 'edu')
+return {b[1], b[2], b[3], p[1] or '0', p[2] or '0'}
+""" % _PENDING_TTL
+
+# KEYS[1]=dirty sessions KEYS[2]=dirty balances KEYS[3]=in-flight hash KEYS[4]=in-flight index
+# ARGV[1]=batch size ARGV[2]=flush_id ARGV[3]=now
+# Moves pending session seconds and balance increments into the in-flight
+# hash (fields ``s:{session_id}`` -> "pending|last_hb|paused_at" and
+# ``b:{member}`` -> "used|edu"), folding balance increments into base.
+# Returns {lost, field, value, ...}; *lost* counts dirty sessions whose hash
+# no longer exists.
+_TAKE_LUA = """
+local lost = 0
+local taken = 0
+for _, sid in ipairs(redis.call('SPOP', KEYS[1], tonumber(ARGV[1]))) do
+  local key = 'vtsess:' .. sid
+  local s = redis.call('HMGET', key, 'pending', 'last_hb', 'paused_at')
+  if not s[1] and not s[2] then
+    lost = lost + 1
+  else
+    redis.call('HSET', KEYS[3], 's:' .. sid, (s[1] or '0') .. '|' .. (s[2] or '') .. '|' .. (s[3] or ''))
+    taken = taken + 1
+    if s[2] then
+      redis.call('HSET', key, 'pending', 0)
+      redis.call('EXPIRE', key, %d)
+    else
+      -- only re-queued seconds are left of a session Redis otherwise lost
+      redis.call('DEL', key)
+    end
+  end
+end
+for _, m in ipairs(redis.call('SPOP', KEYS[2], tonumber(ARGV[1]))) do
+  local pkey = 'vtpend:' .. m
+  local bkey = 'vtbase:' .. m
+  local used = tonumber(redis.call('HGET', pkey, 'used') or '0')
+  local edu = tonumber(redis.call('HGET', pkey, 'edu') or '0')
+  if used ~= 0 or edu ~= 0 then
+    redis.call('HINCRBY', pkey, 'used', -used)
+    redis.call('HINCRBY', pkey, 'edu', -edu)
+    if redis.call('EXISTS', bkey) == 1 then
+      redis.call('HINCRBY', bkey, 'used', used)
+      redis.call('HINCRBY', bkey, 'edu', edu)
+    end
+    redis.call('HSET', KEYS[3], 'b:' .. m, used .. '|' .. edu)
+    taken = taken + 1
+  end
+end
+if taken > 0 then
+  redis.call('ZADD', KEYS[4], ARGV[3], ARGV[2])
+end
+local out = redis.call('HGETALL', KEYS[3])
+table.insert(out, 1, lost)
+return out
+""" % _SESSION_TTL
+
+# KEYS[1]=in-flight hash KEYS[2]=in-flight index KEYS[3]=dirty sessions KEYS[4]=dirty balances
+# ARGV[1]=flush_id.  Puts an unapplied flush back into pending state, then
+# deletes it; a second call for the same flush finds nothing to re-queue.
+_REQUEUE_LUA = """
+local entries = redis.call('HGETALL', KEYS[1])
+for i = 1, #entries, 2 do
+  local kind = string.sub(entries[i], 1, 1)
+  local id = string.sub(entries[i], 3)
+  if kind == 's' then
+    local key = 'vtsess:' .. id
+    local pending = tonumber(string.match(entries[i + 1], '^(-?%%d+)'))
+    if pending ~= 0 then
+      redis.call('HINCRBY', key, 'pending', pending)
+    end
+    if redis.call('EXISTS', key) == 1 then
+      redis.call('PERSIST', key)
+      redis.call('SADD', KEYS[3], id)
+    end
+  else
+    local used, edu = string.match(entries[i + 1], '^(-?%%d+)|(-?%%d+)$')
+    local pkey = 'vtpend:' .. id
+    local bkey = 'vtbase:' .. id
+    redis.call('HINCRBY', pkey, 'used', used)
+    redis.call('HINCRBY', pkey, 'edu', edu)
+    redis.call('EXPIRE', pkey, %d)
+    if redis.call('EXISTS', bkey) == 1 then
+      redis.call('HINCRBY', bkey, 'used', -tonumber(used))
+      redis.call('HINCRBY', bkey, 'edu', -tonumber(edu))
+    end
+    redis.call('SADD', KEYS[4], id)
+  end
+end
+redis.call('DEL', KEYS[1])
+redis.call('ZREM', KEYS[2], ARGV[1])
+return #entries / 2
+""" % _PENDING_TTL
+
+# KEYS[1]=session KEYS[2]=dirty sessions; ARGV[1]=seconds ARGV[2]=session_id
+_RETURN_SESSION_LUA = """
+redis.call('HINCRBY', KEYS[1], 'pending', ARGV[1])
+redis.call('PERSIST', KEYS[1])
+redis.call('SADD', KEYS[2], ARGV[2])
+"""
+
+
+def _session_key(session_id: uuid.UUID | str) -> str:
+    return f"vtsess:{session_id}"
+
+
+def _member(profile_id: uuid.UUID, day: date) -> str:
+    return f"{profile_id}:{day.isoformat()}"
+
+
+def _ts(epoch: float) -> datetime:
+    return datetime.fromtimestamp(epoch, UTC)
+
+
+def _inflight_key(flush_id: uuid.UUID) -> str:
+    return f"vt:inflight:{flush_id}"
+
+
+class HeartbeatAggregator:
+    """Redis-held viewing-time state; a no-op until ``redis`` is set."""
+
+    def __init__(
+        self,
+        flush_batch: int = settings.heartbeat_flush_batch_size,
+        base_ttl: int = settings.heartbeat_balance_cache_seconds,
+    ) -> None:
+        self.flush_batch = flush_batch
+        self.base_ttl = base_ttl
+        self._redis = None
+        self._scripts: dict = {}
+        self._pruned_at = float("-inf")
+
+    @property
+    def redis(self):
+        return self._redis
+
+    @redis.setter
+    def redis(self, client) -> None:
+        # set by the lifespan handler; scripts are bound to the client
+        self._redis = client
+        self._scripts = {
+            name: client.register_script(lua)
+            for name, lua in (
+                ("session_beat", _SESSION_BEAT_LUA),
+                ("balance_beat", _BALANCE_BEAT_LUA),
+                ("take", _TAKE_LUA),
+                ("requeue", _REQUEUE_LUA),
+                ("return_session", _RETURN_SESSION_LUA),
+            )
+        } if client is not None else {}
+
+    @property
+    def enabled(self) -> bool:
+        return self._redis is not None
+
+    # -- sessions -----------------------------------------------------------
+
+    async def seed_session(self, session: ViewingSession, is_kids: bool) -> None:
+        """Load a session row into Redis (new session, or one Redis lost)."""
+        key = _session_key(session.id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={
+                "profile_id": str(session.profile_id),
+                "is_kids": int(is_kids),
+                "is_educational": int(session.is_educational),
+                "paused_at": session.paused_at.timestamp() if session.paused_at else "",
+                "last_hb": session.last_heartbeat_at.timestamp(),
+                "pending": 0,
+            })
+            pipe.expire(key, _SESSION_TTL)
+            await pipe.execute()
+
+    async def session_beat(
+        self,
+        session_id: uuid.UUID,
+        profile_id: uuid.UUID,
+        is_paused: bool,
+        now: float,
+        grace_seconds: int,
+        interval_seconds: int,
+    ) -> tuple[bool, bool, bool] | None:
+        """Apply pause handling and the session increment.
+
+        Returns (incremented, is_kids, is_educational), or None if Redis does
+        not hold the session.  Raises PermissionError for another profile's
+        session.
+        """
+        result = await self._scripts["session_beat"](
+            keys=[_session_key(session_id), DIRTY_SESSIONS_KEY],
+            args=[
+                now, int(is_paused), grace_seconds, interval_seconds,
+                str(profile_id), str(session_id),
+            ],
+        )
+        if result is None:
+            return None
+        if result == -1:
+            raise PermissionError("Session does not belong to this profile")
+        return bool(result[0]), bool(result[1]), bool(result[2])
+
+    async def seed_sessions(self, sessions: list[tuple[ViewingSession, bool]]) -> None:
+        """:meth:`seed_session` for several (session, is_kids) pairs in one round trip."""
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for session, is_kids in sessions:
+                key = _session_key(session.id)
+                pipe.hset(key, mapping={
+                    "profile_id": str(session.profile_id),
+                    "is_kids": int(is_kids),
+                    "is_educational": int(session.is_educational),
+                    "paused_at": session.paused_at.timestamp() if session.paused_at else "",
+                    "last_hb": session.last_heartbeat_at.timestamp(),
+                    "pending": 0,
+                })
+                pipe.expire(key, _SESSION_TTL)
+            await pipe.execute()
+
+    async def session_beats(
+        self,
+        beats: list[tuple[uuid.UUID, uuid.UUID, bool]],
+        now: float,
+        grace_seconds: int,
+        interval_seconds: int,
+    ) -> list[tuple[bool, bool, bool] | PermissionError | None]:
+        """:meth:`session_beat` for several (session_id, profile_id, is_paused)
+        beats in one pipelined round trip, applied in order.
+
+        Another profile's session yields a PermissionError in its slot instead
+        of raising.
+        """
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for session_id, profile_id, is_paused in beats:
+                await self._scripts["session_beat"](
+                    keys=[_session_key(session_id), DIRTY_SESSIONS_KEY],
+                    args=[
+                        now, int(is_paused), grace_seconds, interval_seconds,
+                        str(profile_id), str(session_id),
+                    ],
+                    client=pipe,
+                )
+            raw = await pipe.execute()
+        return [
+            None if r is None
+            else PermissionError("Session does not belong to this profile") if r == -1
+            else (bool(r[0]), bool(r[1]), bool(r[2]))
+            for r in raw
+        ]
+
+    async def take_session(self, session_id: uuid.UUID) -> int:
+        """Take a session's unflushed seconds (used when the session ends)."""
+        key = _session_key(session_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hget(key, "pending")
+            pipe.hset(key, "pending", 0)
+            pending, _ = await pipe.execute()
+        return int(pending or 0)
+
+    async def return_session(self, session_id: uuid.UUID, seconds: int) -> None:
+        if seconds:
+            await self._scripts["return_session"](
+                keys=[_session_key(session_id), DIRTY_SESSIONS_KEY],
+                args=[seconds, str(session_id)],
+            )
+
+    async def drop_session(self, session_id: uuid.UUID) -> None:
+        await self._redis.delete(_session_key(session_id))
+
+    # -- balances -----------------------------------------------------------
+
+    async def balance_beat(
+        self, profile_id: uuid.UUID, day: date, used: int, edu: int
+    ) -> tuple[tuple[int, int, bool] | None, int, int]:
+        """Add increments and return (base or None, pending_used, pending_edu).
+
+        *base* is (used_seconds, educational_seconds, is_unlimited_override)
+        as last seeded from Postgres plus everything flushed since.
+        """
+        member = _member(profile_id, day)
+        b_used, b_edu, b_unl, p_used, p_edu = await self._scripts["balance_beat"](
+            keys=[f"vtbase:{member}", f"vtpend:{member}", DIRTY_BALANCES_KEY],
+            args=[used, edu, member],
+        )
+        base = (int(b_used), int(b_edu), b_unl == "1") if b_used is not None else None
+        return base, int(p_used), int(p_edu)
+
+    async def balance_beats(
+        self, beats: list[tuple[uuid.UUID, date, int, int]]
+    ) -> list[tuple[tuple[int, int, bool] | None, int, int]]:
+        """:meth:`balance_beat` for several (profile_id, day, used, edu) beats
+        in one pipelined round trip.
+
+        Beats are applied in order, so each result reflects the increments of
+        the beats before it and its own.
+        """
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for profile_id, day, used, edu in beats:
+                member = _member(profile_id, day)
+                await self._scripts["balance_beat"](
+                    keys=[f"vtbase:{member}", f"vtpend:{member}", DIRTY_BALANCES_KEY],
+                    args=[used, edu, member],
+                    client=pipe,
+                )
+            raw = await pipe.execute()
+        return [
+            (
+                (int(b_used), int(b_edu), b_unl == "1") if b_used is not None else None,
+                int(p_used),
+                int(p_edu),
+            )
+            for b_used, b_edu, b_unl, p_used, p_edu in raw
+        ]
+
+    async def seed_balances(self, balances: dict[tuple[uuid.UUID, date], tuple[int, int, bool]]) -> None:
+        """:meth:`seed_balance` for several (profile_id, day) keys in one round trip."""
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for (profile_id, day), (used, edu, unlimited) in balances.items():
+                key = f"vtbase:{_member(profile_id, day)}"
+                pipe.hset(key, mapping={"used": used, "edu": edu, "unlimited": int(unlimited)})
+                pipe.expire(key, self.base_ttl)
+            await pipe.execute()
+
+    async def seed_balance(
+        self, profile_id: uuid.UUID, day: date, used: int, edu: int, unlimited: bool
+    ) -> None:
+        key = f"vtbase:{_member(profile_id, day)}"
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={"used": used, "edu": edu, "unlimited": int(unlimited)})
+            pipe.expire(key, self.base_ttl)
+            await pipe.execute()
+
+    async def pending_balance(self, profile_id: uuid.UUID, day: date) -> tuple[int, int]:
+        """Unflushed (used, educational) seconds for a profile's viewing day."""
+        p_used, p_edu = await self._redis.hmget(f"vtpend:{_member(profile_id, day)}", "used", "edu")
+        return int(p_used or 0), int(p_edu or 0)
+
+    async def invalidate_balance(self, profile_id: uuid.UUID, day: date) -> None:
+        """Drop the cached base after the Postgres row changed (e.g. a time grant)."""
+        await self._redis.delete(f"vtbase:{_member(profile_id, day)}")
+
+    # -- flush --------------------------------------------------------------
+
+    async def flush(self, db: AsyncSession) -> tuple[int, int]:
+        """Write accumulated session seconds and balance increments to Postgres.
+
+        Taken state is moved into an in-flight hash under a fresh flush id,
+        written with one UPDATE for sessions and one multi-row upsert for
+        balances, and recorded in ``heartbeat_flushes`` in the same
+        transaction; the in-flight hash is deleted only after the commit.
+        In-flight flushes older than the grace period (left by a crash or a
+        failed settle) are settled first.  Returns (rows written, statements
+        executed).
+        """
+        await self.recover(db)
+
+        flush_id = uuid.uuid4()
+        inflight = _inflight_key(flush_id)
+        taken = await self._scripts["take"](
+            keys=[DIRTY_SESSIONS_KEY, DIRTY_BALANCES_KEY, inflight, INFLIGHT_KEY],
+            args=[self.flush_batch, str(flush_id), time.time()],
+        )
+        lost = int(taken[0])
+        if lost:
+            logger.warning("%d dirty viewing sessions had no Redis state; their unflushed seconds are lost", lost)
+        sessions, balances = _parse_inflight(taken[1:])
+        if not sessions and not balances:
+            return 0, 0
+
+        statements = 0
+        try:
+            if sessions:
+                await db.execute(
+                    text(
+                        "UPDATE viewing_sessions s SET "
+                        "total_seconds = s.total_seconds + v.delta, "
+                        "last_heartbeat_at = GREATEST(s.last_heartbeat_at, v.hb), "
+                        # Only state at least as new as the row may change the pause
+                        # marker; the direct path or an end may have written since.
+                        "paused_at = CASE WHEN v.hb >= s.last_heartbeat_at "
+                        "THEN v.paused ELSE s.paused_at END "
+                        "FROM unnest(CAST(:ids AS uuid[]), CAST(:deltas AS int[]), "
+                        "CAST(:hbs AS timestamptz[]), CAST(:paused AS timestamptz[])) "
+                        "AS v(id, delta, hb, paused) "
+                        "WHERE s.id = v.id"
+                    ).bindparams(
+                        ids=[s[0] for s in sessions],
+                        deltas=[s[1] for s in sessions],
+                        hbs=[s[2] for s in sessions],
+                        paused=[s[3] for s in sessions],
+                    )
+                )
+                statements += 1
+            if balances:
+                now = datetime.now(UTC)
+                rows = [
+                    {
+                        "id": uuid.uuid4(),
+                        "profile_id": profile_id,
+                        "reset_date": day,
+                        "used_seconds": used,
+                        "educational_seconds": edu,
+                        "is_unlimited_override": False,
+                        "updated_at": now,
+                    }
+                    for profile_id, day, used, edu in balances
+                ]
+                stmt = insert(ViewingTimeBalance).values(rows)
+                await db.execute(
+                    stmt.on_conflict_do_update(
+                        constraint="uq_vtb_profile_date",
+                        set_={
+                            "used_seconds": ViewingTimeBalance.used_seconds + stmt.excluded.used_seconds,
+                            "educational_seconds": (
+                                ViewingTimeBalance.educational_seconds
+                                + stmt.excluded.educational_seconds
+                            ),
+                            "updated_at": now,
+                        },
+                    )
+                )
+                statements += 1
+            await db.execute(insert(HeartbeatFlush).values(flush_id=flush_id, applied=True))
+            statements += 1
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            try:
+                await self._settle(db, flush_id)
+            except Exception:
+                logger.exception("Could not settle heartbeat flush %s; it will be recovered later", flush_id)
+            raise
+
+        await self._forget(flush_id)
+        return len(sessions) + len(balances), statements
+
+    async def recover(self, db: AsyncSession) -> int:
+        """Settle in-flight flushes older than the grace period; returns how many.
+
+        Covers flushes orphaned by a crashed process (including one that
+        committed but died before deleting its in-flight hash) as well as
+        flushes whose own settle failed.
+        """
+        flush_ids = await self._redis.zrangebyscore(
+            INFLIGHT_KEY, "-inf", time.time() - _INFLIGHT_GRACE_SECONDS
+        )
+        for flush_id in flush_ids:
+            applied = await self._settle(db, uuid.UUID(flush_id))
+            logger.warning(
+                "Recovered in-flight heartbeat flush %s (%s)",
+                flush_id, "already applied" if applied else "re-queued",
+            )
+
+        if time.monotonic() - self._pruned_at > _LEDGER_PRUNE_INTERVAL:
+            await db.execute(
+                delete(HeartbeatFlush).where(
+                    HeartbeatFlush.settled_at
+                    < datetime.now(UTC) - timedelta(seconds=_LEDGER_RETENTION_SECONDS)
+                )
+            )
+            await db.commit()
+            self._pruned_at = time.monotonic()
+        return len(flush_ids)
+
+    async def _settle(self, db: AsyncSession, flush_id: uuid.UUID) -> bool:
+        """Decide an in-flight flush: drop it if applied, else re-queue it.
+
+        Inserting ``applied = false`` first fences the flush: if its own
+        transaction is still open it now fails on the primary key instead of
+        committing after the increments were re-queued.
+        """
+        await db.execute(
+            insert(HeartbeatFlush)
+            .values(flush_id=flush_id, applied=False)
+            .on_conflict_do_nothing(index_elements=["flush_id"])
+        )
+        applied = (
+            await db.execute(select(HeartbeatFlush.applied).where(HeartbeatFlush.flush_id == flush_id))
+        ).scalar_one()
+        await db.commit()
+        if applied:
+            await self._forget(flush_id)
+        else:
+            await self._scripts["requeue"](
+                keys=[_inflight_key(flush_id), INFLIGHT_KEY, DIRTY_SESSIONS_KEY, DIRTY_BALANCES_KEY],
+                args=[str(flush_id)],
+            )
+        return applied
+
+    async def _forget(self, flush_id: uuid.UUID) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.delete(_inflight_key(flush_id))
+            pipe.zrem(INFLIGHT_KEY, str(flush_id))
+            await pipe.execute()
+
+
+def _parse_inflight(flat: list) -> tuple[list, list]:
+    """Split in-flight hash entries into session and balance rows.
+
+    Sessions are (id, seconds, last heartbeat or None, paused_at or None);
+    balances are (profile_id, day, used, edu).
+    """
+    sessions, balances = [], []
+    for field, value in zip(flat[::2], flat[1::2]):
+        kind, key = field.split(":", 1)
+        if kind == "s":
+            pending, last_hb, paused_at = value.split("|")
+            sessions.append((
+                uuid.UUID(key),
+                int(pending),
+                _ts(float(last_hb)) if last_hb else None,
+                _ts(float(paused_at)) if paused_at else None,
+            ))
+        else:
+            profile_id, day = key.split(":")
+            used, edu = value.split("|")
+            balances.append((uuid.UUID(profile_id), date.fromisoformat(day), int(used), int(edu)))
+    return sessions, balances
+
+
+# Module-level singleton
+heartbeat_aggregator = HeartbeatAggregator()
@@ -82,6 +82,9 @@ class PerformanceMetrics:
         self.heartbeat_duration_ms_sum: float = 0.0
         self.heartbeat_duration_ms_max: float = 0.0
         self._heartbeat_durations: list[float] = []  # for p95 calculation
+        self.heartbeat_flushes: int = 0
+        self.heartbeat_flush_rows: int = 0
+        self.heartbeat_flush_db_ops: int = 0
         self.config_cache_hits: int = 0
         self.config_cache_misses: int = 0
         self.config_cache_invalidations: int = 0
@@ -98,6 +101,24 @@ class PerformanceMetrics:
         if len(self._heartbeat_durations) > 1000:
             self._heartbeat_durations = self._heartbeat_durations[-1000:]
 
+    def record_heartbeat_batch(self, count: int, db_ops: int, duration_ms: float) -> None:
+        """Record *count* heartbeats processed together by one batch call.
+
+        Statements and duration are shared by the batch, so each heartbeat is
+        recorded with its amortized share.
+        """
+        if count == 0:
+            return
+        for _ in range(count):
+            self.record_heartbeat(db_ops=0, duration_ms=duration_ms / count)
+        self.heartbeat_db_ops_total += db_ops
+
+    def record_heartbeat_flush(self, rows: int, db_ops: int) -> None:
+        """Record one write-behind flush of aggregated heartbeat state."""
+        self.heartbeat_flushes += 1
+        self.heartbeat_flush_rows += rows
+        self.heartbeat_flush_db_ops += db_ops
+
     def snapshot(self) -> dict:
         """Return a point-in-time snapshot of all metrics."""
         total = self.heartbeat_total or 1  # avoid division by zero
@@ -117,6 +138,10 @@ class PerformanceMetrics:
                 "avg_duration_ms": round(self.heartbeat_duration_ms_sum / total, 2),
                 "max_duration_ms": round(self.heartbeat_duration_ms_max, 2),
                 "p95_duration_ms": round(p95, 2),
+                # Write-behind flush cost, amortized over all heartbeats
+                "flushes": self.heartbeat_flushes,
+                "flushed_rows": self.heartbeat_flush_rows,
+                "avg_flush_db_ops_per_heartbeat": round(self.heartbeat_flush_db_ops / total, 4),
             },
             "config_cache": {
                 "hit_rate": round(self.config_cache_hits / cache_total, 4) if cache_total > 0 else 0.0,
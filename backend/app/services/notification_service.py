@@ -1,9 +1,10 @@
 """Notification service for catch-up/start-over expiry alerts."""
 
 import logging
+import uuid
 from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import and_, select
+from sqlalchemy import and_, literal_column, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.epg import Channel, ScheduleEntry
@@ -24,7 +25,9 @@ async def check_expiring_catchup(db: AsyncSession) -> int:
     now = datetime.now(timezone.utc)
     expiry_horizon = now + timedelta(hours=24)
 
-    # Find incomplete TSTV bookmarks
+    # Expiry is end_time + channel CUTV window; only rows expiring within 24h
+    # and not already expired are loaded.
+    expires_at = ScheduleEntry.end_time + literal_column("interval '1 hour'") * Channel.cutv_window_hours
     bk_q = (
         select(Bookmark, ScheduleEntry, Channel)
         .join(ScheduleEntry, ScheduleEntry.id == Bookmark.content_id)
@@ -34,44 +37,50 @@ async def check_expiring_catchup(db: AsyncSession) -> int:
                 Bookmark.content_type.in_(["tstv_catchup", "tstv_startover"]),
                 Bookmark.completed.is_(False),
                 Bookmark.dismissed_at.is_(None),
+                expires_at > now,
+                expires_at <= expiry_horizon,
             )
         )
     )
     result = await db.execute(bk_q)
     rows = result.all()
+    if not rows:
+        logger.debug("No new expiry notifications needed")
+        return 0
+
+    # Existing expiry notifications for these profiles, in one query
+    existing = await db.execute(
+        select(Notification.profile_id, Notification.deep_link).where(
+            and_(
+                Notification.profile_id.in_({bookmark.profile_id for bookmark, _, _ in rows}),
+                Notification.notification_type == "catchup_expiry",
+            )
+        )
+    )
+    links_by_profile: dict[uuid.UUID, list[str]] = {}
+    for profile_id, deep_link in existing:
+        links_by_profile.setdefault(profile_id, []).append(deep_link or "")
 
     created = 0
 
     for bookmark, entry, channel in rows:
-        # Compute expiry from end_time + channel CUTV window
-        cutv_hours = getattr(channel, "cutv_window_hours", 168)
-        expires_at = entry.end_time + timedelta(hours=cutv_hours)
-
-        # Only notify if expiring within 24h and not already expired
-        if expires_at > now and expires_at <= expiry_horizon:
-            # Check if notification already exists for this bookmark
-            existing = await db.execute(
-                select(Notification.id).where(
-                    and_(
-                        Notification.profile_id == bookmark.profile_id,
-                        Notification.notification_type == "catchup_expiry",
-                        Notification.deep_link.contains(str(entry.id)),
-                    )
-                )
-            )
-            if existing.scalar_one_or_none() is not None:
-                continue
+        links = links_by_profile.setdefault(bookmark.profile_id, [])
+        if any(str(entry.id) in link for link in links):
+            continue
 
-            hours_left = max(1, int((expires_at - now).total_seconds() / 3600))
-            notification = Notification(
-                profile_id=bookmark.profile_id,
-                notification_type="catchup_expiry",
-                title=f'"{entry.title}" expires soon',
-                body=f"Your catch-up recording on {channel.name} expires in {hours_left}h. Watch it before it's gone!",
-                deep_link=f"/play/live/{channel.id}?catchup={entry.id}",
-            )
-            db.add(notification)
-            created += 1
+        entry_expires_at = entry.end_time + timedelta(hours=channel.cutv_window_hours)
+        hours_left = max(1, int((entry_expires_at - now).total_seconds() / 3600))
+        deep_link = f"/play/live/{channel.id}?catchup={entry.id}"
+        notification = Notification(
+            profile_id=bookmark.profile_id,
+            notification_type="catchup_expiry",
+            title=f'"{entry.title}" expires soon',
+            body=f"Your catch-up recording on {channel.name} expires in {hours_left}h. Watch it before it's gone!",
+            deep_link=deep_link,
+        )
+        db.add(notification)
+        links.append(deep_link)
+        created += 1
 
     if created:
         await db.commit()
@@ -0,0 +1,157 @@
+"""In-process package → title membership index for SVOD access checks.
+
+Every title that belongs to at least one package gets a dense ordinal, and each
+package's membership is a bitmap over those ordinals (a Python ``int`` used as
+a bit set).  A membership test is a dictionary lookup plus a bit test; "is the
+title in any of these packages" is an OR of a handful of bitmaps.
+
+Membership changes only through the admin package endpoints, which rebuild the
+local index and bump ``packages:version`` in Redis; a lifespan loop in every
+worker rebuilds when it sees the version move.  Readers get ``ready == False``
+until the first build completes, and ``knows() == False`` for packages created
+since the last build; both should fall back to the database.
+"""
+
+import logging
+import time
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+PACKAGE_VERSION_KEY = "packages:version"
+
+
+class PackageIndex:
+    """Bitmap membership index over vod_title package contents.
+
+    - ``_ordinals``: title_id → dense ordinal
+    - ``_title_ids``: ordinal → title_id
+    - ``_members``: package_id → bitmap of member ordinals
+    - ``_tiers``: package_id → package tier
+    - ``_max_streams``: package_id → concurrent stream limit
+    """
+
+    def __init__(self) -> None:
+        self.version: str | None = None
+        self.built_at: float | None = None
+        self._ordinals: dict[uuid.UUID, int] = {}
+        self._title_ids: list[uuid.UUID] = []
+        self._members: dict[uuid.UUID, int] = {}
+        self._tiers: dict[uuid.UUID, str | None] = {}
+        self._max_streams: dict[uuid.UUID, int] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.built_at is not None
+
+    def knows(self, package_ids) -> bool:
+        """True if every one of *package_ids* was present at the last build.
+
+        A package created since then (on another worker, before the version
+        bump reached this one) must be looked up in the database instead.
+        """
+        return all(pid in self._tiers for pid in package_ids)
+
+    def contains(self, package_ids, title_id: uuid.UUID) -> bool:
+        """True if *title_id* is in any of *package_ids*."""
+        ordinal = self._ordinals.get(title_id)
+        if ordinal is None:
+            return False
+        bit = 1 << ordinal
+        return any(self._members.get(pid, 0) & bit for pid in package_ids)
+
+    def packages_for(self, title_id: uuid.UUID) -> list[uuid.UUID]:
+        """Packages containing *title_id*."""
+        ordinal = self._ordinals.get(title_id)
+        if ordinal is None:
+            return []
+        bit = 1 << ordinal
+        return [pid for pid, bits in self._members.items() if bits & bit]
+
+    def tier(self, package_id: uuid.UUID) -> str | None:
+        return self._tiers.get(package_id)
+
+    def max_streams(self, package_ids) -> int:
+        """Most permissive stream limit across *package_ids* (0 if none)."""
+        return max((self._max_streams.get(pid, 0) for pid in package_ids), default=0)
+
+    def titles(self, package_id: uuid.UUID) -> list[uuid.UUID]:
+        """Title ids in *package_id*, in ordinal order."""
+        bits = self._members.get(package_id, 0)
+        ids = []
+        while bits:
+            low = bits & -bits
+            ids.append(self._title_ids[low.bit_length() - 1])
+            bits ^= low
+        return ids
+
+    def count(self, package_id: uuid.UUID) -> int:
+        return self._members.get(package_id, 0).bit_count()
+
+    async def rebuild(self, db: AsyncSession, version: str | None = None) -> int:
+        """Load package membership and swap in a new index.
+
+        *version* is the package version the snapshot reflects.  Returns the
+        number of indexed titles.
+        """
+        started = time.monotonic()
+
+        packages = (
+            await db.execute(text("SELECT id, tier, max_streams FROM content_packages"))
+        ).fetchall()
+        tiers = {r.id: r.tier for r in packages}
+        max_streams = {r.id: r.max_streams for r in packages}
+
+        rows = await db.execute(
+            text(
+                "SELECT package_id, content_id FROM package_contents "
+                "WHERE content_type = 'vod_title' ORDER BY content_id"
+            )
+        )
+        ordinals: dict[uuid.UUID, int] = {}
+        title_ids: list[uuid.UUID] = []
+        members: dict[uuid.UUID, int] = dict.fromkeys(tiers, 0)
+        for r in rows.fetchall():
+            ordinal = ordinals.get(r.content_id)
+            if ordinal is None:
+                ordinal = ordinals[r.content_id] = len(title_ids)
+                title_ids.append(r.content_id)
+            members[r.package_id] = members.get(r.package_id, 0) | (1 << ordinal)
+
+        self._ordinals = ordinals
+        self._title_ids = title_ids
+        self._members = members
+        self._tiers = tiers
+        self._max_streams = max_streams
+        self.version = version
+        self.built_at = time.time()
+        logger.info(
+            "Package index rebuilt: %d packages, %d titles in %.1fms",
+            len(members),
+            len(title_ids),
+            (time.monotonic() - started) * 1000,
+        )
+        return len(title_ids)
+
+    async def current_version(self, redis) -> str:
+        """Package version in Redis ("0" before the first bump)."""
+        return await redis.get(PACKAGE_VERSION_KEY) or "0"
+
+    async def refresh(self, db: AsyncSession, redis) -> None:
+        """Rebuild after a membership change and signal the other workers.
+
+        Called by the admin package endpoints after their commit.
+        """
+        try:
+            version = str(await redis.incr(PACKAGE_VERSION_KEY))
+        except Exception:
+            logger.warning("Package version bump failed", exc_info=True)
+            version = None
+        await self.rebuild(db, version)
+
+
+# Module-level singleton
+package_index = PackageIndex()
@@ -0,0 +1,204 @@
+"""Query-embedding cache and off-loop encoder for semantic search.
+
+Search queries repeat heavily, so query embeddings are cached by normalized
+text: an in-process LRU in front of an optional Redis tier shared by all
+workers.  Misses are encoded on a dedicated thread, never on the event loop,
+and concurrent misses arriving within a short window are encoded together in
+a single ``model.encode`` call.  Identical queries already being encoded share
+the in-flight result instead of encoding twice.
+"""
+
+import asyncio
+import base64
+import hashlib
+import logging
+import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.config import settings
+from app.services import embedding_service
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """Cache key for *text*: case-folded with whitespace collapsed.
+
+    The embedding model is uncased, so case folding does not change the vector.
+    """
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+def _encode_many(texts: list[str]) -> np.ndarray:
+    """Encode a micro-batch on the encoder thread."""
+    model = embedding_service.get_model()
+    return model.encode(
+        texts, batch_size=len(texts), normalize_embeddings=True, convert_to_numpy=True
+    ).astype(np.float32)
+
+
+class QueryEmbedder:
+    """Cached, micro-batched query encoder.
+
+    - **LRU**: ``query_embedding_cache_size`` entries held in process.
+    - **Redis tier**: optional; enabled when ``redis`` is set and
+      ``query_embedding_redis_ttl_seconds`` is positive.
+    - **Thread safety**: Not required — single asyncio event loop; only
+      ``model.encode`` runs on the encoder thread.
+    """
+
+    def __init__(
+        self,
+        max_size: int = settings.query_embedding_cache_size,
+        redis_ttl: int = settings.query_embedding_redis_ttl_seconds,
+        batch_window_ms: float = settings.query_embedding_batch_window_ms,
+        max_batch: int = settings.query_embedding_max_batch,
+    ) -> None:
+        self.max_size = max_size
+        self.redis_ttl = redis_ttl
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch = max_batch
+        self.redis = None  # set by the lifespan handler
+
+        self._lru: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._queue: list[str] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="query-embed")
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.batches = 0
+        self.encoded = 0
+
+    # -- public API ---------------------------------------------------------
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Return the normalized float32 embedding for query *text*."""
+        key = normalize_query(text)
+
+        vector = self._lru.get(key)
+        if vector is not None:
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return vector
+
+        vector = await self._redis_get(key)
+        if vector is not None:
+            self.redis_hits += 1
+            self._put(key, vector)
+            return vector
+
+        self.misses += 1
+        vector = await asyncio.shield(self._enqueue(key))
+        self._put(key, vector)
+        await self._redis_set(key, vector)
+        return vector
+
+    def snapshot(self) -> dict:
+        lookups = self.hits + self.redis_hits + self.misses
+        return {
+            "hit_rate": round((self.hits + self.redis_hits) / lookups, 4) if lookups else 0.0,
+            "total_hits": self.hits + self.redis_hits,
+            "total_misses": self.misses,
+            "total_invalidations": 0,
+            "current_size": len(self._lru),
+            "max_size": self.max_size,
+            "redis_hits": self.redis_hits,
+            "encode_batches": self.batches,
+            "avg_batch_size": round(self.encoded / self.batches, 2) if self.batches else 0.0,
+        }
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # -- in-process LRU -----------------------------------------------------
+
+    def _put(self, key: str, vector: np.ndarray) -> None:
+        if key in self._lru:
+            self._lru.move_to_end(key)
+        elif len(self._lru) >= self.max_size:
+            self._lru.popitem(last=False)
+        self._lru[key] = vector
+
+    # -- Redis tier ---------------------------------------------------------
+
+    def _redis_key(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return f"qemb:{settings.embedding_model}:{digest}"
+
+    async def _redis_get(self, key: str) -> np.ndarray | None:
+        if self.redis is None or self.redis_ttl <= 0:
+            return None
+        try:
+            raw = await self.redis.get(self._redis_key(key))
+        except Exception:
+            logger.warning("Query embedding Redis read failed", exc_info=True)
+            return None
+        if raw is None:
+            return None
+        return np.frombuffer(base64.b64decode(raw), dtype=np.float32)
+
+    async def _redis_set(self, key: str, vector: np.ndarray) -> None:
+        if self.redis is None or self.redis_ttl <= 0:
+            return
+        try:
+            payload = base64.b64encode(vector.astype(np.float32).tobytes()).decode()
+            await self.redis.set(self._redis_key(key), payload, ex=self.redis_ttl)
+        except Exception:
+            logger.warning("Query embedding Redis write failed", exc_info=True)
+
+    # -- micro-batching -----------------------------------------------------
+
+    def _enqueue(self, key: str) -> asyncio.Future:
+        future = self._inflight.get(key)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._inflight[key] = future
+        self._queue.append(key)
+
+        if len(self._queue) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        return future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._queue = self._queue, []
+        if batch:
+            asyncio.get_running_loop().create_task(self._run_batch(batch))
+
+    async def _run_batch(self, keys: list[str]) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            vectors = await loop.run_in_executor(self._executor, _encode_many, keys)
+        except Exception as exc:
+            logger.exception("Query embedding batch of %d failed", len(keys))
+            for key in keys:
+                future = self._inflight.pop(key)
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        self.batches += 1
+        self.encoded += len(keys)
+        for key, vector in zip(keys, vectors):
+            future = self._inflight.pop(key)
+            if not future.done():
+                future.set_result(vector)
+
+
+# Module-level singleton
+query_embedder = QueryEmbedder()
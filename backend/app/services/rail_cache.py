@@ -0,0 +1,207 @@
+"""Materialized global rails — trending, new releases and per-genre top-N.
+
+These rails are identical for every profile apart from the parental
+``allowed_ratings`` filter, so they are precomputed once per rating tier by a
+lifespan background loop and served from memory on home requests.  Readers get
+``None`` until the first build completes (or when a request falls outside the
+materialized depth) and should fall back to the live query.
+"""
+
+import logging
+import time
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.rating_utils import RATING_HIERARCHY, get_allowed_ratings
+
+logger = logging.getLogger(__name__)
+
+# How many items are materialized per rail and tier; requests for longer
+# rails fall back to the live query.
+RAIL_CACHE_DEPTH = 50
+
+_UNRESTRICTED_TIER = "all"
+
+
+def _tier_key(allowed_ratings: list[str] | None) -> str:
+    if allowed_ratings is None:
+        return _UNRESTRICTED_TIER
+    return ",".join(allowed_ratings)
+
+
+def _all_tiers() -> list[list[str] | None]:
+    """Every distinct allowed_ratings value that rating_utils can produce."""
+    return [get_allowed_ratings(r) for r in RATING_HIERARCHY]
+
+
+def _rail_item(r) -> dict:
+    return {
+        "id": r.id,
+        "title": r.title,
+        "title_type": r.title_type,
+        "poster_url": r.poster_url,
+        "landscape_url": r.landscape_url,
+        "synopsis_short": r.synopsis_short,
+        "release_year": r.release_year,
+        "age_rating": r.age_rating,
+        "similarity_score": None,
+    }
+
+
+def _split_by_tier(rows: list, sort_key) -> dict[str, list[dict]]:
+    """Fan rows (already top-N per age_rating) out into per-tier rails.
+
+    Rows with a NULL age_rating are only visible to the unrestricted tier,
+    matching ``t.age_rating IN :allowed`` in the live queries.
+    """
+    rails: dict[str, list[dict]] = {}
+    for allowed in _all_tiers():
+        if allowed is None:
+            tier_rows = rows
+        else:
+            allowed_set = set(allowed)
+            tier_rows = [r for r in rows if r.age_rating in allowed_set]
+        tier_rows = sorted(tier_rows, key=sort_key)[:RAIL_CACHE_DEPTH]
+        rails[_tier_key(allowed)] = [_rail_item(r) for r in tier_rows]
+    return rails
+
+
+class RailCache:
+    """In-process snapshot of materialized global rails.
+
+    Each rebuild produces a complete new snapshot that replaces the previous
+    one in a single assignment, so readers never see a half-built version.
+    ``version`` increments on every successful rebuild.
+    """
+
+    def __init__(self) -> None:
+        self.version: int = 0
+        self.built_at: float | None = None
+        self._rails: dict[str, list[dict]] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def _lookup(self, key: str, limit: int) -> list[dict] | None:
+        items = self._rails.get(key) if limit <= RAIL_CACHE_DEPTH else None
+        if items is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return items[:limit]
+
+    def get(self, rail: str, allowed_ratings: list[str] | None, limit: int) -> list[dict] | None:
+        """Return a materialized rail ('trending' or 'new_releases'), or None on miss."""
+        return self._lookup(f"{rail}:{_tier_key(allowed_ratings)}", limit)
+
+    def get_genre(
+        self, genre_id: uuid.UUID, allowed_ratings: list[str] | None, limit: int
+    ) -> list[dict] | None:
+        """Return the newest titles in *genre_id* for the tier, or None on miss."""
+        if not self._rails or limit > RAIL_CACHE_DEPTH:
+            self.misses += 1
+            return None
+        # A genre with no titles in this tier is a legitimate empty rail.
+        self.hits += 1
+        return self._rails.get(f"genre:{genre_id}:{_tier_key(allowed_ratings)}", [])[:limit]
+
+    async def rebuild(self, db: AsyncSession) -> int:
+        """Recompute every materialized rail and swap in the new snapshot.
+
+        Returns the new snapshot version.
+        """
+        started = time.monotonic()
+        rails: dict[str, list[dict]] = {}
+
+        # Trending: time-decayed bookmark popularity (7-day half-life), top-N
+        # per age rating so every tier can be assembled from one aggregation.
+        trending_q = await db.execute(
+            text(
+                """
+                SELECT * FROM (
+                    SELECT s.*, ROW_NUMBER() OVER (
+                        PARTITION BY s.age_rating ORDER BY s.decay_score DESC
+                    ) AS rn
+                    FROM (
+                        SELECT t.id, t.title, t.title_type, t.poster_url, t.landscape_url,
+                               t.synopsis_short, t.release_year, t.age_rating,
+                               SUM(EXP(-EXTRACT(EPOCH FROM (NOW() - b.updated_at)) / (7 * 86400)))
+                                   AS decay_score
+                        FROM titles t
+                        JOIN bookmarks b ON b.content_id = t.id
+                        GROUP BY t.id
+                    ) s
+                ) ranked
+                WHERE rn <= :depth
+                """
+            ).bindparams(depth=RAIL_CACHE_DEPTH)
+        )
+        for tier, items in _split_by_tier(
+            trending_q.fetchall(), sort_key=lambda r: -float(r.decay_score)
+        ).items():
+            rails[f"trending:{tier}"] = items
+
+        # New releases: newest titles per age rating.
+        new_q = await db.execute(
+            text(
+                """
+                SELECT * FROM (
+                    SELECT t.id, t.title, t.title_type, t.poster_url, t.landscape_url,
+                           t.synopsis_short, t.release_year, t.age_rating, t.created_at,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY t.age_rating ORDER BY t.created_at DESC
+                           ) AS rn
+                    FROM titles t
+                ) ranked
+                WHERE rn <= :depth
+                """
+            ).bindparams(depth=RAIL_CACHE_DEPTH)
+        )
+        for tier, items in _split_by_tier(
+            new_q.fetchall(), sort_key=lambda r: -r.created_at.timestamp()
+        ).items():
+            rails[f"new_releases:{tier}"] = items
+
+        # Genre top-N: newest titles per (genre, age rating).
+        genre_q = await db.execute(
+            text(
+                """
+                SELECT * FROM (
+                    SELECT tg.genre_id, t.id, t.title, t.title_type, t.poster_url,
+                           t.landscape_url, t.synopsis_short, t.release_year,
+                           t.age_rating, t.created_at,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY tg.genre_id, t.age_rating ORDER BY t.created_at DESC
+                           ) AS rn
+                    FROM titles t
+                    JOIN title_genres tg ON tg.title_id = t.id
+                ) ranked
+                WHERE rn <= :depth
+                """
+            ).bindparams(depth=RAIL_CACHE_DEPTH)
+        )
+        by_genre: dict[uuid.UUID, list] = {}
+        for r in genre_q.fetchall():
+            by_genre.setdefault(r.genre_id, []).append(r)
+        for genre_id, rows in by_genre.items():
+            for tier, items in _split_by_tier(
+                rows, sort_key=lambda r: -r.created_at.timestamp()
+            ).items():
+                if items:
+                    rails[f"genre:{genre_id}:{tier}"] = items
+
+        self._rails = rails
+        self.version += 1
+        self.built_at = time.time()
+        logger.info(
+            "Rail cache rebuilt: version=%d keys=%d in %.1fms",
+            self.version,
+            len(rails),
+            (time.monotonic() - started) * 1000,
+        )
+        return self.version
+
+
+# Module-level singleton
+rail_cache = RailCache()
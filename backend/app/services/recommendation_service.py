@@ -1,18 +1,24 @@
 """Service layer for content recommendations backed by pgvector similarity search."""
 
+import asyncio
 import logging
 import math
 import uuid
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 
 import numpy as np
 from sqlalchemy import bindparam, func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
+from app.database import async_session_factory
 from app.models.catalog import Episode, Genre, Season, Title, TitleGenre
-from app.models.embedding import ContentEmbedding
+from app.models.embedding import EMBEDDING_DIM, ContentEmbedding, ProfileEmbedding, TitleNeighbor
 from app.models.viewing import Bookmark, Rating, WatchlistItem
 from app.schemas.viewing import ContinueWatchingItem
+from app.services.rail_cache import rail_cache
+from app.vector_codec import to_query_vector
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +42,270 @@ def _title_to_rail_item(row, similarity: float | None = None) -> dict:
     }
 
 
+@dataclass
+class ProfileInteractions:
+    """A profile's interaction sets, fetched once and shared across rails."""
+
+    bookmarked_ids: set[uuid.UUID] = field(default_factory=set)
+    thumbs_up_ids: set[uuid.UUID] = field(default_factory=set)
+    thumbs_down_ids: set[uuid.UUID] = field(default_factory=set)
+    watchlist_ids: set[uuid.UUID] = field(default_factory=set)
+
+    @property
+    def centroid_ids(self) -> set[uuid.UUID]:
+        """Titles contributing to the taste vector (see interaction_weight)."""
+        return (
+            self.bookmarked_ids | self.thumbs_up_ids | self.watchlist_ids
+        ) - self.thumbs_down_ids
+
+    @property
+    def excluded_ids(self) -> set[uuid.UUID]:
+        """All interacted + thumbs-down titles (never recommended back)."""
+        return self.bookmarked_ids | self.thumbs_up_ids | self.thumbs_down_ids | self.watchlist_ids
+
+
+async def get_profile_interactions(
+    db: AsyncSession, profile_id: uuid.UUID
+) -> ProfileInteractions:
+    """Fetch bookmarks, ratings and watchlist for a profile in a single round trip."""
+    result = await db.execute(
+        text(
+            """
+            SELECT 'bookmark' AS kind, b.content_id AS title_id
+            FROM bookmarks b WHERE b.profile_id = :pid
+            UNION ALL
+            SELECT CASE WHEN r.rating = 1 THEN 'up' ELSE 'down' END, r.title_id
+            FROM ratings r WHERE r.profile_id = :pid
+            UNION ALL
+            SELECT 'watchlist', w.title_id
+            FROM watchlist w WHERE w.profile_id = :pid
+            """
+        ).bindparams(pid=profile_id)
+    )
+    interactions = ProfileInteractions()
+    buckets = {
+        "bookmark": interactions.bookmarked_ids,
+        "up": interactions.thumbs_up_ids,
+        "down": interactions.thumbs_down_ids,
+        "watchlist": interactions.watchlist_ids,
+    }
+    for row in result.fetchall():
+        buckets[row.kind].add(row.title_id)
+    return interactions
+
+
+# ---------------------------------------------------------------------------
+# Profile taste vectors
+# ---------------------------------------------------------------------------
+
+# Per-title contribution to a profile's taste vector.  A title counts once, at
+# its strongest signal; a thumbs-down removes it entirely.
+THUMBS_UP_WEIGHT = 2.0
+BOOKMARK_WEIGHT = 1.0
+WATCHLIST_WEIGHT = 0.5
+
+# Weight totals at or below this are treated as empty (float drift)
+_WEIGHT_EPSILON = 1e-6
+
+
+def interaction_weight(*, bookmarked: bool, rating: int | None, watchlisted: bool) -> float:
+    """Return the weight a title carries in the profile's taste vector."""
+    if rating == -1:
+        return 0.0
+    if rating == 1:
+        return THUMBS_UP_WEIGHT
+    if bookmarked:
+        return BOOKMARK_WEIGHT
+    if watchlisted:
+        return WATCHLIST_WEIGHT
+    return 0.0
+
+
+async def get_title_weight(
+    db: AsyncSession, profile_id: uuid.UUID, title_id: uuid.UUID
+) -> float:
+    """Current taste-vector weight of *title_id* for the profile (one query)."""
+    row = (
+        await db.execute(
+            text(
+                """
+                SELECT EXISTS (
+                           SELECT 1 FROM bookmarks
+                           WHERE profile_id = :pid AND content_id = :tid
+                       ) AS bookmarked,
+                       (SELECT rating FROM ratings
+                        WHERE profile_id = :pid AND title_id = :tid) AS rating,
+                       EXISTS (
+                           SELECT 1 FROM watchlist
+                           WHERE profile_id = :pid AND title_id = :tid
+                       ) AS watchlisted
+                """
+            ).bindparams(pid=profile_id, tid=title_id)
+        )
+    ).one()
+    return interaction_weight(
+        bookmarked=row.bookmarked, rating=row.rating, watchlisted=row.watchlisted
+    )
+
+
+async def rebuild_taste_vector(
+    db: AsyncSession, profile_id: uuid.UUID, *, replace: bool = True
+) -> tuple[np.ndarray, float]:
+    """Recompute a profile's taste vector from its full history and store it.
+
+    Used to backfill profiles that have no row yet.  With ``replace=False`` a
+    row written concurrently (by an interaction that saw newer history) is
+    kept and returned instead.  Does not commit.
+    Returns ``(vector_sum, weight_total)``.
+    """
+    interactions = await get_profile_interactions(db, profile_id)
+    weights: dict[uuid.UUID, float] = {}
+    for tid in interactions.centroid_ids:
+        weights[tid] = interaction_weight(
+            bookmarked=tid in interactions.bookmarked_ids,
+            rating=1 if tid in interactions.thumbs_up_ids else None,
+            watchlisted=tid in interactions.watchlist_ids,
+        )
+
+    vector_sum = np.zeros(EMBEDDING_DIM, dtype=np.float64)
+    weight_total = 0.0
+    if weights:
+        emb_q = await db.execute(
+            select(ContentEmbedding.title_id, ContentEmbedding.embedding).where(
+                ContentEmbedding.title_id.in_(weights.keys())
+            )
+        )
+        for row in emb_q.fetchall():
+            w = weights[row.title_id]
+            vector_sum += w * np.asarray(row.embedding, dtype=np.float64)
+            weight_total += w
+
+    on_conflict = (
+        """
+        DO UPDATE
+        SET vector_sum = EXCLUDED.vector_sum,
+            weight_total = EXCLUDED.weight_total,
+            updated_at = NOW()
+        """
+        if replace
+        else "DO NOTHING"
+    )
+    result = await db.execute(
+        text(
+            f"""
+            INSERT INTO profile_embeddings (profile_id, vector_sum, weight_total, updated_at)
+            VALUES (:pid, CAST(:vec AS vector), :wt, NOW())
+            ON CONFLICT (profile_id) {on_conflict}
+            """
+        ).bindparams(pid=profile_id, vec=to_query_vector(vector_sum), wt=weight_total)
+    )
+    if result.rowcount == 0:
+        row = (
+            await db.execute(
+                select(ProfileEmbedding.vector_sum, ProfileEmbedding.weight_total).where(
+                    ProfileEmbedding.profile_id == profile_id
+                )
+            )
+        ).one()
+        return np.asarray(row.vector_sum, dtype=np.float64), row.weight_total
+    return vector_sum, weight_total
+
+
+async def _backfill_taste_vector(
+    db: AsyncSession, profile_id: uuid.UUID
+) -> tuple[np.ndarray, float]:
+    vector_sum, weight_total = await rebuild_taste_vector(db, profile_id, replace=False)
+    await db.commit()
+    return vector_sum, weight_total
+
+
+async def update_taste_vector(
+    db: AsyncSession,
+    profile_id: uuid.UUID,
+    title_id: uuid.UUID,
+    old_weight: float,
+) -> None:
+    """Apply the change in *title_id*'s weight to the profile's running sum.
+
+    Call after the interaction write has been flushed, passing the weight
+    captured with :func:`get_title_weight` before the write.  Costs one
+    weight lookup, one embedding fetch and one UPDATE; profiles without a
+    stored vector are rebuilt from scratch instead.  Does not commit.
+
+    The stored sum includes every interacted title's current embedding:
+    writing a title's first (or a new) embedding drops the stored vectors of
+    profiles that interacted with it.  If the sum still drifts (an
+    interaction racing the title's first embedding), a negative weight total
+    triggers a rebuild.
+    """
+    new_weight = await get_title_weight(db, profile_id, title_id)
+    delta = new_weight - old_weight
+    if delta == 0:
+        return
+
+    emb = (
+        await db.execute(
+            select(ContentEmbedding.embedding).where(ContentEmbedding.title_id == title_id)
+        )
+    ).scalar_one_or_none()
+    if emb is None:
+        # Episodes and titles without embeddings never contribute.
+        return
+
+    delta_vec = to_query_vector(np.asarray(emb, dtype=np.float64) * delta)
+    weight_total = (
+        await db.execute(
+            text(
+                """
+                UPDATE profile_embeddings
+                SET vector_sum = vector_sum + CAST(:vec AS vector),
+                    weight_total = weight_total + :dw,
+                    updated_at = NOW()
+                WHERE profile_id = :pid
+                RETURNING weight_total
+                """
+            ).bindparams(pid=profile_id, vec=delta_vec, dw=delta)
+        )
+    ).scalar_one_or_none()
+    # Below zero means a contribution was removed that was never added.
+    if weight_total is None or weight_total < -_WEIGHT_EPSILON:
+        await rebuild_taste_vector(db, profile_id)
+
+
+async def get_taste_vector(
+    db: AsyncSession,
+    profile_id: uuid.UUID,
+    *,
+    backfill_session: AsyncSession | None = None,
+) -> list[float] | None:
+    """Return the profile's taste centroid, or None when it has no interactions.
+
+    Reads the persisted running sum (one primary-key lookup); profiles that
+    predate the taste-vector store are backfilled on first read and the
+    backfill committed.  It runs on *backfill_session* when the caller owns a
+    session it may commit (possibly *db* itself), else on a dedicated one so
+    the caller's transaction is never committed.
+    """
+    row = (
+        await db.execute(
+            select(ProfileEmbedding.vector_sum, ProfileEmbedding.weight_total).where(
+                ProfileEmbedding.profile_id == profile_id
+            )
+        )
+    ).first()
+    if row is None and backfill_session is not None:
+        vector_sum, weight_total = await _backfill_taste_vector(backfill_session, profile_id)
+    elif row is None:
+        vector_sum, weight_total = await _on_own_session(_backfill_taste_vector, profile_id)
+    else:
+        vector_sum, weight_total = row.vector_sum, row.weight_total
+
+    # Tolerate float drift from repeated increments/decrements.
+    if weight_total <= _WEIGHT_EPSILON:
+        return None
+    return (np.asarray(vector_sum, dtype=np.float64) / weight_total).tolist()
+
+
 # ---------------------------------------------------------------------------
 # Core recommendation functions
 # ---------------------------------------------------------------------------
@@ -47,14 +317,80 @@ async def get_similar_titles(
     *,
     allowed_ratings: list[str] | None = None,
 ) -> list[dict]:
-    """Return titles most similar to *title_id* using pgvector cosine distance.
+    """Return titles most similar to *title_id* by embedding cosine similarity.
+
+    Served from the precomputed ``title_neighbors`` table (see
+    ``embedding_service.rebuild_title_neighbors``) with the parental filter
+    applied at read time.  A live kNN query is used only when the stored
+    list cannot fill *limit*: for the whole page when the title has no
+    stored neighbours yet (embedded since the last rebuild), or to top up
+    the missing count past the stored neighbours when a restricted tier
+    filtered out most of a full-depth list.
+    """
+    age_filter = ""
+    bind_kw: dict = dict(source_id=title_id, lim=limit)
+    extra_params = []
+    if allowed_ratings is not None:
+        age_filter = "AND t.age_rating IN :allowed"
+        bind_kw["allowed"] = list(allowed_ratings)
+        extra_params.append(bindparam("allowed", expanding=True))
+
+    stmt = text(
+        f"""
+        SELECT t.id, t.title, t.title_type, t.poster_url, t.landscape_url,
+               t.synopsis_short, t.release_year, t.age_rating, tn.similarity
+        FROM title_neighbors tn
+        JOIN titles t ON t.id = tn.neighbor_id
+        WHERE tn.title_id = :source_id {age_filter}
+        ORDER BY tn.rank
+        LIMIT :lim
+        """
+    )
+    if extra_params:
+        stmt = stmt.bindparams(*extra_params)
+    rows = (await db.execute(stmt.params(**bind_kw))).fetchall()
+    if len(rows) < limit:
+        stored = (
+            await db.execute(
+                select(func.count())
+                .select_from(TitleNeighbor)
+                .where(TitleNeighbor.title_id == title_id)
+            )
+        ).scalar_one()
+        # A list shorter than the stored depth already holds every other
+        # embedded title, so there is nothing left to top up from.
+        if stored == 0:
+            rows = await _live_similar_titles(db, title_id, age_filter, extra_params, bind_kw)
+        elif stored >= settings.title_neighbor_depth:
+            rows += await _live_similar_titles(
+                db,
+                title_id,
+                age_filter,
+                extra_params,
+                dict(bind_kw, lim=limit - len(rows)),
+                beyond_stored=True,
+            )
 
-    Algorithm:
-      1. Fetch the embedding for the source title.
-      2. Run a nearest-neighbour query with ``<=>`` (cosine distance).
-      3. Convert distance to similarity score (1 - distance).
+    return [
+        _title_to_rail_item(r, float(r.similarity) if r.similarity is not None else None)
+        for r in rows
+    ]
+
+
+async def _live_similar_titles(
+    db: AsyncSession,
+    title_id: uuid.UUID,
+    age_filter: str,
+    extra_params: list,
+    bind_kw: dict,
+    *,
+    beyond_stored: bool = False,
+) -> list:
+    """Nearest-neighbour query against content_embeddings for *title_id*.
+
+    With *beyond_stored*, titles already in its stored neighbour list are
+    skipped.
     """
-    # 1. Get source embedding.
     src = await db.execute(
         select(ContentEmbedding.embedding).where(
             ContentEmbedding.title_id == title_id
@@ -64,18 +400,13 @@ async def get_similar_titles(
     if src_row is None:
         return []
 
-    source_vector = src_row[0]
-
-    # 2. Nearest-neighbour query.
-    # Convert numpy floats to plain Python floats for pgvector compatibility.
-    vec_str = "[" + ",".join(str(float(v)) for v in source_vector) + "]"
-    age_filter = ""
-    bind_kw: dict = dict(query_vec=vec_str, source_id=title_id, lim=limit)
-    extra_params = []
-    if allowed_ratings is not None:
-        age_filter = "AND t.age_rating IN :allowed"
-        bind_kw["allowed"] = list(allowed_ratings)
-        extra_params.append(bindparam("allowed", expanding=True))
+    stored_filter = (
+        "AND ce.title_id NOT IN "
+        "(SELECT neighbor_id FROM title_neighbors WHERE title_id = :source_id)"
+        if beyond_stored
+        else ""
+    )
+    # Bound as a packed float32 buffer (see app.vector_codec).
     stmt = text(
         f"""
         SELECT t.id, t.title, t.title_type, t.poster_url, t.landscape_url,
@@ -83,29 +414,17 @@ async def get_similar_titles(
                1 - (ce.embedding <=> CAST(:query_vec AS vector)) AS similarity
         FROM content_embeddings ce
         JOIN titles t ON t.id = ce.title_id
-        WHERE ce.title_id != :source_id {age_filter}
+        WHERE ce.title_id != :source_id {age_filter} {stored_filter}
         ORDER BY ce.embedding <=> CAST(:query_vec AS vector)
         LIMIT :lim
         """
     )
     if extra_params:
         stmt = stmt.bindparams(*extra_params)
-    result = await db.execute(stmt.params(**bind_kw))
-
-    return [
-        {
-            "id": r.id,
-            "title": r.title,
-            "title_type": r.title_type,
-            "poster_url": r.poster_url,
-            "landscape_url": r.landscape_url,
-            "synopsis_short": r.synopsis_short,
-            "release_year": r.release_year,
-            "age_rating": r.age_rating,
-            "similarity_score": float(r.similarity) if r.similarity is not None else None,
-        }
-        for r in result.fetchall()
-    ]
+    result = await db.execute(
+        stmt.params(query_vec=to_query_vector(src_row[0]), **bind_kw)
+    )
+    return result.fetchall()
 
 
 async def get_for_you_rail(
@@ -114,70 +433,33 @@ async def get_for_you_rail(
     limit: int = 20,
     *,
     allowed_ratings: list[str] | None = None,
+    interactions: ProfileInteractions | None = None,
+    backfill_session: AsyncSession | None = None,
 ) -> list[dict]:
-    """Build a 'For You' rail by averaging the profile's interaction embeddings.
+    """Build a 'For You' rail from the profile's persisted taste vector.
 
     Steps:
-      1. Gather title IDs the profile has bookmarked or positively rated.
-      2. Fetch those embeddings and compute the centroid vector.
+      1. Gather title IDs the profile has interacted with, for exclusion
+         (reuses *interactions* when the caller already fetched them).
+      2. Read the profile's taste centroid (see :func:`get_taste_vector`;
+         a backfill runs on *backfill_session* when given).
       3. Run a similarity search against the centroid, excluding already-watched.
     """
     # 1. Collect interacted title IDs.
-    bookmark_q = await db.execute(
-        select(Bookmark.content_id).where(Bookmark.profile_id == profile_id)
-    )
-    bookmarked_ids = {row[0] for row in bookmark_q.fetchall()}
-
-    rating_q = await db.execute(
-        select(Rating.title_id).where(
-            Rating.profile_id == profile_id,
-            Rating.rating == 1,
-        )
-    )
-    rated_ids = {row[0] for row in rating_q.fetchall()}
-
-    # Fetch thumbs-down title IDs for exclusion from centroid and results.
-    thumbs_down_q = await db.execute(
-        select(Rating.title_id).where(
-            Rating.profile_id == profile_id,
-            Rating.rating == -1,
-        )
-    )
-    thumbs_down_ids = {row[0] for row in thumbs_down_q.fetchall()}
-
-    # Centroid uses bookmarks + thumbs-up, minus any thumbs-downed titles.
-    centroid_ids = (bookmarked_ids | rated_ids) - thumbs_down_ids
-    # Exclude all interacted + thumbs-down from results.
-    excluded_ids = bookmarked_ids | rated_ids | thumbs_down_ids
+    if interactions is None:
+        interactions = await get_profile_interactions(db, profile_id)
+    excluded_ids = interactions.excluded_ids
 
-    if not centroid_ids:
+    # 2. Incrementally maintained taste centroid.
+    centroid = await get_taste_vector(db, profile_id, backfill_session=backfill_session)
+    if centroid is None:
         return []
 
-    # 2. Fetch embeddings with title_id for thumbs-up weighting.
-    emb_q = await db.execute(
-        select(ContentEmbedding.title_id, ContentEmbedding.embedding).where(
-            ContentEmbedding.title_id.in_(centroid_ids)
-        )
-    )
-    emb_rows = emb_q.fetchall()
-    if not emb_rows:
-        return []
-
-    # Weight thumbs-up titles 2x by duplicating their embedding vectors.
-    vectors = []
-    for row in emb_rows:
-        vectors.append(row.embedding)
-        if row.title_id in rated_ids:
-            vectors.append(row.embedding)
-
-    centroid = np.mean(vectors, axis=0).tolist()
-
     # 3. Similarity search excluding already-interacted titles.
-    # Convert to plain float string for pgvector compatibility.
-    vec_str = "[" + ",".join(str(float(v)) for v in centroid) + "]"
+    query_vec = to_query_vector(centroid)
 
     age_filter = ""
-    bind_kw: dict = dict(query_vec=vec_str, lim=limit, excluded_ids=list(excluded_ids))
+    bind_kw: dict = dict(query_vec=query_vec, lim=limit, excluded_ids=list(excluded_ids))
     extra_params = [bindparam("excluded_ids", expanding=True)]
     if allowed_ratings is not None:
         age_filter = "AND t.age_rating IN :allowed"
@@ -309,6 +591,10 @@ async def _watchlist_rail(
 async def _new_releases_rail(
     db: AsyncSession, limit: int = 20, *, allowed_ratings: list[str] | None = None
 ) -> list[dict]:
+    cached = rail_cache.get("new_releases", allowed_ratings, limit)
+    if cached is not None:
+        return cached
+
     query = select(Title).order_by(Title.created_at.desc()).limit(limit)
     if allowed_ratings is not None:
         query = query.where(Title.age_rating.in_(allowed_ratings))
@@ -319,7 +605,15 @@ async def _new_releases_rail(
 async def _trending_rail(
     db: AsyncSession, limit: int = 20, *, allowed_ratings: list[str] | None = None
 ) -> list[dict]:
-    """Titles ranked by time-decayed bookmark popularity (7-day half-life)."""
+    """Titles ranked by time-decayed bookmark popularity (7-day half-life).
+
+    Served from the materialized rail cache; the live aggregation only runs
+    before the first background build completes.
+    """
+    cached = rail_cache.get("trending", allowed_ratings, limit)
+    if cached is not None:
+        return cached
+
     age_filter = ""
     bind_kw: dict = dict(lim=limit)
     extra_params = []
@@ -392,6 +686,16 @@ async def _top_genre_rail(
     genre_name: str = row.name
     genre_id: uuid.UUID = row.id
 
+    cached = rail_cache.get_genre(genre_id, allowed_ratings, limit)
+    if cached is not None:
+        if not cached:
+            return None
+        return {
+            "name": f"Top in {genre_name}",
+            "rail_type": "genre",
+            "items": cached,
+        }
+
     # Fetch titles in that genre.
     age_filter = ""
     bind_kw: dict = dict(gid=genre_id, lim=limit)
@@ -560,46 +864,95 @@ async def compute_resumption_scores(
 # Public API
 # ---------------------------------------------------------------------------
 
+async def _on_own_session(fn, *args, **kwargs):
+    """Run *fn* on a dedicated pooled session.
+
+    Lets rail builders run concurrently (an ``AsyncSession`` must not be
+    shared between concurrent tasks) and keeps writes such as the taste
+    vector backfill out of the caller's transaction.
+    """
+    async with async_session_factory() as session:
+        return await fn(session, *args, **kwargs)
+
+
+async def _own_for_you_rail(db: AsyncSession, profile_id: uuid.UUID, **kwargs) -> list[dict]:
+    """:func:`get_for_you_rail` on a session the rail owns, so a taste-vector
+    backfill reuses its connection instead of taking another."""
+    return await get_for_you_rail(db, profile_id, backfill_session=db, **kwargs)
+
+
+async def _empty_rail() -> list[dict]:
+    return []
+
+
+async def _no_genre_rail() -> None:
+    return None
+
+
 async def get_home_rails(
     db: AsyncSession,
     profile_id: uuid.UUID,
     *,
     allowed_ratings: list[str] | None = None,
 ) -> list[dict]:
-    """Assemble the full set of home-screen rails for a profile."""
+    """Assemble the full set of home-screen rails for a profile.
+
+    The profile's interaction sets are fetched once on *db* and shared across
+    rails; independent rails then run concurrently, each on its own pooled
+    connection.  Rails that cannot produce items for this profile (e.g. no
+    bookmarks) are skipped without a query, and the trending query is run once
+    and reused for both "Popular Now" and "Trending".
+    """
+    interactions = await get_profile_interactions(db, profile_id)
+    has_bookmarks = bool(interactions.bookmarked_ids)
+
+    (
+        cw_items,
+        wl_items,
+        fy_items,
+        nr_items,
+        tr_items,
+        genre_rail,
+    ) = await asyncio.gather(
+        _on_own_session(_continue_watching_rail, profile_id, allowed_ratings=allowed_ratings)
+        if has_bookmarks else _empty_rail(),
+        _on_own_session(_watchlist_rail, profile_id, allowed_ratings=allowed_ratings)
+        if interactions.watchlist_ids else _empty_rail(),
+        _on_own_session(
+            _own_for_you_rail, profile_id, allowed_ratings=allowed_ratings, interactions=interactions
+        )
+        if interactions.centroid_ids else _empty_rail(),
+        _on_own_session(_new_releases_rail, allowed_ratings=allowed_ratings),
+        _on_own_session(_trending_rail, allowed_ratings=allowed_ratings),
+        _on_own_session(_top_genre_rail, profile_id, allowed_ratings=allowed_ratings)
+        if has_bookmarks else _no_genre_rail(),
+    )
+
     rails: list[dict] = []
 
     # 1. Continue Watching
-    cw_items = await _continue_watching_rail(db, profile_id, allowed_ratings=allowed_ratings)
     if cw_items:
         rails.append({"name": "Continue Watching", "rail_type": "continue_watching", "items": cw_items})
 
     # 2. My List (watchlist)
-    wl_items = await _watchlist_rail(db, profile_id, allowed_ratings=allowed_ratings)
     if wl_items:
         rails.append({"name": "My List", "rail_type": "watchlist", "items": wl_items})
 
     # 3. For You — or "Popular Now" cold-start fallback for new profiles
-    fy_items = await get_for_you_rail(db, profile_id, allowed_ratings=allowed_ratings)
     if fy_items:
         rails.append({"name": "For You", "rail_type": "for_you", "items": fy_items})
-    else:
-        popular_items = await _trending_rail(db, allowed_ratings=allowed_ratings)
-        if popular_items:
-            rails.append({"name": "Popular Now", "rail_type": "popular_now", "items": popular_items})
+    elif tr_items:
+        rails.append({"name": "Popular Now", "rail_type": "popular_now", "items": tr_items})
 
     # 4. New Releases
-    nr_items = await _new_releases_rail(db, allowed_ratings=allowed_ratings)
     if nr_items:
         rails.append({"name": "New Releases", "rail_type": "new_releases", "items": nr_items})
 
-    # 4. Trending
-    tr_items = await _trending_rail(db, allowed_ratings=allowed_ratings)
+    # 5. Trending
     if tr_items:
         rails.append({"name": "Trending", "rail_type": "trending", "items": tr_items})
 
-    # 5. Top genre rail
-    genre_rail = await _top_genre_rail(db, profile_id, allowed_ratings=allowed_ratings)
+    # 6. Top genre rail
     if genre_rail:
         rails.append(genre_rail)
 
@@ -617,53 +970,15 @@ async def get_personalized_featured_titles(
     Returns ``None`` when the profile has no interactions (caller should fall back
     to the default ``created_at DESC`` order).
     """
-    # Compute profile centroid (same logic as get_for_you_rail).
-    bookmark_q = await db.execute(
-        select(Bookmark.content_id).where(Bookmark.profile_id == profile_id)
-    )
-    bookmarked_ids = {row[0] for row in bookmark_q.fetchall()}
-
-    rating_q = await db.execute(
-        select(Rating.title_id).where(
-            Rating.profile_id == profile_id,
-            Rating.rating == 1,
-        )
-    )
-    rated_ids = {row[0] for row in rating_q.fetchall()}
-
-    thumbs_down_q = await db.execute(
-        select(Rating.title_id).where(
-            Rating.profile_id == profile_id,
-            Rating.rating == -1,
-        )
-    )
-    thumbs_down_ids = {row[0] for row in thumbs_down_q.fetchall()}
-
-    centroid_ids = (bookmarked_ids | rated_ids) - thumbs_down_ids
-    if not centroid_ids:
-        return None
-
-    emb_q = await db.execute(
-        select(ContentEmbedding.title_id, ContentEmbedding.embedding).where(
-            ContentEmbedding.title_id.in_(centroid_ids)
-        )
-    )
-    emb_rows = emb_q.fetchall()
-    if not emb_rows:
+    # Profile taste centroid (same vector as get_for_you_rail).
+    centroid = await get_taste_vector(db, profile_id)
+    if centroid is None:
         return None
-
-    vectors = []
-    for row in emb_rows:
-        vectors.append(row.embedding)
-        if row.title_id in rated_ids:
-            vectors.append(row.embedding)
-
-    centroid = np.mean(vectors, axis=0).tolist()
-    vec_str = "[" + ",".join(str(float(v)) for v in centroid) + "]"
+    query_vec = to_query_vector(centroid)
 
     # Fetch featured title IDs sorted by cosine similarity to centroid.
     age_filter = ""
-    bind_kw: dict = dict(query_vec=vec_str)
+    bind_kw: dict = dict(query_vec=query_vec)
     extra_params = []
     if allowed_ratings is not None:
         age_filter = "AND t.age_rating IN :allowed"
@@ -0,0 +1,290 @@
+"""Daily range partitions of schedule_entries: creation ahead, retention behind.
+
+Migration 016 partitions ``schedule_entries`` by ``start_time`` into one
+partition per UTC day named ``schedule_entries_pYYYYMMDD``, plus a default
+partition.  A lifespan loop calls :func:`maintain` to
+
+- create partitions up to ``schedule_partition_premake_days`` ahead, so new
+  EPG data never lands in the default partition, and
+- drop days whose programmes ended before the widest channel CUTV/catch-up
+  window (plus ``schedule_partition_retention_grace_hours``), so TSTV and EPG
+  queries prune to a small set of recent partitions, and purge expired rows
+  that landed in the default partition.
+
+tstv_sessions rows pointing at a dropped day are deleted first; that
+cascade used to come from a foreign key a partitioned table cannot carry.
+Cloud-DVR recordings are kept indefinitely, so a day (or default-partition
+row) that still has recordings is never dropped.  Dropping or purging bumps
+the schedule version so the grid cache and now/next snapshot reload.  Each
+partition operation commits on its own, under a transaction-scoped advisory
+lock that coordinates workers; a table created by ``create_all`` (not
+partitioned) is left alone.
+"""
+
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.epg import ScheduleEntry
+from app.services.epg_snapshot import epg_snapshot
+
+logger = logging.getLogger(__name__)
+
+PARENT = "schedule_entries"
+PARTITION_PREFIX = "schedule_entries_p"
+DEFAULT_PARTITION = "schedule_entries_default"
+
+# Dependents of schedule_entries.id that lost their ON DELETE CASCADE.
+# recordings also reference schedule_entries but are kept: entries they point
+# at are never dropped.
+_DEPENDENTS = ("tstv_sessions",)
+
+_LOCK_KEY = "schedule_partitions"
+# How long partition DDL waits for the parent's lock before giving up until the next run
+_LOCK_TIMEOUT = "5s"
+
+
+def partition_name(day: date) -> str:
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+async def is_partitioned(db: AsyncSession) -> bool:
+    result = await db.execute(
+        text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:parent)"),
+        {"parent": PARENT},
+    )
+    return bool(result.scalar_one_or_none())
+
+
+async def list_partitions(db: AsyncSession) -> dict[date, str]:
+    """Attached daily partitions keyed by UTC day (default partition excluded)."""
+    result = await db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:parent)"
+        ),
+        {"parent": PARENT},
+    )
+    partitions: dict[date, str] = {}
+    for (name,) in result:
+        if not name.startswith(PARTITION_PREFIX):
+            continue
+        try:
+            day = datetime.strptime(name[len(PARTITION_PREFIX):], "%Y%m%d").date()
+        except ValueError:
+            continue
+        partitions[day] = name
+    return partitions
+
+
+async def retention_horizon(db: AsyncSession, now: datetime) -> datetime:
+    """Programmes ending before this instant are outside every catch-up window."""
+    widest = await db.execute(
+        text(
+            "SELECT coalesce(max(greatest(cutv_window_hours, catchup_window_hours)), 0) "
+            "FROM channels"
+        )
+    )
+    hours = widest.scalar_one() + settings.schedule_partition_retention_grace_hours
+    return now - timedelta(hours=hours)
+
+
+async def _begin_locked(db: AsyncSession) -> bool:
+    """Start a maintenance transaction; False if another worker holds the lock.
+
+    Every partition operation runs in its own short transaction so the
+    ACCESS EXCLUSIVE lock DDL takes on the parent is released straight away
+    instead of blocking EPG reads for the whole run; ``lock_timeout`` stops
+    it queueing behind long-running queries (the next run retries).
+    """
+    locked = await db.execute(
+        text("SELECT pg_try_advisory_xact_lock(hashtext(:key))"), {"key": _LOCK_KEY}
+    )
+    if not locked.scalar_one():
+        await db.rollback()
+        return False
+    await db.execute(text(f"SET LOCAL lock_timeout = '{_LOCK_TIMEOUT}'"))
+    return True
+
+
+def _stored_columns() -> str:
+    return ", ".join(c.name for c in ScheduleEntry.__table__.columns if c.computed is None)
+
+
+async def _create_partition(db: AsyncSession, day: date) -> None:
+    """Create *day*'s partition, moving its rows out of the default partition.
+
+    A partition cannot be attached while the default partition holds rows in
+    its range, so in that case the default is detached, the rows are moved
+    into the new partition and the default is attached again.
+    """
+    name = partition_name(day)
+    bounds = {"lower": _day_start(day), "upper": _day_start(day + timedelta(days=1))}
+    create = text(
+        f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF {PARENT} '
+        f"FOR VALUES FROM ('{bounds['lower'].isoformat()}') TO ('{bounds['upper'].isoformat()}')"
+    )
+    stranded = await db.execute(
+        text(
+            f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} "
+            "WHERE start_time >= :lower AND start_time < :upper)"
+        ),
+        bounds,
+    )
+    if not stranded.scalar_one():
+        await db.execute(create)
+        return
+
+    columns = _stored_columns()
+    await db.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {DEFAULT_PARTITION}"))
+    await db.execute(create)
+    moved = await db.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE start_time >= :lower AND start_time < :upper "
+            f'RETURNING {columns}) INSERT INTO "{name}" ({columns}) SELECT {columns} FROM moved'
+        ),
+        bounds,
+    )
+    await db.execute(text(f"ALTER TABLE {PARENT} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    logger.info("Moved %d rows from %s into %s", moved.rowcount, DEFAULT_PARTITION, name)
+
+
+async def create_partitions(
+    db: AsyncSession,
+    existing: dict[date, str],
+    today: date,
+    days_ahead: int,
+) -> list[str] | None:
+    """Create missing daily partitions for *today* through *days_ahead* days on.
+
+    Each partition is created and committed on its own.  Returns None if
+    another worker took the maintenance lock.
+    """
+    created: list[str] = []
+    for offset in range(days_ahead + 1):
+        day = today + timedelta(days=offset)
+        if day in existing:
+            continue
+        if not await _begin_locked(db):
+            return None
+        try:
+            await _create_partition(db, day)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            logger.warning("Could not create schedule partition %s", partition_name(day), exc_info=True)
+            continue
+        created.append(partition_name(day))
+    return created
+
+
+async def drop_expired_partitions(
+    db: AsyncSession,
+    existing: dict[date, str],
+    horizon: datetime,
+) -> list[str] | None:
+    """Detach and drop daily partitions whose whole day ends before *horizon*.
+
+    The day's latest programme can run past midnight, so a partition is kept
+    until the day after it ends has also passed the horizon.  Partitions
+    holding programmes that still have recordings are kept.  Each partition
+    is dropped and committed on its own (``DETACH ... CONCURRENTLY`` is not
+    available while the table has a default partition).  Returns None if
+    another worker took the maintenance lock.
+    """
+    dropped: list[str] = []
+    for day, name in sorted(existing.items()):
+        if _day_start(day + timedelta(days=2)) > horizon:
+            break
+        if not await _begin_locked(db):
+            return None
+        recorded = await db.execute(
+            text(
+                f'SELECT EXISTS (SELECT 1 FROM recordings r JOIN "{name}" e '
+                "ON e.id = r.schedule_entry_id)"
+            )
+        )
+        if recorded.scalar_one():
+            await db.rollback()
+            logger.debug("Keeping schedule partition %s: it has recordings", name)
+            continue
+        for dependent in _DEPENDENTS:
+            await db.execute(
+                text(
+                    f'DELETE FROM {dependent} WHERE schedule_entry_id IN (SELECT id FROM "{name}")'
+                )
+            )
+        await db.execute(text(f'ALTER TABLE {PARENT} DETACH PARTITION "{name}"'))
+        await db.execute(text(f'DROP TABLE "{name}"'))
+        await db.commit()
+        dropped.append(name)
+    return dropped
+
+
+async def purge_default_partition(db: AsyncSession, horizon: datetime) -> int:
+    """Delete rows that ended before *horizon* from the default partition.
+
+    Rows land there when they fall outside every daily partition (e.g. a
+    seed or import of past days).  Rows with recordings are kept; returns
+    the number deleted.
+    """
+    expired = (
+        f"SELECT e.id FROM {DEFAULT_PARTITION} e WHERE e.end_time < :horizon "
+        "AND NOT EXISTS (SELECT 1 FROM recordings r WHERE r.schedule_entry_id = e.id)"
+    )
+    for dependent in _DEPENDENTS:
+        await db.execute(
+            text(f"DELETE FROM {dependent} WHERE schedule_entry_id IN ({expired})"),
+            {"horizon": horizon},
+        )
+    result = await db.execute(
+        text(f"DELETE FROM {DEFAULT_PARTITION} WHERE id IN ({expired})"), {"horizon": horizon}
+    )
+    return result.rowcount
+
+
+async def maintain(
+    db: AsyncSession,
+    now: datetime | None = None,
+    redis=None,
+) -> tuple[int, int]:
+    """Create upcoming partitions and drop expired ones.
+
+    Returns (created, dropped).  A no-op when the table is not partitioned;
+    stops early when another worker holds the maintenance lock.  When rows
+    were removed, the schedule version in *redis* is bumped.
+    """
+    now = now or datetime.now(timezone.utc)
+    if not await is_partitioned(db):
+        return 0, 0
+    existing = await list_partitions(db)
+    horizon = await retention_horizon(db, now)
+    await db.commit()
+
+    created = await create_partitions(
+        db, existing, now.date(), settings.schedule_partition_premake_days
+    )
+    if created is None:
+        return 0, 0
+    dropped = await drop_expired_partitions(db, existing, horizon)
+    if dropped is None:
+        return len(created), 0
+
+    purged = 0
+    if await _begin_locked(db):
+        purged = await purge_default_partition(db, horizon)
+        await db.commit()
+        if purged:
+            logger.info("Purged %d expired rows from %s", purged, DEFAULT_PARTITION)
+    if (dropped or purged) and redis is not None:
+        await epg_snapshot.invalidate(redis)
+    return len(created), len(dropped)
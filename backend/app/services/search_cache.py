@@ -0,0 +1,115 @@
+"""Search response cache tagged with a catalog version.
+
+Entries live in Redis under a key built from the current catalog version and
+the request shape (endpoint, normalized query, mode, allowed_ratings, page,
+page size).  Anything that changes search results — title create/update/delete
+and embedding generation — bumps the version, which orphans every cached
+entry at once; orphans simply expire through their TTL.
+
+Only the catalog-dependent part of a response is cached.  Per-user data such
+as entitlement annotations is recomputed on every request.
+"""
+
+import hashlib
+import json
+import logging
+
+from app.config import settings
+from app.services.query_embedder import normalize_query
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION_KEY = "catalog:version"
+
+
+class SearchCache:
+    """Redis-backed search response cache; a no-op until ``redis`` is set."""
+
+    def __init__(self, ttl: int = settings.search_cache_ttl_seconds) -> None:
+        self.ttl = ttl
+        self.redis = None  # set by the lifespan handler
+
+    @property
+    def enabled(self) -> bool:
+        return self.redis is not None and self.ttl > 0
+
+    async def catalog_version(self) -> str:
+        """Current catalog version ("0" before the first bump or without Redis)."""
+        if self.redis is None:
+            return "0"
+        try:
+            return await self.redis.get(CATALOG_VERSION_KEY) or "0"
+        except Exception:
+            logger.warning("Catalog version read failed", exc_info=True)
+            return "0"
+
+    async def bump_catalog_version(self) -> None:
+        """Invalidate every cached search response."""
+        if self.redis is None:
+            return
+        try:
+            await self.redis.incr(CATALOG_VERSION_KEY)
+        except Exception:
+            logger.warning("Catalog version bump failed", exc_info=True)
+
+    @staticmethod
+    def _key(
+        version: str,
+        endpoint: str,
+        query: str,
+        mode: str,
+        allowed_ratings: list[str] | None,
+        page: int,
+        page_size: int,
+    ) -> str:
+        shape = json.dumps(
+            [endpoint, normalize_query(query), mode, allowed_ratings, page, page_size]
+        )
+        return f"search:{version}:{hashlib.sha1(shape.encode()).hexdigest()}"
+
+    async def get(
+        self,
+        version: str,
+        endpoint: str,
+        query: str,
+        *,
+        mode: str = "",
+        allowed_ratings: list[str] | None = None,
+        page: int = 1,
+        page_size: int,
+    ) -> dict | None:
+        """Return the cached payload for this request shape, or None on miss."""
+        if not self.enabled:
+            return None
+        key = self._key(version, endpoint, query, mode, allowed_ratings, page, page_size)
+        try:
+            raw = await self.redis.get(key)
+        except Exception:
+            logger.warning("Search cache read failed", exc_info=True)
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    async def put(
+        self,
+        version: str,
+        endpoint: str,
+        query: str,
+        payload: dict,
+        *,
+        mode: str = "",
+        allowed_ratings: list[str] | None = None,
+        page: int = 1,
+        page_size: int,
+    ) -> None:
+        """Store *payload* under the catalog *version* read before computing it."""
+        if not self.enabled:
+            return
+        key = self._key(version, endpoint, query, mode, allowed_ratings, page, page_size)
+        try:
+            await self.redis.set(key, json.dumps(payload, default=str), ex=self.ttl)
+        except Exception:
+            logger.warning("Search cache write failed", exc_info=True)
+
+
+# Module-level singleton
+search_cache = SearchCache()
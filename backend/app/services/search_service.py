@@ -1,14 +1,20 @@
 """Hybrid search service — keyword, semantic (pgvector), and RRF-merged search."""
 
+import asyncio
 import logging
+import time
 import uuid
+from dataclasses import dataclass, field
 
-from sqlalchemy import bindparam, exists, or_, select, text
+from sqlalchemy import bindparam, exists, func, null, or_, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.config import settings
+from app.database import async_session_factory
 from app.models.catalog import Genre, Title, TitleCast, TitleGenre
-from app.services import embedding_service
+from app.services.query_embedder import query_embedder
+from app.vector_codec import to_query_vector
 
 logger = logging.getLogger(__name__)
 
@@ -19,67 +25,207 @@ def escape_like(value: str) -> str:
 
 
 # ---------------------------------------------------------------------------
-# T002 — Keyword search with field-level match detection
+# Keyword matching backends (settings.search_backend)
 # ---------------------------------------------------------------------------
 
 
-async def keyword_search(
-    db: AsyncSession,
-    query: str,
-    allowed_ratings: list[str] | None = None,
-    limit: int = 30,
-) -> list[dict]:
-    """Run ILIKE keyword search and track which fields matched."""
+def keyword_filter(query: str):
+    """Return ``(where_clause, rank_expr)`` for a keyword query over Title.
+
+    ``fts``: websearch-style tsquery against the generated ``search_vector``
+    (GIN), plus trigram-indexed substring and word-similarity matching on the
+    title and cast names so partial words and typos still hit.  Ranked by
+    ``ts_rank`` plus title word similarity.
+
+    ``ilike``: unindexed substring scan over title, synopses and cast;
+    ``rank_expr`` is None and callers order by title.
+    """
     pattern = f"%{escape_like(query)}%"
 
+    if settings.search_backend == "ilike":
+        cast_match = exists(
+            select(TitleCast.id).where(
+                TitleCast.title_id == Title.id,
+                TitleCast.person_name.ilike(pattern),
+            )
+        )
+        search_filter = or_(
+            Title.title.ilike(pattern),
+            Title.synopsis_short.ilike(pattern),
+            Title.synopsis_long.ilike(pattern),
+            cast_match,
+        )
+        return search_filter, None
+
+    tsquery = func.websearch_to_tsquery("english", query)
     cast_match = exists(
         select(TitleCast.id).where(
             TitleCast.title_id == Title.id,
-            TitleCast.person_name.ilike(pattern),
+            or_(
+                TitleCast.person_name.ilike(pattern),
+                TitleCast.person_name.op("%>")(query),
+            ),
         )
     )
     search_filter = or_(
+        Title.search_vector.op("@@")(tsquery),
         Title.title.ilike(pattern),
-        Title.synopsis_short.ilike(pattern),
-        Title.synopsis_long.ilike(pattern),
+        Title.title.op("%>")(query),
         cast_match,
     )
+    rank = func.ts_rank(Title.search_vector, tsquery) + func.word_similarity(query, Title.title)
+    return search_filter, rank
+
+
+# ---------------------------------------------------------------------------
+# Match explanation — per-field attribution and highlight snippets
+# ---------------------------------------------------------------------------
+
+_HIGHLIGHT_START = "<mark>"
+_HIGHLIGHT_STOP = "</mark>"
+_HEADLINE_OPTIONS = (
+    f"StartSel={_HIGHLIGHT_START}, StopSel={_HIGHLIGHT_STOP}, "
+    "MaxWords=24, MinWords=10, MaxFragments=1"
+)
+_MAX_MATCHED_CAST = 3
+_SNIPPET_RADIUS = 60
+
+
+def match_explanation_columns(query: str) -> list:
+    """Labelled SELECT columns explaining why a Title row matched *query*.
+
+    Selected alongside Title in the search query itself, so attribution costs
+    no extra round trips: a boolean per text field, the first few matching
+    cast names, and (full-text backend) a ``ts_headline`` synopsis snippet.
+    Postgres evaluates these only for the rows that survive ORDER BY/LIMIT.
+    Read back with ``explain_match``.
+    """
+    pattern = f"%{escape_like(query)}%"
+
+    if settings.search_backend == "ilike":
+        def field_match(column):
+            return column.ilike(pattern)
+
+        title_cond = field_match(Title.title)
+        cast_cond = TitleCast.person_name.ilike(pattern)
+        snippet = null()
+    else:
+        tsquery = func.websearch_to_tsquery("english", query)
+
+        def field_match(column):
+            return or_(
+                column.ilike(pattern),
+                func.to_tsvector("english", func.coalesce(column, "")).op("@@")(tsquery),
+            )
+
+        title_cond = or_(field_match(Title.title), Title.title.op("%>")(query))
+        cast_cond = or_(
+            TitleCast.person_name.ilike(pattern),
+            TitleCast.person_name.op("%>")(query),
+        )
+        snippet = func.ts_headline(
+            "english",
+            func.coalesce(Title.synopsis_long, Title.synopsis_short, ""),
+            tsquery,
+            _HEADLINE_OPTIONS,
+        )
+
+    matched_cast = func.array(
+        select(TitleCast.person_name)
+        .where(TitleCast.title_id == Title.id, cast_cond)
+        .order_by(TitleCast.sort_order)
+        .limit(_MAX_MATCHED_CAST)
+        .scalar_subquery()
+    )
+    return [
+        title_cond.label("title_matched"),
+        field_match(Title.synopsis_short).label("synopsis_short_matched"),
+        field_match(Title.synopsis_long).label("synopsis_long_matched"),
+        matched_cast.label("matched_cast"),
+        snippet.label("snippet"),
+    ]
+
+
+def _substring_snippet(text_value: str | None, query: str) -> str | None:
+    """Highlight the first case-insensitive occurrence of *query* in *text_value*."""
+    if not text_value:
+        return None
+    idx = text_value.lower().find(query.lower())
+    if idx < 0:
+        return None
+    start = max(idx - _SNIPPET_RADIUS, 0)
+    end = min(idx + len(query) + _SNIPPET_RADIUS, len(text_value))
+    return (
+        ("…" if start > 0 else "")
+        + text_value[start:idx]
+        + _HIGHLIGHT_START + text_value[idx:idx + len(query)] + _HIGHLIGHT_STOP
+        + text_value[idx + len(query):end]
+        + ("…" if end < len(text_value) else "")
+    )
+
 
+def explain_match(row, query: str) -> tuple[list[str], dict]:
+    """Turn ``match_explanation_columns`` values into ``(match_fields, highlights)``.
+
+    *row* is a result row carrying the labelled columns and the Title as
+    ``row.Title``.  ``highlights`` holds a ``synopsis`` snippet with
+    ``<mark>`` around matched terms and the matching ``cast`` names.
+    """
+    match_fields: list[str] = []
+    if row.title_matched:
+        match_fields.append("title")
+    if row.synopsis_short_matched:
+        match_fields.append("synopsis_short")
+    if row.synopsis_long_matched:
+        match_fields.append("synopsis_long")
+    if row.matched_cast:
+        match_fields.append("cast")
+    if not match_fields:
+        match_fields.append("keyword")
+
+    snippet = None
+    if row.synopsis_short_matched or row.synopsis_long_matched:
+        snippet = row.snippet
+        if snippet is None:
+            t = row.Title
+            snippet = _substring_snippet(t.synopsis_long, query) or _substring_snippet(
+                t.synopsis_short, query
+            )
+    highlights = {"synopsis": snippet, "cast": list(row.matched_cast or [])}
+    return match_fields, highlights
+
+
+# ---------------------------------------------------------------------------
+# T002 — Keyword search with field-level match detection
+# ---------------------------------------------------------------------------
+
+
+async def keyword_search(
+    db: AsyncSession,
+    query: str,
+    allowed_ratings: list[str] | None = None,
+    limit: int = 30,
+) -> list[dict]:
+    """Run keyword search (see keyword_filter) and explain which fields matched."""
+    search_filter, rank = keyword_filter(query)
+
+    order_by = (rank.desc(), Title.title) if rank is not None else (Title.title,)
     stmt = (
-        select(Title)
+        select(Title, *match_explanation_columns(query))
         .where(search_filter)
         .options(selectinload(Title.genres).selectinload(TitleGenre.genre))
-        .order_by(Title.title)
+        .order_by(*order_by)
         .limit(limit)
     )
     if allowed_ratings is not None:
         stmt = stmt.where(Title.age_rating.in_(allowed_ratings))
 
     result = await db.execute(stmt)
-    titles = list(result.scalars().unique())
 
     hits: list[dict] = []
-    query_lower = query.lower()
-    for t in titles:
-        match_fields: list[str] = []
-        if t.title and query_lower in t.title.lower():
-            match_fields.append("title")
-        if t.synopsis_short and query_lower in t.synopsis_short.lower():
-            match_fields.append("synopsis_short")
-        if t.synopsis_long and query_lower in t.synopsis_long.lower():
-            match_fields.append("synopsis_long")
-        # Check cast
-        cast_q = await db.execute(
-            select(TitleCast.person_name).where(
-                TitleCast.title_id == t.id,
-                TitleCast.person_name.ilike(pattern),
-            )
-        )
-        if cast_q.first() is not None:
-            match_fields.append("cast")
-        if not match_fields:
-            match_fields.append("keyword")
-
+    for row in result.all():
+        t = row.Title
+        match_fields, highlights = explain_match(row, query)
         hits.append({
             "id": t.id,
             "title": t.title,
@@ -94,6 +240,7 @@ async def keyword_search(
             "mood_tags": t.mood_tags,
             "genres": [tg.genre.name for tg in t.genres],
             "match_fields": match_fields,
+            "highlights": highlights,
         })
     return hits
 
@@ -110,11 +257,10 @@ async def semantic_search(
     limit: int = 30,
 ) -> list[dict]:
     """Embed the query and find similar titles via pgvector cosine distance."""
-    query_vector = embedding_service.generate_embedding(query_text)
-    vec_str = "[" + ",".join(str(float(v)) for v in query_vector) + "]"
+    query_vec = to_query_vector(await query_embedder.embed(query_text))
 
     age_filter = ""
-    bind_kw: dict = dict(query_vec=vec_str, lim=limit, min_sim=0.2)
+    bind_kw: dict = dict(query_vec=query_vec, lim=limit, min_sim=0.2)
     extra_params = []
     if allowed_ratings is not None:
         age_filter = "AND t.age_rating IN :allowed"
@@ -249,37 +395,98 @@ def _build_match_reason(
 # ---------------------------------------------------------------------------
 
 
+@dataclass
+class SearchLeg:
+    """Outcome of one search leg: hits plus status ('ok', 'timeout', 'error', 'skipped')."""
+
+    hits: list[dict] = field(default_factory=list)
+    status: str = "skipped"
+    latency_ms: float = 0.0
+
+    def meta(self) -> dict:
+        return {"status": self.status, "latency_ms": self.latency_ms, "hits": len(self.hits)}
+
+
+async def _run_leg(
+    name: str,
+    search_fn,
+    query_text: str,
+    allowed_ratings: list[str] | None,
+    limit: int,
+    timeout_ms: int,
+) -> SearchLeg:
+    """Run *search_fn* on its own pooled session, bounded by *timeout_ms*.
+
+    Failures and timeouts are reported in the returned leg, never raised.
+    """
+    started = time.perf_counter()
+    leg = SearchLeg(status="ok")
+    try:
+        async with async_session_factory() as session:
+            leg.hits = await asyncio.wait_for(
+                search_fn(session, query_text, allowed_ratings, limit),
+                timeout=timeout_ms / 1000,
+            )
+    except asyncio.TimeoutError:
+        leg.status = "timeout"
+        logger.warning("%s search leg exceeded %dms", name, timeout_ms)
+    except Exception:
+        leg.status = "error"
+        logger.warning("%s search leg failed", name, exc_info=True)
+    leg.latency_ms = round((time.perf_counter() - started) * 1000, 1)
+    return leg
+
+
 async def hybrid_search(
-    db: AsyncSession,
     query_text: str,
     mode: str = "hybrid",
     allowed_ratings: list[str] | None = None,
     limit: int = 30,
-) -> list[dict]:
+) -> tuple[list[dict], dict[str, dict]]:
     """Run keyword, semantic, or hybrid search depending on mode.
 
-    For hybrid mode, merges results via Reciprocal Rank Fusion and generates
-    match reasons per result. Auto-downgrades to keyword for short queries.
-    Wraps semantic search in try/except for graceful fallback.
+    For hybrid mode, both legs run concurrently on their own pooled sessions,
+    so latency tracks the slower leg rather than the sum.  Each leg is bounded
+    by its timeout (``search_keyword_timeout_ms`` / ``search_semantic_timeout_ms``);
+    a leg that times out or fails is dropped and the other leg's results are
+    returned alone.  Semantic-only searches fall back to keyword if the
+    semantic leg fails.  Results are merged via Reciprocal Rank Fusion with
+    match reasons per result.  Auto-downgrades to keyword for short queries.
+
+    Returns ``(results, legs)`` where *legs* maps leg name to its status,
+    latency and hit count.
     """
     # Auto-downgrade short queries to keyword-only
     if len(query_text.strip()) < 3:
         mode = "keyword"
 
-    keyword_hits: list[dict] = []
-    semantic_hits: list[dict] = []
+    def run_keyword():
+        return _run_leg(
+            "keyword", keyword_search, query_text, allowed_ratings, limit,
+            settings.search_keyword_timeout_ms,
+        )
 
-    if mode in ("keyword", "hybrid"):
-        keyword_hits = await keyword_search(db, query_text, allowed_ratings, limit)
+    def run_semantic():
+        return _run_leg(
+            "semantic", semantic_search, query_text, allowed_ratings, limit,
+            settings.search_semantic_timeout_ms,
+        )
+
+    keyword_leg = SearchLeg()
+    semantic_leg = SearchLeg()
+    if mode == "hybrid":
+        keyword_leg, semantic_leg = await asyncio.gather(run_keyword(), run_semantic())
+    elif mode == "semantic":
+        semantic_leg = await run_semantic()
+        if semantic_leg.status != "ok":
+            logger.warning("Semantic search unavailable, falling back to keyword-only")
+            keyword_leg = await run_keyword()
+    else:
+        keyword_leg = await run_keyword()
 
-    if mode in ("semantic", "hybrid"):
-        try:
-            semantic_hits = await semantic_search(db, query_text, allowed_ratings, limit)
-        except Exception:
-            logger.warning("Semantic search failed, falling back to keyword-only", exc_info=True)
-            await db.rollback()
-            if not keyword_hits:
-                keyword_hits = await keyword_search(db, query_text, allowed_ratings, limit)
+    keyword_hits = keyword_leg.hits
+    semantic_hits = semantic_leg.hits
+    legs = {"keyword": keyword_leg.meta(), "semantic": semantic_leg.meta()}
 
     # Build lookup dicts keyed by title ID string
     kw_by_id = {str(h["id"]): h for h in keyword_hits}
@@ -319,7 +526,8 @@ async def hybrid_search(
             "genres": base.get("genres", []),
             "match_reason": match_reason,
             "match_type": match_type,
+            "highlights": kw_hit.get("highlights") if kw_hit else None,
             "similarity_score": sem_hit["similarity_score"] if sem_hit else None,
         })
 
-    return results
+    return results, legs
@@ -0,0 +1,429 @@
+"""Redis-backed concurrent stream counter with write-behind to stream_sessions.
+
+Live stream state is kept in Redis so session start, heartbeat and stop are a
+single scripted round trip instead of several Postgres writes:
+
+- ``streams:{user_id}``      sorted set: session_id scored by last heartbeat (epoch seconds)
+- ``streammeta:{user_id}``   hash: session_id → JSON {title_id, content_type, started_at}
+- ``streams:users``          set of user_ids with at least one live session
+- ``streams:events``         list of pending start/end events, in order
+- ``streams:dirty``          hash: session_id → latest unflushed heartbeat
+- ``streams:inflight:{id}``  list: events and heartbeats taken by a flush, kept until it commits
+- ``streams:inflight``       sorted set: in-flight flush ids scored by take time
+
+Admission evicts abandoned sessions and checks the limit atomically in Lua, so
+two devices racing for the last slot cannot both be admitted.  A lifespan
+loop flushes events and heartbeats to ``stream_sessions`` in set-based
+statements; a reaper loop evicts abandoned sessions for users who never start
+another stream and sweeps orphaned rows in Postgres.
+
+Crash recovery:
+- App crash: pending events and heartbeats live in Redis and are flushed by
+  the next process.  A taken batch stays on its in-flight list until the
+  flush commits; a failed flush's batch is re-applied by the next flush and
+  one orphaned by a crash once it is older than the grace period.  All flush
+  statements are idempotent, so re-applying is safe.
+- Ordering: a heartbeat taken before its session's start row is written is
+  re-queued rather than dropped.
+- Redis loss: rows in ``stream_sessions`` remain authoritative.  A heartbeat or
+  stop for a session Redis no longer knows falls back to the row, and a
+  heartbeat re-admits it.  The reaper's Postgres sweep ends rows whose
+  heartbeats stopped arriving.
+"""
+
+import json
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.stream_sessions import StreamSession
+
+logger = logging.getLogger(__name__)
+
+USERS_KEY = "streams:users"
+EVENTS_KEY = "streams:events"
+DIRTY_KEY = "streams:dirty"
+INFLIGHT_KEY = "streams:inflight"
+
+# In-flight batches younger than this belong to a flush that may still be running
+_INFLIGHT_GRACE_SECONDS = 60
+
+# Shared prelude: evict sessions whose last heartbeat is older than the cutoff.
+# KEYS[1]=zset KEYS[2]=meta KEYS[3]=events; ARGV[1]=now ARGV[2]=cutoff
+_EVICT_LUA = """
+local evicted = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', '(' .. ARGV[2])
+for _, sid in ipairs(evicted) do
+  redis.call('HDEL', KEYS[2], sid)
+  redis.call('RPUSH', KEYS[3], cjson.encode({op='end', id=sid, at=tonumber(ARGV[1])}))
+end
+if #evicted > 0 then
+  redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', '(' .. ARGV[2])
+end
+"""
+
+# KEYS[4]=users; ARGV[3]=max_streams ARGV[4]=session_id ARGV[5]=meta ARGV[6]=event ARGV[7]=user_id
+_ADMIT_LUA = _EVICT_LUA + """
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+  return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[1], ARGV[4])
+redis.call('HSET', KEYS[2], ARGV[4], ARGV[5])
+redis.call('RPUSH', KEYS[3], ARGV[6])
+redis.call('SADD', KEYS[4], ARGV[7])
+return 1
+"""
+
+# KEYS[4]=users; ARGV[3]=user_id
+_REAP_LUA = _EVICT_LUA + """
+if redis.call('ZCARD', KEYS[1]) == 0 then
+  redis.call('DEL', KEYS[2])
+  redis.call('SREM', KEYS[4], ARGV[3])
+end
+return #evicted
+"""
+
+# KEYS[1]=zset KEYS[2]=dirty; ARGV[1]=session_id ARGV[2]=now
+_HEARTBEAT_LUA = """
+if not redis.call('ZSCORE', KEYS[1], ARGV[1]) then
+  return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+return 1
+"""
+
+# KEYS[1]=zset KEYS[2]=meta KEYS[3]=events KEYS[4]=dirty; ARGV[1]=session_id ARGV[2]=now
+_END_LUA = """
+if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then
+  return 0
+end
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[4], ARGV[1])
+redis.call('RPUSH', KEYS[3], cjson.encode({op='end', id=ARGV[1], at=tonumber(ARGV[2])}))
+return 1
+"""
+
+# KEYS[1]=events KEYS[2]=dirty KEYS[3]=in-flight list KEYS[4]=in-flight index
+# ARGV[1]=max events ARGV[2]=flush_id ARGV[3]=now
+# Moves up to ARGV[1] events and every dirty heartbeat (as {op='hb'} events)
+# onto the flush's in-flight list and returns it.
+_TAKE_LUA = """
+for _ = 1, tonumber(ARGV[1]) do
+  if not redis.call('LMOVE', KEYS[1], KEYS[3], 'LEFT', 'RIGHT') then
+    break
+  end
+end
+local dirty = redis.call('HGETALL', KEYS[2])
+redis.call('DEL', KEYS[2])
+for i = 1, #dirty, 2 do
+  redis.call('RPUSH', KEYS[3], cjson.encode({op='hb', id=dirty[i], at=tonumber(dirty[i + 1])}))
+end
+if redis.call('EXISTS', KEYS[3]) == 1 then
+  redis.call('ZADD', KEYS[4], ARGV[3], ARGV[2])
+end
+return redis.call('LRANGE', KEYS[3], 0, -1)
+"""
+
+
+def _zset_key(user_id: uuid.UUID) -> str:
+    return f"streams:{user_id}"
+
+
+def _meta_key(user_id: uuid.UUID) -> str:
+    return f"streammeta:{user_id}"
+
+
+def _inflight_key(flush_id: uuid.UUID | str) -> str:
+    return f"{INFLIGHT_KEY}:{flush_id}"
+
+
+def _ts(epoch: float) -> datetime:
+    return datetime.fromtimestamp(epoch, timezone.utc)
+
+
+class StreamCounter:
+    """Per-user live stream sets in Redis; a no-op until ``redis`` is set."""
+
+    def __init__(
+        self,
+        abandon_seconds: int = settings.stream_abandon_seconds,
+        flush_batch: int = settings.stream_flush_batch_size,
+    ) -> None:
+        self.abandon_seconds = abandon_seconds
+        self.flush_batch = flush_batch
+        self._redis = None
+        self._scripts: dict = {}
+
+    @property
+    def redis(self):
+        return self._redis
+
+    @redis.setter
+    def redis(self, client) -> None:
+        # set by the lifespan handler; scripts are bound to the client
+        self._redis = client
+        self._scripts = {
+            name: client.register_script(lua)
+            for name, lua in (
+                ("admit", _ADMIT_LUA),
+                ("reap", _REAP_LUA),
+                ("heartbeat", _HEARTBEAT_LUA),
+                ("end", _END_LUA),
+                ("take", _TAKE_LUA),
+            )
+        } if client is not None else {}
+
+    @property
+    def enabled(self) -> bool:
+        return self._redis is not None
+
+    # -- request path -------------------------------------------------------
+
+    async def admit(
+        self,
+        user_id: uuid.UUID,
+        title_id: uuid.UUID | None,
+        content_type: str,
+        max_streams: int,
+    ) -> tuple[uuid.UUID | None, datetime]:
+        """Evict abandoned sessions and admit a new one if under *max_streams*.
+
+        Returns (session_id, started_at); session_id is None when the limit
+        is reached.
+        """
+        now = time.time()
+        session_id = uuid.uuid4()
+        meta = {
+            "title_id": str(title_id) if title_id else None,
+            "content_type": content_type,
+            "started_at": now,
+        }
+        event = dict(meta, op="start", id=str(session_id), user_id=str(user_id))
+        admitted = await self._scripts["admit"](
+            keys=[_zset_key(user_id), _meta_key(user_id), EVENTS_KEY, USERS_KEY],
+            args=[
+                now,
+                now - self.abandon_seconds,
+                max_streams,
+                str(session_id),
+                json.dumps(meta),
+                json.dumps(event),
+                str(user_id),
+            ],
+        )
+        return (session_id if admitted else None), _ts(now)
+
+    async def heartbeat(self, user_id: uuid.UUID, session_id: uuid.UUID) -> datetime | None:
+        """Refresh a live session; None if Redis does not know it."""
+        now = time.time()
+        found = await self._scripts["heartbeat"](
+            keys=[_zset_key(user_id), DIRTY_KEY], args=[str(session_id), now]
+        )
+        return _ts(now) if found else None
+
+    async def heartbeat_many(
+        self, user_id: uuid.UUID, session_ids: list[uuid.UUID]
+    ) -> dict[uuid.UUID, datetime | None]:
+        """Refresh several live sessions in one pipelined round trip.
+
+        Sessions Redis does not know map to None.
+        """
+        now = time.time()
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for session_id in session_ids:
+                await self._scripts["heartbeat"](
+                    keys=[_zset_key(user_id), DIRTY_KEY], args=[str(session_id), now], client=pipe
+                )
+            found = await pipe.execute()
+        at = _ts(now)
+        return {sid: at if hit else None for sid, hit in zip(session_ids, found)}
+
+    async def end(self, user_id: uuid.UUID, session_id: uuid.UUID) -> bool:
+        """End a live session; False if Redis does not know it."""
+        ended = await self._scripts["end"](
+            keys=[_zset_key(user_id), _meta_key(user_id), EVENTS_KEY, DIRTY_KEY],
+            args=[str(session_id), time.time()],
+        )
+        return bool(ended)
+
+    async def restore(self, session: StreamSession) -> None:
+        """Re-admit a session that exists in Postgres but not in Redis.
+
+        No start event is queued — the row already exists.
+        """
+        meta = {
+            "title_id": str(session.title_id) if session.title_id else None,
+            "content_type": session.content_type,
+            "started_at": session.started_at.timestamp(),
+        }
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(_zset_key(session.user_id), {str(session.id): time.time()})
+            pipe.hset(_meta_key(session.user_id), str(session.id), json.dumps(meta))
+            pipe.sadd(USERS_KEY, str(session.user_id))
+            await pipe.execute()
+
+    async def active_sessions(self, user_id: uuid.UUID) -> list[dict]:
+        """Live sessions for *user_id*, most recently started first."""
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.zrange(_zset_key(user_id), 0, -1, withscores=True)
+            pipe.hgetall(_meta_key(user_id))
+            members, metas = await pipe.execute()
+        sessions = []
+        for sid, score in members:
+            meta = json.loads(metas[sid]) if sid in metas else {}
+            sessions.append({
+                "session_id": uuid.UUID(sid),
+                "title_id": uuid.UUID(meta["title_id"]) if meta.get("title_id") else None,
+                "started_at": _ts(meta.get("started_at", score)),
+                "last_heartbeat_at": _ts(score),
+            })
+        sessions.sort(key=lambda s: s["started_at"], reverse=True)
+        return sessions
+
+    # -- background ---------------------------------------------------------
+
+    async def flush(self, db: AsyncSession) -> int:
+        """Write pending starts, ends and heartbeats to stream_sessions.
+
+        The batch is moved atomically onto an in-flight list, written in one
+        transaction and deleted only after the commit.  Every statement is
+        idempotent, so an in-flight batch left by a failed flush or a crash is
+        simply applied again: failed batches on the next flush, orphaned ones
+        once they are older than the grace period.  Returns the number of
+        events plus heartbeats written.
+        """
+        written = await self.recover(db)
+
+        flush_id = uuid.uuid4()
+        batch = await self._scripts["take"](
+            keys=[EVENTS_KEY, DIRTY_KEY, _inflight_key(flush_id), INFLIGHT_KEY],
+            args=[self.flush_batch, str(flush_id), time.time()],
+        )
+        if batch:
+            written += await self._apply(db, str(flush_id), batch)
+        return written
+
+    async def recover(self, db: AsyncSession) -> int:
+        """Re-apply in-flight batches that failed or were orphaned by a crash."""
+        flush_ids = await self._redis.zrangebyscore(
+            INFLIGHT_KEY, "-inf", time.time() - _INFLIGHT_GRACE_SECONDS
+        )
+        written = 0
+        for flush_id in flush_ids:
+            batch = await self._redis.lrange(_inflight_key(flush_id), 0, -1)
+            if batch:
+                logger.warning("Re-applying in-flight stream flush %s (%d entries)", flush_id, len(batch))
+                written += await self._apply(db, flush_id, batch)
+            else:
+                await self._redis.zrem(INFLIGHT_KEY, flush_id)
+        return written
+
+    async def _apply(self, db: AsyncSession, flush_id: str, batch: list[str]) -> int:
+        events = [json.loads(e) for e in batch]
+        starts = [e for e in events if e["op"] == "start"]
+        ends = [e for e in events if e["op"] == "end"]
+        heartbeats: dict[str, float] = {}
+        for e in events:
+            if e["op"] == "hb":
+                heartbeats[e["id"]] = max(e["at"], heartbeats.get(e["id"], 0))
+
+        unmatched: list[str] = []
+        try:
+            if starts:
+                await db.execute(
+                    pg_insert(StreamSession)
+                    .values([
+                        {
+                            "id": uuid.UUID(e["id"]),
+                            "user_id": uuid.UUID(e["user_id"]),
+                            "title_id": uuid.UUID(e["title_id"]) if e["title_id"] else None,
+                            "content_type": e["content_type"],
+                            "started_at": _ts(e["started_at"]),
+                            "last_heartbeat_at": _ts(e["started_at"]),
+                        }
+                        for e in starts
+                    ])
+                    .on_conflict_do_nothing(index_elements=["id"])
+                )
+            if heartbeats:
+                # Heartbeats whose start row is not written yet (its event is
+                # still queued or in another flush) are returned for re-queueing.
+                result = await db.execute(
+                    text(
+                        "WITH v AS (SELECT * FROM unnest(CAST(:ids AS uuid[]), "
+                        "CAST(:ats AS timestamptz[])) AS v(id, at)), "
+                        "upd AS (UPDATE stream_sessions s SET last_heartbeat_at = v.at FROM v "
+                        "WHERE s.id = v.id AND s.ended_at IS NULL AND s.last_heartbeat_at < v.at) "
+                        "SELECT CAST(v.id AS text) FROM v "
+                        "WHERE NOT EXISTS (SELECT 1 FROM stream_sessions s WHERE s.id = v.id)"
+                    ).bindparams(
+                        ids=[uuid.UUID(sid) for sid in heartbeats],
+                        ats=[_ts(at) for at in heartbeats.values()],
+                    )
+                )
+                unmatched = list(result.scalars().all())
+            if ends:
+                await db.execute(
+                    text(
+                        "UPDATE stream_sessions s SET ended_at = v.at "
+                        "FROM unnest(CAST(:ids AS uuid[]), CAST(:ats AS timestamptz[])) AS v(id, at) "
+                        "WHERE s.id = v.id AND s.ended_at IS NULL"
+                    ).bindparams(
+                        ids=[uuid.UUID(e["id"]) for e in ends],
+                        ats=[_ts(e["at"]) for e in ends],
+                    )
+                )
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            # retried first thing by the next flush
+            await self._redis.zadd(INFLIGHT_KEY, {flush_id: 0})
+            raise
+
+        cutoff = time.time() - self.abandon_seconds
+        async with self._redis.pipeline(transaction=True) as pipe:
+            for sid in unmatched:
+                # a newer heartbeat may have arrived since the take; give up on
+                # sessions that would have been abandoned by now
+                if heartbeats[sid] >= cutoff:
+                    pipe.hsetnx(DIRTY_KEY, sid, heartbeats[sid])
+            pipe.delete(_inflight_key(flush_id))
+            pipe.zrem(INFLIGHT_KEY, flush_id)
+            await pipe.execute()
+        return len(starts) + len(ends) + len(heartbeats)
+
+    async def reap(self, db: AsyncSession) -> tuple[int, int]:
+        """Evict abandoned sessions from Redis and end orphaned rows in Postgres.
+
+        Returns (evicted from Redis, rows ended in Postgres).
+        """
+        now = time.time()
+        cutoff = now - self.abandon_seconds
+        evicted = 0
+        async for uid in self._redis.sscan_iter(USERS_KEY, count=500):
+            user_id = uuid.UUID(uid)
+            evicted += await self._scripts["reap"](
+                keys=[_zset_key(user_id), _meta_key(user_id), EVENTS_KEY, USERS_KEY],
+                args=[now, cutoff, uid],
+            )
+
+        # Rows whose heartbeats stopped reaching Postgres (e.g. Redis was lost).
+        # Allow for heartbeats still waiting in the flush queue.
+        swept = await db.execute(
+            text(
+                "UPDATE stream_sessions SET ended_at = now() "
+                "WHERE ended_at IS NULL AND last_heartbeat_at < :cutoff"
+            ).bindparams(cutoff=_ts(cutoff - settings.stream_flush_interval_seconds * 2))
+        )
+        await db.commit()
+        return evicted, swept.rowcount
+
+
+# Module-level singleton
+stream_counter = StreamCounter()
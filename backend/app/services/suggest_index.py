@@ -0,0 +1,188 @@
+"""In-memory prefix index for search-as-you-type suggestions.
+
+Title names, cast names and genre names are folded into one sorted array of
+keys.  Every word start of a name is indexed (``"the dark knight"`` is found by
+``"dark"`` and ``"kni"`` too), so a lookup is a ``bisect`` to the first key
+with the typed prefix followed by a forward scan of the matching keys — no
+database access.  One- and two-character prefixes, whose ranges span much of
+the index, are answered from completion lists ranked at rebuild time.
+
+The index is built at startup and rebuilt by a lifespan loop whenever the
+catalog version (see ``search_cache``) moves.  Each rebuild swaps in a complete
+new snapshot, so readers never see a half-built index.
+"""
+
+import heapq
+import logging
+import time
+import uuid
+from bisect import bisect_left
+from dataclasses import dataclass
+from itertools import islice
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.query_embedder import normalize_query
+
+logger = logging.getLogger(__name__)
+
+# Prefixes up to this length match a large share of the keys, so their
+# ranked completions are computed at rebuild time; longer prefixes are ranked
+# over their full key range on lookup.
+_PRECOMPUTED_PREFIX_LEN = 2
+
+# Kind order used to break ties between equally ranked suggestions.
+_KIND_ORDER = {"title": 0, "person": 1, "genre": 2}
+
+
+@dataclass(frozen=True, slots=True)
+class Suggestion:
+    text: str
+    kind: str  # "title" | "person" | "genre"
+    weight: float
+    title_id: uuid.UUID | None = None
+    age_rating: str | None = None
+
+
+def _keep_best(candidates: dict, entry: Suggestion, start: bool) -> None:
+    """Record *entry* in *candidates* under its identity, keeping the best rank."""
+    ident = (entry.kind, entry.text, entry.title_id)
+    rank = (
+        0 if start else 1,
+        -entry.weight,
+        _KIND_ORDER[entry.kind],
+        len(entry.text),
+        entry.text,
+    )
+    if ident not in candidates or rank < candidates[ident][0]:
+        candidates[ident] = (rank, entry)
+
+
+class SuggestIndex:
+    """Sorted-array prefix index over catalog names.
+
+    - ``_keys[i]`` is a normalized word-start suffix of ``_entries[i].text``.
+    - ``_starts[i]`` is True when the key is the whole name (not a later word),
+      which ranks full-name prefix matches above mid-name ones.
+    - ``_short[p]`` lists every distinct suggestion with a key starting with
+      the short prefix *p*, best first.
+    """
+
+    def __init__(self) -> None:
+        self.version: str | None = None
+        self.built_at: float | None = None
+        self._keys: list[str] = []
+        self._entries: list[Suggestion] = []
+        self._starts: list[bool] = []
+        self._short: dict[str, list[Suggestion]] = {}
+
+    @property
+    def size(self) -> int:
+        return len(self._keys)
+
+    def suggest(
+        self, prefix: str, limit: int = 10, allowed_ratings: list[str] | None = None
+    ) -> list[Suggestion]:
+        """Return up to *limit* completions for *prefix*, best first.
+
+        Title suggestions outside *allowed_ratings* are skipped; cast and
+        genre suggestions are not rating-restricted.
+        """
+        needle = normalize_query(prefix)
+        if not needle:
+            return []
+        allowed = set(allowed_ratings) if allowed_ratings is not None else None
+
+        def accepted(entry: Suggestion) -> bool:
+            return entry.kind != "title" or allowed is None or entry.age_rating in allowed
+
+        if len(needle) <= _PRECOMPUTED_PREFIX_LEN:
+            ranked = self._short.get(needle, [])
+            return list(islice(filter(accepted, ranked), limit))
+
+        keys, entries, starts = self._keys, self._entries, self._starts
+        candidates: dict[tuple[str, str, uuid.UUID | None], tuple] = {}
+        i = bisect_left(keys, needle)
+        while i < len(keys) and keys[i].startswith(needle):
+            entry = entries[i]
+            if accepted(entry):
+                _keep_best(candidates, entry, starts[i])
+            i += 1
+        best = heapq.nsmallest(limit, candidates.values(), key=lambda c: c[0])
+        return [entry for _, entry in best]
+
+    async def rebuild(self, db: AsyncSession, version: str | None = None) -> int:
+        """Load names from the catalog and swap in a new index.
+
+        *version* is the catalog version the snapshot reflects.  Returns the
+        number of indexed keys.
+        """
+        started = time.monotonic()
+        entries: list[Suggestion] = []
+
+        titles = await db.execute(
+            text("SELECT id, title, age_rating, is_featured FROM titles")
+        )
+        for r in titles.fetchall():
+            entries.append(Suggestion(
+                text=r.title,
+                kind="title",
+                weight=2.0 if r.is_featured else 1.0,
+                title_id=r.id,
+                age_rating=r.age_rating,
+            ))
+
+        people = await db.execute(
+            text(
+                "SELECT person_name, COUNT(DISTINCT title_id) AS n "
+                "FROM title_cast GROUP BY person_name"
+            )
+        )
+        for r in people.fetchall():
+            entries.append(Suggestion(text=r.person_name, kind="person", weight=float(r.n)))
+
+        genres = await db.execute(
+            text(
+                "SELECT g.name, COUNT(tg.title_id) AS n FROM genres g "
+                "LEFT JOIN title_genres tg ON tg.genre_id = g.id GROUP BY g.name"
+            )
+        )
+        for r in genres.fetchall():
+            entries.append(Suggestion(text=r.name, kind="genre", weight=float(r.n)))
+
+        rows: list[tuple[str, bool, Suggestion]] = []
+        for entry in entries:
+            words = normalize_query(entry.text).split(" ")
+            for w in range(len(words)):
+                key = " ".join(words[w:])
+                if key:
+                    rows.append((key, w == 0, entry))
+        rows.sort(key=lambda r: r[0])
+
+        by_prefix: dict[str, dict] = {}
+        for key, start, entry in rows:
+            for n in range(1, min(len(key), _PRECOMPUTED_PREFIX_LEN) + 1):
+                _keep_best(by_prefix.setdefault(key[:n], {}), entry, start)
+        short = {
+            p: [entry for _, entry in sorted(candidates.values(), key=lambda c: c[0])]
+            for p, candidates in by_prefix.items()
+        }
+
+        self._keys = [r[0] for r in rows]
+        self._starts = [r[1] for r in rows]
+        self._entries = [r[2] for r in rows]
+        self._short = short
+        self.version = version
+        self.built_at = time.time()
+        logger.info(
+            "Suggest index rebuilt: %d names, %d keys in %.1fms",
+            len(entries),
+            len(rows),
+            (time.monotonic() - started) * 1000,
+        )
+        return len(rows)
+
+
+# Module-level singleton
+suggest_index = SuggestIndex()
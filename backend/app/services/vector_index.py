@@ -0,0 +1,156 @@
+"""ANN index helpers for content_embeddings — ef_search control and recall benchmarking.
+
+The HNSW index itself is managed by Alembic (migration 009); its build
+parameters and the default ``hnsw.ef_search`` come from Settings.
+
+Usage:
+    uv run python -m app.services.vector_index                  # default sweep
+    uv run python -m app.services.vector_index --k 20 --sample 100 --ef 20 40 80
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.vector_codec import to_query_vector
+
+logger = logging.getLogger(__name__)
+
+_KNN_SQL = text(
+    """
+    SELECT ce.title_id
+    FROM content_embeddings ce
+    WHERE ce.title_id != :source_id
+    ORDER BY ce.embedding <=> CAST(:query_vec AS vector)
+    LIMIT :k
+    """
+)
+
+
+async def set_ef_search(db: AsyncSession, ef_search: int) -> None:
+    """Override ``hnsw.ef_search`` for the current transaction only.
+
+    The pooled default (``settings.vector_ef_search``) applies otherwise.
+    """
+    await db.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
+
+
+def _p95(values: list[float]) -> float:
+    sorted_v = sorted(values)
+    return sorted_v[min(int(len(sorted_v) * 0.95), len(sorted_v) - 1)]
+
+
+async def _knn(db: AsyncSession, source_id, query_vec, k: int) -> tuple[list, float]:
+    started = time.perf_counter()
+    result = await db.execute(_KNN_SQL.bindparams(source_id=source_id, query_vec=query_vec, k=k))
+    ids = [row[0] for row in result.fetchall()]
+    return ids, (time.perf_counter() - started) * 1000
+
+
+async def benchmark_recall(
+    db: AsyncSession,
+    *,
+    k: int = 10,
+    sample_size: int = 50,
+    ef_search_values: tuple[int, ...] = (10, 20, 40, 80, 160),
+) -> dict:
+    """Compare HNSW results against exact kNN for a random sample of titles.
+
+    Each sampled title's own embedding is used as the query.  Exact results
+    are obtained with index scans disabled (sequential scan + sort).  Returns
+    recall@k and latency per ``ef_search`` value alongside the exact baseline.
+    """
+    sample = (
+        await db.execute(
+            text(
+                "SELECT title_id, embedding FROM content_embeddings "
+                "ORDER BY random() LIMIT :n"
+            ).bindparams(n=sample_size)
+        )
+    ).fetchall()
+    if not sample:
+        return {"sample_size": 0, "k": k, "exact": None, "ann": []}
+
+    queries = [
+        (row.title_id, to_query_vector(row.embedding))
+        for row in sample
+    ]
+
+    # Exact baseline — SET LOCAL settings are discarded by each rollback.
+    exact: dict = {}
+    exact_ms: list[float] = []
+    await db.execute(text("SET LOCAL enable_indexscan = off"))
+    for source_id, query_vec in queries:
+        ids, ms = await _knn(db, source_id, query_vec, k)
+        exact[source_id] = set(ids)
+        exact_ms.append(ms)
+    await db.rollback()
+
+    ann_results = []
+    for ef in ef_search_values:
+        recalls: list[float] = []
+        ann_ms: list[float] = []
+        await set_ef_search(db, ef)
+        for source_id, query_vec in queries:
+            ids, ms = await _knn(db, source_id, query_vec, k)
+            truth = exact[source_id]
+            if truth:
+                recalls.append(len(truth & set(ids)) / len(truth))
+            ann_ms.append(ms)
+        await db.rollback()
+        ann_results.append({
+            "ef_search": ef,
+            "recall_at_k": round(statistics.mean(recalls), 4) if recalls else None,
+            "mean_ms": round(statistics.mean(ann_ms), 2),
+            "p95_ms": round(_p95(ann_ms), 2),
+        })
+
+    return {
+        "sample_size": len(queries),
+        "k": k,
+        "exact": {
+            "mean_ms": round(statistics.mean(exact_ms), 2),
+            "p95_ms": round(_p95(exact_ms), 2),
+        },
+        "ann": ann_results,
+    }
+
+
+async def _main(k: int, sample_size: int, ef_values: list[int]) -> None:
+    from app.database import async_session_factory, engine
+
+    async with async_session_factory() as session:
+        report = await benchmark_recall(
+            session, k=k, sample_size=sample_size, ef_search_values=tuple(ef_values)
+        )
+    await engine.dispose()
+
+    print(f"HNSW recall benchmark — k={report['k']}, queries={report['sample_size']}")
+    print(
+        f"  index: m={settings.vector_hnsw_m}, ef_construction={settings.vector_hnsw_ef_construction}, "
+        f"default ef_search={settings.vector_ef_search}"
+    )
+    if report["exact"] is None:
+        print("  No embeddings found. Run the embedding seeder first.")
+        return
+    print(f"  exact:  mean {report['exact']['mean_ms']:.2f}ms  p95 {report['exact']['p95_ms']:.2f}ms")
+    for row in report["ann"]:
+        print(
+            f"  ef={row['ef_search']:<5} recall@{report['k']}={row['recall_at_k']}  "
+            f"mean {row['mean_ms']:.2f}ms  p95 {row['p95_ms']:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark HNSW recall against exact kNN")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query")
+    parser.add_argument("--sample", type=int, default=50, help="Number of query titles")
+    parser.add_argument("--ef", type=int, nargs="+", default=[10, 20, 40, 80, 160], help="ef_search values")
+    args = parser.parse_args()
+    asyncio.run(_main(args.k, args.sample, args.ef))
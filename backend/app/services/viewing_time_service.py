@@ -8,7 +8,8 @@ from datetime import UTC, date, datetime, time as dt_time, timedelta
 from zoneinfo import ZoneInfo
 
 from fastapi import HTTPException
-from sqlalchemy import and_, func, select
+from redis.exceptions import RedisError
+from sqlalchemy import and_, func, select, text, tuple_, update
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
@@ -31,11 +32,13 @@ from app.schemas.parental_controls import (
 )
 from app.schemas.viewing_time import (
     EnforcementStatus,
+    HeartbeatRequest,
     HeartbeatResponse,
     PlaybackEligibilityResponse,
     SessionEndResponse,
     ViewingTimeBalanceResponse,
 )
+from app.services.heartbeat_aggregator import heartbeat_aggregator
 
 logger = logging.getLogger(__name__)
 
@@ -111,6 +114,45 @@ def _compute_next_reset(viewing_day: date, reset_hour: int, timezone: str) -> da
     return local_reset.astimezone(ZoneInfo("UTC"))
 
 
+def _pause_transition(
+    paused_at: datetime | None,
+    is_paused: bool,
+    now: datetime,
+) -> tuple[datetime | None, bool]:
+    """Apply one heartbeat's pause state; return (new paused_at, should_increment)."""
+    if is_paused:
+        if paused_at is None:
+            return now, True
+        # If paused for longer than grace period, don't count
+        return paused_at, (now - paused_at).total_seconds() <= PAUSE_GRACE_SECONDS
+    # Resuming — if was paused more than grace, don't count this beat
+    if paused_at is not None and (now - paused_at).total_seconds() > PAUSE_GRACE_SECONDS:
+        return None, False
+    return None, True
+
+
+def _enforcement(
+    has_limits: bool,
+    limit_minutes: int | None,
+    is_unlimited: bool,
+    used_seconds: int,
+) -> tuple[EnforcementStatus, float | None]:
+    """Return (enforcement status, remaining_minutes) for a day's usage."""
+    if not has_limits or limit_minutes is None or is_unlimited:
+        return EnforcementStatus.allowed, None
+
+    remaining_secs = limit_minutes * 60 - used_seconds
+    if remaining_secs <= 0:
+        enforcement = EnforcementStatus.blocked
+    elif remaining_secs <= 5 * 60:
+        enforcement = EnforcementStatus.warning_5
+    elif remaining_secs <= 15 * 60:
+        enforcement = EnforcementStatus.warning_15
+    else:
+        enforcement = EnforcementStatus.allowed
+    return enforcement, max(0.0, round(remaining_secs / 60.0, 2))
+
+
 # ---------------------------------------------------------------------------
 # T016 — get_balance
 # ---------------------------------------------------------------------------
@@ -163,6 +205,17 @@ async def get_balance(
     educational_seconds = balance.educational_seconds if balance else 0
     is_unlimited = balance.is_unlimited_override if balance else False
 
+    # Include heartbeat seconds not yet flushed by the aggregator
+    if heartbeat_aggregator.enabled:
+        try:
+            pending_used, pending_edu = await heartbeat_aggregator.pending_balance(
+                profile_id, viewing_day
+            )
+            used_seconds += pending_used
+            educational_seconds += pending_edu
+        except RedisError:
+            logger.warning("Heartbeat aggregator unavailable, balance excludes pending seconds")
+
     # Determine limit for today
     limit_minutes: int | None
     if _is_weekend(viewing_day):
@@ -207,6 +260,219 @@ async def process_heartbeat(
 ) -> HeartbeatResponse:
     """Process a 30-second player heartbeat.
 
+    Served from the write-behind heartbeat aggregator when Redis is available
+    (running sessions cost no Postgres round trips); otherwise every heartbeat
+    is written straight to Postgres.
+    """
+    if heartbeat_aggregator.enabled:
+        try:
+            return await _process_heartbeat_buffered(
+                db, profile_id, title_id, device_id, device_type, session_id, is_paused
+            )
+        except RedisError:
+            logger.warning("Heartbeat aggregator unavailable, writing through", exc_info=True)
+    return await _process_heartbeat_direct(
+        db, profile_id, title_id, device_id, device_type, session_id, is_paused
+    )
+
+
+async def _open_session(
+    db: AsyncSession,
+    profile_id: uuid.UUID,
+    title_id: uuid.UUID,
+    device_id: str,
+    device_type: str,
+    session_id: uuid.UUID | None,
+    now: datetime,
+) -> tuple[uuid.UUID, int]:
+    """Start a session, or reload one Redis no longer holds, and seed it into Redis.
+
+    Returns (session_id, db_op_count).
+    """
+    from app.services.metrics_service import config_cache
+
+    combined = await db.execute(
+        select(Profile, ViewingTimeConfig, Title)
+        .outerjoin(ViewingTimeConfig, ViewingTimeConfig.profile_id == Profile.id)
+        .outerjoin(Title, Title.id == title_id)
+        .where(Profile.id == profile_id)
+    )
+    row = combined.one_or_none()
+    db_op_count = 1
+    if row is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    profile, config, title = row.tuple()
+    if title is None:
+        raise HTTPException(status_code=404, detail="Title not found")
+    if config is not None:
+        config_cache.put(profile_id, config)
+
+    if session_id is None:
+        # New session: terminate any existing active session for this profile
+        active_result = await db.execute(
+            select(ViewingSession).where(
+                and_(
+                    ViewingSession.profile_id == profile_id,
+                    ViewingSession.ended_at.is_(None),
+                )
+            )
+        )
+        db_op_count += 1
+        for old_session in active_result.scalars().all():
+            old_session.ended_at = now
+
+        session = ViewingSession(
+            profile_id=profile_id,
+            title_id=title_id,
+            device_id=device_id,
+            device_type=device_type,
+            is_educational=title.is_educational,
+            started_at=now,
+            last_heartbeat_at=now,
+        )
+        db.add(session)
+        await db.commit()
+        db_op_count += 1
+    else:
+        sess_result = await db.execute(
+            select(ViewingSession).where(ViewingSession.id == session_id)
+        )
+        db_op_count += 1
+        session = sess_result.scalar_one_or_none()
+        if session is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        # M-02: Verify session belongs to the requesting profile
+        if session.profile_id != profile_id:
+            raise HTTPException(status_code=403, detail="Session does not belong to this profile")
+
+    await heartbeat_aggregator.seed_session(session, profile.is_kids)
+    return session.id, db_op_count
+
+
+async def _process_heartbeat_buffered(
+    db: AsyncSession,
+    profile_id: uuid.UUID,
+    title_id: uuid.UUID,
+    device_id: str,
+    device_type: str,
+    session_id: uuid.UUID | None,
+    is_paused: bool,
+) -> HeartbeatResponse:
+    """Heartbeat against Redis-held session and balance state.
+
+    Postgres is only read to open a session, to load a config missing from
+    the config cache, or to seed a day's balance; all writes are deferred to
+    the aggregator flush.
+    """
+    from app.services.metrics_service import config_cache, perf_metrics
+
+    hb_start = time_mod.monotonic()
+    now = datetime.now(UTC)
+    db_op_count = 0
+
+    async def beat(sid: uuid.UUID):
+        try:
+            return await heartbeat_aggregator.session_beat(
+                sid, profile_id, is_paused, now.timestamp(),
+                PAUSE_GRACE_SECONDS, HEARTBEAT_INTERVAL_SECONDS,
+            )
+        except PermissionError:
+            raise HTTPException(status_code=403, detail="Session does not belong to this profile")
+
+    state = await beat(session_id) if session_id is not None else None
+    if state is None:
+        session_id, ops = await _open_session(
+            db, profile_id, title_id, device_id, device_type, session_id, now
+        )
+        db_op_count += ops
+        state = await beat(session_id)
+    should_increment, is_kids, is_educational = state
+
+    config: ViewingTimeConfig | None = None
+    if is_kids:
+        config = config_cache.get_cached(profile_id)
+        if config is not None:
+            perf_metrics.config_cache_hits += 1
+        else:
+            config = await ensure_default_config(db, profile_id)
+            db_op_count += 1
+            config_cache.put(profile_id, config)
+            perf_metrics.config_cache_misses += 1
+
+    has_limits = is_kids and config is not None
+    used_seconds = 0
+    limit_minutes: int | None = None
+    is_unlimited = False
+
+    if has_limits:
+        viewing_day = get_viewing_day(now, config.reset_hour, config.timezone)
+        limit_minutes = (
+            config.weekend_limit_minutes if _is_weekend(viewing_day) else config.weekday_limit_minutes
+        )
+        used_inc = edu_inc = 0
+        if should_increment:
+            if is_educational and config.educational_exempt:
+                edu_inc = HEARTBEAT_INTERVAL_SECONDS
+            else:
+                used_inc = HEARTBEAT_INTERVAL_SECONDS
+
+        base, pending_used, _ = await heartbeat_aggregator.balance_beat(
+            profile_id, viewing_day, used_inc, edu_inc
+        )
+        if base is None:
+            bal_result = await db.execute(
+                select(
+                    ViewingTimeBalance.used_seconds,
+                    ViewingTimeBalance.educational_seconds,
+                    ViewingTimeBalance.is_unlimited_override,
+                ).where(
+                    and_(
+                        ViewingTimeBalance.profile_id == profile_id,
+                        ViewingTimeBalance.reset_date == viewing_day,
+                    )
+                )
+            )
+            db_op_count += 1
+            bal_row = bal_result.one_or_none()
+            base = bal_row.tuple() if bal_row else (0, 0, False)
+            await heartbeat_aggregator.seed_balance(profile_id, viewing_day, *base)
+        used_seconds = base[0] + pending_used
+        is_unlimited = base[2]
+
+    enforcement, remaining_minutes = _enforcement(has_limits, limit_minutes, is_unlimited, used_seconds)
+
+    hb_duration_ms = (time_mod.monotonic() - hb_start) * 1000
+    perf_metrics.record_heartbeat(db_ops=db_op_count, duration_ms=hb_duration_ms)
+    logger.info(
+        "heartbeat_processed",
+        extra={
+            "profile_id": str(profile_id),
+            "db_ops": db_op_count,
+            "duration_ms": round(hb_duration_ms, 2),
+            "buffered": True,
+        },
+    )
+
+    return HeartbeatResponse(
+        session_id=session_id,
+        enforcement=enforcement,
+        remaining_minutes=remaining_minutes,
+        used_minutes=round(used_seconds / 60.0, 2),
+        is_educational=is_educational,
+    )
+
+
+async def _process_heartbeat_direct(
+    db: AsyncSession,
+    profile_id: uuid.UUID,
+    title_id: uuid.UUID,
+    device_id: str,
+    device_type: str,
+    session_id: uuid.UUID | None,
+    is_paused: bool,
+) -> HeartbeatResponse:
+    """Write-through heartbeat: fallback when the aggregator is unavailable.
+
     Creates or updates a :class:`ViewingSession` and increments the daily
     usage balance unless the content is educational-exempt.
     """
@@ -296,20 +562,7 @@ async def process_heartbeat(
         session.last_heartbeat_at = now
 
     # ---- Pause handling ----
-    should_increment = True
-
-    if is_paused:
-        if session.paused_at is None:
-            session.paused_at = now
-        # If paused for longer than grace period, don't count
-        elif (now - session.paused_at).total_seconds() > PAUSE_GRACE_SECONDS:
-            should_increment = False
-    else:
-        # Resuming — if was paused more than grace, don't count this beat
-        if session.paused_at is not None:
-            if (now - session.paused_at).total_seconds() > PAUSE_GRACE_SECONDS:
-                should_increment = False
-            session.paused_at = None
+    session.paused_at, should_increment = _pause_transition(session.paused_at, is_paused, now)
 
     # ---- Determine if time counting applies ----
     has_limits = profile.is_kids and config is not None
@@ -400,24 +653,7 @@ async def process_heartbeat(
 
     await db.commit()
 
-    # ---- Compute enforcement status ----
-    enforcement = EnforcementStatus.allowed
-
-    if has_limits and limit_minutes is not None and not is_unlimited:
-        limit_secs = limit_minutes * 60
-        remaining_secs = limit_secs - used_seconds
-
-        if remaining_secs <= 0:
-            enforcement = EnforcementStatus.blocked
-        elif remaining_secs <= 5 * 60:
-            enforcement = EnforcementStatus.warning_5
-        elif remaining_secs <= 15 * 60:
-            enforcement = EnforcementStatus.warning_15
-
-    # Compute remaining_minutes for response
-    remaining_minutes: float | None = None
-    if has_limits and limit_minutes is not None and not is_unlimited:
-        remaining_minutes = max(0.0, round((limit_minutes * 60 - used_seconds) / 60.0, 2))
+    enforcement, remaining_minutes = _enforcement(has_limits, limit_minutes, is_unlimited, used_seconds)
 
     # T010/T022: Record heartbeat metrics and log
     hb_duration_ms = (time_mod.monotonic() - hb_start) * 1000
@@ -440,6 +676,516 @@ async def process_heartbeat(
     )
 
 
+# ---------------------------------------------------------------------------
+# Batched heartbeats
+# ---------------------------------------------------------------------------
+
+
+async def process_heartbeat_batch(
+    db: AsyncSession,
+    items: list[HeartbeatRequest],
+) -> list[HeartbeatResponse | HTTPException]:
+    """Process several player heartbeats in one call.
+
+    Returns one entry per item, in order: a :class:`HeartbeatResponse`, or the
+    :class:`HTTPException` that item would have raised on its own.  Callers
+    must already have checked that every profile belongs to the user.
+    """
+    if heartbeat_aggregator.enabled:
+        try:
+            return await _process_heartbeat_batch_buffered(db, items)
+        except RedisError:
+            logger.warning("Heartbeat aggregator unavailable, writing batch through", exc_info=True)
+    return await _process_heartbeat_batch_direct(db, items)
+
+
+async def _open_sessions_batch(
+    db: AsyncSession,
+    items: list[HeartbeatRequest],
+    indices: list[int],
+    now: datetime,
+) -> tuple[dict[int, uuid.UUID | HTTPException], int]:
+    """Batch form of :func:`_open_session` for ``items[i]`` at each of *indices*.
+
+    Profiles (with configs), titles and sessions to reload are each loaded in
+    one query; new sessions end the profile's active sessions with a single
+    UPDATE.  Every opened session is seeded into Redis in one pipeline.
+    Returns ({index: session_id or HTTPException}, db_op_count).
+    """
+    from app.services.metrics_service import config_cache
+
+    batch = [items[i] for i in indices]
+    profile_rows = await db.execute(
+        select(Profile.id, Profile.is_kids, ViewingTimeConfig)
+        .outerjoin(ViewingTimeConfig, ViewingTimeConfig.profile_id == Profile.id)
+        .where(Profile.id.in_({item.profile_id for item in batch}))
+    )
+    is_kids: dict[uuid.UUID, bool] = {}
+    for r in profile_rows:
+        is_kids[r.id] = r.is_kids
+        if r.ViewingTimeConfig is not None:
+            config_cache.put(r.id, r.ViewingTimeConfig)
+    title_rows = await db.execute(
+        select(Title.id, Title.is_educational).where(Title.id.in_({item.title_id for item in batch}))
+    )
+    educational = dict(title_rows.tuples().all())
+    db_op_count = 2
+
+    reload_ids = {item.session_id for item in batch if item.session_id is not None}
+    reloaded: dict[uuid.UUID, ViewingSession] = {}
+    if reload_ids:
+        sess_result = await db.execute(
+            select(ViewingSession).where(ViewingSession.id.in_(reload_ids))
+        )
+        reloaded = {s.id: s for s in sess_result.scalars().all()}
+        db_op_count += 1
+
+    opened: dict[int, uuid.UUID | HTTPException] = {}
+    new_sessions: list[ViewingSession] = []
+    seeds: dict[uuid.UUID, tuple[ViewingSession, bool]] = {}
+    for index, item in zip(indices, batch):
+        if item.profile_id not in is_kids:
+            opened[index] = HTTPException(status_code=404, detail="Profile not found")
+        elif item.title_id not in educational:
+            opened[index] = HTTPException(status_code=404, detail="Title not found")
+        elif item.session_id is None:
+            # Later new-session items for the same profile end earlier ones
+            for earlier in new_sessions:
+                if earlier.profile_id == item.profile_id:
+                    earlier.ended_at = now
+            session = ViewingSession(
+                id=uuid.uuid4(),
+                profile_id=item.profile_id,
+                title_id=item.title_id,
+                device_id=item.device_id,
+                device_type=item.device_type.value,
+                is_educational=educational[item.title_id],
+                started_at=now,
+                last_heartbeat_at=now,
+            )
+            new_sessions.append(session)
+            seeds[session.id] = (session, is_kids[item.profile_id])
+            opened[index] = session.id
+        elif item.session_id not in reloaded:
+            opened[index] = HTTPException(status_code=404, detail="Session not found")
+        # M-02: Verify session belongs to the requesting profile
+        elif reloaded[item.session_id].profile_id != item.profile_id:
+            opened[index] = HTTPException(
+                status_code=403, detail="Session does not belong to this profile"
+            )
+        else:
+            seeds[item.session_id] = (reloaded[item.session_id], is_kids[item.profile_id])
+            opened[index] = item.session_id
+
+    if new_sessions:
+        # New sessions terminate any existing active session for their profile
+        await db.execute(
+            update(ViewingSession)
+            .where(
+                and_(
+                    ViewingSession.profile_id.in_({s.profile_id for s in new_sessions}),
+                    ViewingSession.ended_at.is_(None),
+                )
+            )
+            .values(ended_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.add_all(new_sessions)
+        await db.commit()
+        db_op_count += 2
+
+    if seeds:
+        await heartbeat_aggregator.seed_sessions(list(seeds.values()))
+    return opened, db_op_count
+
+
+async def _process_heartbeat_batch_buffered(
+    db: AsyncSession,
+    items: list[HeartbeatRequest],
+) -> list[HeartbeatResponse | HTTPException]:
+    """Batch form of :func:`_process_heartbeat_buffered`.
+
+    All session beats go out in one pipelined round trip (plus one more for
+    sessions that had to be opened or reloaded, which are opened together),
+    and all balance beats in another.  Beats are applied in item order, so
+    each item's ``used_minutes`` and enforcement reflect the balance at its
+    own position in the batch.
+    """
+    from app.services.metrics_service import config_cache, perf_metrics
+
+    hb_start = time_mod.monotonic()
+    now = datetime.now(UTC)
+    db_op_count = 0
+    results: list[HeartbeatResponse | HTTPException | None] = [None] * len(items)
+    session_ids: list[uuid.UUID | None] = [item.session_id for item in items]
+    states: list[tuple[bool, bool, bool] | None] = [None] * len(items)
+
+    async def beat(indices: list[int]) -> list[int]:
+        """Beat items at *indices*; return those whose session Redis lacks."""
+        outcomes = await heartbeat_aggregator.session_beats(
+            [(session_ids[i], items[i].profile_id, items[i].is_paused) for i in indices],
+            now.timestamp(), PAUSE_GRACE_SECONDS, HEARTBEAT_INTERVAL_SECONDS,
+        )
+        missing = []
+        for i, outcome in zip(indices, outcomes):
+            if isinstance(outcome, PermissionError):
+                results[i] = HTTPException(status_code=403, detail=str(outcome))
+            elif outcome is None:
+                missing.append(i)
+            else:
+                states[i] = outcome
+        return missing
+
+    known = [i for i, sid in enumerate(session_ids) if sid is not None]
+    missing = await beat(known) if known else []
+    to_open = sorted(missing + [i for i, sid in enumerate(session_ids) if sid is None])
+    if to_open:
+        opened, ops = await _open_sessions_batch(db, items, to_open, now)
+        db_op_count += ops
+        for i, outcome in opened.items():
+            if isinstance(outcome, HTTPException):
+                results[i] = outcome
+            else:
+                session_ids[i] = outcome
+        for i in await beat([i for i in to_open if results[i] is None]):
+            # Seeded just above; only a concurrent Redis flush/eviction lands here
+            results[i] = HTTPException(status_code=503, detail="Viewing session state unavailable")
+
+    # ---- Configs for kids profiles (config cache, else one load per profile) ----
+    configs: dict[uuid.UUID, ViewingTimeConfig] = {}
+    for i, state in enumerate(states):
+        profile_id = items[i].profile_id
+        if state is None or not state[1] or profile_id in configs:
+            continue
+        config = config_cache.get_cached(profile_id)
+        if config is not None:
+            perf_metrics.config_cache_hits += 1
+        else:
+            config = await ensure_default_config(db, profile_id)
+            db_op_count += 1
+            config_cache.put(profile_id, config)
+            perf_metrics.config_cache_misses += 1
+        configs[profile_id] = config
+
+    # ---- Balance beats, in item order ----
+    limited: list[tuple[int, date, int]] = []
+    balance_beats: list[tuple[uuid.UUID, date, int, int]] = []
+    for i, state in enumerate(states):
+        if state is None or not state[1]:
+            continue
+        should_increment, _, is_educational = state
+        config = configs[items[i].profile_id]
+        viewing_day = get_viewing_day(now, config.reset_hour, config.timezone)
+        limit_minutes = (
+            config.weekend_limit_minutes if _is_weekend(viewing_day) else config.weekday_limit_minutes
+        )
+        used_inc = edu_inc = 0
+        if should_increment:
+            if is_educational and config.educational_exempt:
+                edu_inc = HEARTBEAT_INTERVAL_SECONDS
+            else:
+                used_inc = HEARTBEAT_INTERVAL_SECONDS
+        limited.append((i, viewing_day, limit_minutes))
+        balance_beats.append((items[i].profile_id, viewing_day, used_inc, edu_inc))
+
+    beats = await heartbeat_aggregator.balance_beats(balance_beats) if balance_beats else []
+    unseeded = {(b[0], b[1]) for b, (base, _, _) in zip(balance_beats, beats) if base is None}
+    seeded: dict[tuple[uuid.UUID, date], tuple[int, int, bool]] = {}
+    if unseeded:
+        bal_result = await db.execute(
+            select(
+                ViewingTimeBalance.profile_id,
+                ViewingTimeBalance.reset_date,
+                ViewingTimeBalance.used_seconds,
+                ViewingTimeBalance.educational_seconds,
+                ViewingTimeBalance.is_unlimited_override,
+            ).where(
+                tuple_(ViewingTimeBalance.profile_id, ViewingTimeBalance.reset_date).in_(unseeded)
+            )
+        )
+        db_op_count += 1
+        loaded = {(r[0], r[1]): tuple(r[2:]) for r in bal_result.tuples()}
+        seeded = {key: loaded.get(key, (0, 0, False)) for key in unseeded}
+        await heartbeat_aggregator.seed_balances(seeded)
+
+    usage: dict[int, tuple[int | None, int, bool]] = {}
+    for (i, viewing_day, limit_minutes), (base, pending_used, _) in zip(limited, beats):
+        if base is None:
+            base = seeded[(items[i].profile_id, viewing_day)]
+        usage[i] = (limit_minutes, base[0] + pending_used, base[2])
+
+    # ---- Per-item responses ----
+    for i, state in enumerate(states):
+        if state is None:
+            continue
+        has_limits = i in usage
+        limit_minutes, used_seconds, is_unlimited = usage.get(i, (None, 0, False))
+        enforcement, remaining_minutes = _enforcement(has_limits, limit_minutes, is_unlimited, used_seconds)
+        results[i] = HeartbeatResponse(
+            session_id=session_ids[i],
+            enforcement=enforcement,
+            remaining_minutes=remaining_minutes,
+            used_minutes=round(used_seconds / 60.0, 2),
+            is_educational=state[2],
+        )
+
+    hb_duration_ms = (time_mod.monotonic() - hb_start) * 1000
+    perf_metrics.record_heartbeat_batch(
+        count=sum(1 for s in states if s is not None), db_ops=db_op_count, duration_ms=hb_duration_ms
+    )
+    logger.info(
+        "heartbeat_batch_processed",
+        extra={
+            "items": len(items),
+            "db_ops": db_op_count,
+            "duration_ms": round(hb_duration_ms, 2),
+            "buffered": True,
+        },
+    )
+    return results
+
+
+async def _process_heartbeat_batch_direct(
+    db: AsyncSession,
+    items: list[HeartbeatRequest],
+) -> list[HeartbeatResponse | HTTPException]:
+    """Write-through heartbeat batch with a fixed number of statements.
+
+    Profiles, titles and sessions are each loaded in one query; session
+    updates go out as a single ``unnest`` UPDATE and balance increments as one
+    multi-row upsert per batch, regardless of how many items it carries.
+    """
+    from app.services.metrics_service import config_cache, perf_metrics
+
+    hb_start = time_mod.monotonic()
+    now = datetime.now(UTC)
+    db_op_count = 0
+    results: list[HeartbeatResponse | HTTPException | None] = [None] * len(items)
+
+    # ---- Bulk lookups ----
+    profile_rows = await db.execute(
+        select(Profile.id, Profile.is_kids, ViewingTimeConfig)
+        .outerjoin(ViewingTimeConfig, ViewingTimeConfig.profile_id == Profile.id)
+        .where(Profile.id.in_({item.profile_id for item in items}))
+    )
+    profiles = {r.id: (r.is_kids, r.ViewingTimeConfig) for r in profile_rows}
+    title_rows = await db.execute(
+        select(Title.id, Title.is_educational).where(Title.id.in_({item.title_id for item in items}))
+    )
+    educational = dict(title_rows.tuples().all())
+    db_op_count += 2
+
+    configs: dict[uuid.UUID, ViewingTimeConfig | None] = {}
+    for profile_id, (is_kids, config) in profiles.items():
+        if config is None and is_kids:
+            config = config_cache.get_cached(profile_id)
+            if config is not None:
+                perf_metrics.config_cache_hits += 1
+            else:
+                config = await ensure_default_config(db, profile_id)
+                db_op_count += 1
+                perf_metrics.config_cache_misses += 1
+        if config is not None:
+            config_cache.put(profile_id, config)
+        configs[profile_id] = config
+
+    session_ids = {item.session_id for item in items if item.session_id is not None}
+    sessions: dict[uuid.UUID, ViewingSession] = {}
+    if session_ids:
+        sess_result = await db.execute(
+            select(ViewingSession).where(ViewingSession.id.in_(session_ids))
+        )
+        sessions = {s.id: s for s in sess_result.scalars().all()}
+        db_op_count += 1
+
+    # ---- Validate items and open new sessions ----
+    new_sessions: dict[int, ViewingSession] = {}
+    for index, item in enumerate(items):
+        if item.profile_id not in profiles:
+            results[index] = HTTPException(status_code=404, detail="Profile not found")
+        elif item.title_id not in educational:
+            results[index] = HTTPException(status_code=404, detail="Title not found")
+        elif item.session_id is None:
+            # Later new-session items for the same profile end earlier ones,
+            # as they would if sent one by one.
+            for earlier in new_sessions.values():
+                if earlier.profile_id == item.profile_id:
+                    earlier.ended_at = now
+            new_sessions[index] = ViewingSession(
+                id=uuid.uuid4(),
+                profile_id=item.profile_id,
+                title_id=item.title_id,
+                device_id=item.device_id,
+                device_type=item.device_type.value,
+                is_educational=educational[item.title_id],
+                started_at=now,
+                last_heartbeat_at=now,
+            )
+        elif item.session_id not in sessions:
+            results[index] = HTTPException(status_code=404, detail="Session not found")
+        # M-02: Verify session belongs to the requesting profile
+        elif sessions[item.session_id].profile_id != item.profile_id:
+            results[index] = HTTPException(
+                status_code=403, detail="Session does not belong to this profile"
+            )
+
+    if new_sessions:
+        # New sessions terminate any existing active session for their profile
+        await db.execute(
+            update(ViewingSession)
+            .where(
+                and_(
+                    ViewingSession.profile_id.in_({s.profile_id for s in new_sessions.values()}),
+                    ViewingSession.ended_at.is_(None),
+                )
+            )
+            .values(ended_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.add_all(new_sessions.values())
+        db_op_count += 2
+
+    # ---- Pause handling and increments, in item order ----
+    paused: dict[uuid.UUID, datetime | None] = {
+        sid: s.paused_at for sid, s in sessions.items()
+    }
+    deltas: dict[uuid.UUID, int] = defaultdict(int)
+    balance_incs: dict[tuple[uuid.UUID, date], list[int]] = {}
+    accepted: list[tuple[int, uuid.UUID, date | None, int | None, int]] = []
+
+    for index, item in enumerate(items):
+        if results[index] is not None:
+            continue
+        if index in new_sessions:
+            session = new_sessions[index]
+            session.paused_at, should_increment = _pause_transition(None, item.is_paused, now)
+            if should_increment:
+                session.total_seconds = HEARTBEAT_INTERVAL_SECONDS
+            sid = session.id
+        else:
+            sid = item.session_id
+            paused[sid], should_increment = _pause_transition(paused[sid], item.is_paused, now)
+            deltas[sid] += HEARTBEAT_INTERVAL_SECONDS if should_increment else 0
+
+        is_kids, _ = profiles[item.profile_id]
+        config = configs[item.profile_id]
+        viewing_day: date | None = None
+        limit_minutes: int | None = None
+        used_inc = 0
+        if is_kids and config is not None:
+            viewing_day = get_viewing_day(now, config.reset_hour, config.timezone)
+            limit_minutes = (
+                config.weekend_limit_minutes if _is_weekend(viewing_day) else config.weekday_limit_minutes
+            )
+            inc = balance_incs.setdefault((item.profile_id, viewing_day), [0, 0])
+            if should_increment:
+                if educational[item.title_id] and config.educational_exempt:
+                    inc[1] += HEARTBEAT_INTERVAL_SECONDS
+                else:
+                    inc[0] += HEARTBEAT_INTERVAL_SECONDS
+                    used_inc = HEARTBEAT_INTERVAL_SECONDS
+        accepted.append((index, sid, viewing_day, limit_minutes, used_inc))
+
+    # ---- Set-based writes ----
+    if deltas:
+        await db.execute(
+            text(
+                "UPDATE viewing_sessions s SET "
+                "total_seconds = s.total_seconds + v.delta, "
+                "last_heartbeat_at = :now, "
+                "paused_at = v.paused "
+                "FROM unnest(CAST(:ids AS uuid[]), CAST(:deltas AS int[]), "
+                "CAST(:paused AS timestamptz[])) AS v(id, delta, paused) "
+                "WHERE s.id = v.id"
+            ).bindparams(
+                now=now,
+                ids=list(deltas),
+                deltas=list(deltas.values()),
+                paused=[paused[sid] for sid in deltas],
+            )
+        )
+        db_op_count += 1
+
+    balances: dict[tuple[uuid.UUID, date], tuple[int, bool]] = {}
+    if balance_incs:
+        stmt = insert(ViewingTimeBalance).values([
+            {
+                "id": uuid.uuid4(),
+                "profile_id": profile_id,
+                "reset_date": day,
+                "used_seconds": used_inc,
+                "educational_seconds": edu_inc,
+                "is_unlimited_override": False,
+                "updated_at": now,
+            }
+            for (profile_id, day), (used_inc, edu_inc) in balance_incs.items()
+        ])
+        bal_result = await db.execute(
+            stmt.on_conflict_do_update(
+                constraint="uq_vtb_profile_date",
+                set_={
+                    "used_seconds": ViewingTimeBalance.used_seconds + stmt.excluded.used_seconds,
+                    "educational_seconds": (
+                        ViewingTimeBalance.educational_seconds + stmt.excluded.educational_seconds
+                    ),
+                    "updated_at": now,
+                },
+            ).returning(
+                ViewingTimeBalance.profile_id,
+                ViewingTimeBalance.reset_date,
+                ViewingTimeBalance.used_seconds,
+                ViewingTimeBalance.is_unlimited_override,
+            )
+        )
+        balances = {
+            (r.profile_id, r.reset_date): (r.used_seconds, r.is_unlimited_override)
+            for r in bal_result
+        }
+        db_op_count += 1
+
+    await db.commit()
+    db_op_count += 1
+
+    # ---- Per-item enforcement ----
+    # The upsert returns each day's total after the whole batch; walking the
+    # items backwards and taking off later increments gives every item the
+    # balance at its own position, as if the heartbeats had arrived one by one.
+    running = dict(balances)
+    for index, sid, viewing_day, limit_minutes, used_inc in reversed(accepted):
+        item = items[index]
+        used_seconds, is_unlimited = (
+            running.get((item.profile_id, viewing_day), (0, False))
+            if viewing_day is not None
+            else (0, False)
+        )
+        if viewing_day is not None and (item.profile_id, viewing_day) in running:
+            running[(item.profile_id, viewing_day)] = (used_seconds - used_inc, is_unlimited)
+        enforcement, remaining_minutes = _enforcement(
+            viewing_day is not None, limit_minutes, is_unlimited, used_seconds
+        )
+        results[index] = HeartbeatResponse(
+            session_id=sid,
+            enforcement=enforcement,
+            remaining_minutes=remaining_minutes,
+            used_minutes=round(used_seconds / 60.0, 2),
+            is_educational=educational[item.title_id],
+        )
+
+    hb_duration_ms = (time_mod.monotonic() - hb_start) * 1000
+    perf_metrics.record_heartbeat_batch(
+        count=len(accepted), db_ops=db_op_count, duration_ms=hb_duration_ms
+    )
+    logger.info(
+        "heartbeat_batch_processed",
+        extra={
+            "items": len(items),
+            "db_ops": db_op_count,
+            "duration_ms": round(hb_duration_ms, 2),
+        },
+    )
+    return results
+
+
 # ---------------------------------------------------------------------------
 # Session end
 # ---------------------------------------------------------------------------
@@ -472,17 +1218,41 @@ async def end_session(
         if profile_result.scalar_one_or_none() is None:
             raise HTTPException(status_code=403, detail="Session access denied")
 
+    # Fold in seconds still held by the heartbeat aggregator
+    pending = 0
+    if heartbeat_aggregator.enabled:
+        try:
+            pending = await heartbeat_aggregator.take_session(session_id)
+        except RedisError:
+            logger.warning("Heartbeat aggregator unavailable at session end", exc_info=True)
+
     now = datetime.now(UTC)
-    session.ended_at = now
-    await db.commit()
+    try:
+        result = await db.execute(
+            update(ViewingSession)
+            .where(ViewingSession.id == session_id)
+            .values(ended_at=now, total_seconds=ViewingSession.total_seconds + pending)
+            .returning(ViewingSession.total_seconds)
+        )
+        total_seconds = result.scalar_one()
+        await db.commit()
+    except Exception:
+        if pending:
+            await heartbeat_aggregator.return_session(session_id, pending)
+        raise
+
+    if heartbeat_aggregator.enabled:
+        try:
+            await heartbeat_aggregator.drop_session(session_id)
+        except RedisError:
+            logger.warning("Could not drop ended session %s from Redis", session_id, exc_info=True)
 
     return SessionEndResponse(
         session_id=session.id,
-        total_seconds=session.total_seconds,
+        total_seconds=total_seconds,
         ended_at=now,
     )
 
-
 # ---------------------------------------------------------------------------
 # Playback eligibility
 # ---------------------------------------------------------------------------
@@ -588,6 +1358,15 @@ async def grant_extra_time(
     db.add(grant)
     await db.commit()
 
+    # The aggregator's cached copy of the balance row is now stale
+    pending_used = 0
+    if heartbeat_aggregator.enabled:
+        try:
+            await heartbeat_aggregator.invalidate_balance(profile_id, viewing_day)
+            pending_used, _ = await heartbeat_aggregator.pending_balance(profile_id, viewing_day)
+        except RedisError:
+            logger.warning("Heartbeat aggregator unavailable after time grant", exc_info=True)
+
     # Compute remaining
     is_unlimited = balance.is_unlimited_override
     if is_unlimited:
@@ -599,7 +1378,7 @@ async def grant_extra_time(
     if limit_minutes is None:
         return None, False
 
-    remaining = max(0.0, (limit_minutes * 60 - balance.used_seconds) / 60.0)
+    remaining = max(0.0, (limit_minutes * 60 - balance.used_seconds - pending_used) / 60.0)
     return round(remaining, 2), False
 
 
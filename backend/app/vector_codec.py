@@ -0,0 +1,57 @@
+"""Binary wire format for pgvector values on asyncpg connections.
+
+Registers a binary ``vector`` codec on every pooled connection so query
+vectors travel as packed float32 buffers instead of decimal text that
+Postgres has to parse back with ``CAST(:v AS vector)``.
+
+Service code should pass vectors through :func:`to_query_vector` and bind
+them as ``CAST(:name AS vector)``; the cast types the parameter as ``vector``
+so asyncpg routes it through the binary encoder.
+"""
+
+import logging
+
+import numpy as np
+from pgvector import Vector
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+
+def to_query_vector(values) -> np.ndarray:
+    """Pack *values* (list, ndarray or pgvector result) as a float32 array for binding."""
+    return np.asarray(values, dtype=np.float32)
+
+
+def _encode(value) -> bytes:
+    # The pgvector SQLAlchemy column type still renders ORM writes as text
+    # ("[0.1,0.2,...]"); accept both forms so ORM inserts keep working.
+    if isinstance(value, str):
+        value = Vector.from_text(value)
+    return Vector._to_db_binary(value)
+
+
+async def register_vector_codec(conn) -> None:
+    """Install the binary ``vector`` codec on a raw asyncpg connection."""
+    try:
+        await conn.set_type_codec(
+            "vector",
+            schema="public",
+            encoder=_encode,
+            decoder=Vector._from_db_binary,
+            format="binary",
+        )
+    except ValueError as exc:
+        # Extension not installed yet (fresh database before migrations).
+        if not str(exc).startswith("unknown type"):
+            raise
+        logger.warning("pgvector extension not found; using text vector format")
+
+
+def install(engine: AsyncEngine) -> None:
+    """Register the codec on every new connection the engine opens."""
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, _connection_record) -> None:
+        dbapi_connection.run_async(register_vector_codec)
@@ -0,0 +1,157 @@
+"""In-memory stand-ins for AsyncSession and the Redis client used by unit tests."""
+
+from types import SimpleNamespace
+
+
+class FakeResult:
+    def __init__(self, rows=None, scalar=None, rowcount: int = 0):
+        self._rows = list(rows or [])
+        self._scalar = scalar
+        self.rowcount = rowcount
+
+    def fetchall(self):
+        return self._rows
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def tuples(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+    def one(self):
+        (row,) = self._rows
+        return row
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+    def scalar_one(self):
+        return self._scalar
+
+    def scalar_one_or_none(self):
+        return self._scalar
+
+    def scalars(self):
+        return SimpleNamespace(all=lambda: list(self._rows))
+
+
+class FakeSession:
+    """Records executed statements; *handler(stmt, params)* supplies results.
+
+    ``fail_commits`` commits raise before any succeeds.
+    """
+
+    def __init__(self, handler=None, fail_commits: int = 0):
+        self.handler = handler or (lambda stmt, params: FakeResult())
+        self.fail_commits = fail_commits
+        self.executed: list = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def execute(self, stmt, params=None):
+        self.executed.append(stmt)
+        return self.handler(stmt, params)
+
+    async def commit(self):
+        if self.fail_commits:
+            self.fail_commits -= 1
+            raise RuntimeError("commit failed")
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+class FakeScript:
+    """A registered Lua script: records calls and returns *result* (or result(keys, args))."""
+
+    def __init__(self, result=None):
+        self.result = result
+        self.calls: list[tuple[list, list]] = []
+
+    async def __call__(self, keys=(), args=(), client=None):
+        self.calls.append((list(keys), list(args)))
+        return self.result(keys, args) if callable(self.result) else self.result
+
+
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis"):
+        self.redis = redis
+        self.ops: list[tuple] = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.ops.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self):
+        return [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.ops]
+
+
+class FakeRedis:
+    """The handful of commands the write-behind services issue outside Lua."""
+
+    def __init__(self):
+        self.zsets: dict[str, dict[str, float]] = {}
+        self.lists: dict[str, list[str]] = {}
+        self.hashes: dict[str, dict[str, str]] = {}
+        self.strings: dict[str, str] = {}
+        self.deleted: list[str] = []
+
+    def pipeline(self, transaction: bool = True):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        return self.strings.get(key)
+
+    async def mget(self, keys):
+        return [self.strings.get(k) for k in keys]
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = str(value)
+        return True
+
+    async def incr(self, key):
+        self.strings[key] = str(int(self.strings.get(key, 0)) + 1)
+        return int(self.strings[key])
+
+    async def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+        return len(mapping)
+
+    async def zrem(self, key, *members):
+        zset = self.zsets.get(key, {})
+        return sum(zset.pop(m, None) is not None for m in members)
+
+    async def zrangebyscore(self, key, low, high):
+        high = float(high)
+        return [m for m, score in sorted(self.zsets.get(key, {}).items(), key=lambda i: i[1]) if score <= high]
+
+    async def lrange(self, key, start, end):
+        return list(self.lists.get(key, []))
+
+    async def hsetnx(self, key, field, value):
+        bucket = self.hashes.setdefault(key, {})
+        if field in bucket:
+            return 0
+        bucket[field] = str(value)
+        return 1
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.deleted.append(key)
+            self.lists.pop(key, None)
+            self.hashes.pop(key, None)
+        return len(keys)
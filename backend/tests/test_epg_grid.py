@@ -0,0 +1,139 @@
+import asyncio
+import uuid
+from datetime import UTC, date, datetime, timedelta
+from types import SimpleNamespace
+
+from fastapi import Response
+
+from app.routers import epg as epg_router
+from app.services import epg_service
+from app.services.epg_grid_cache import epg_grid_cache
+from app.services.epg_service import build_grid, grid_days
+from app.services.epg_snapshot import SCHEDULE_VERSION_KEY
+from tests.fakes import FakeRedis
+
+A, B, C = (str(uuid.uuid4()) for _ in range(3))
+CHANNELS = [{"id": A, "name": "A"}, {"id": B, "name": "B"}, {"id": C, "name": "C"}]
+
+
+def _at(day, hour, minute=0):
+    return datetime(2026, 10, day, hour, minute, tzinfo=UTC)
+
+
+def _entry(channel_id, start, end):
+    return {
+        "channel_id": channel_id,
+        "start_time": start.isoformat(),
+        "end_time": end.isoformat(),
+    }
+
+
+def test_grid_days_include_the_previous_day():
+    assert grid_days(_at(17, 10), _at(17, 14)) == [date(2026, 10, 16), date(2026, 10, 17)]
+
+
+def test_grid_days_end_is_exclusive():
+    assert grid_days(_at(17, 0), _at(18, 0)) == [date(2026, 10, 16), date(2026, 10, 17)]
+    assert grid_days(_at(17, 0), _at(18, 0) + timedelta(microseconds=1)) == [
+        date(2026, 10, 16), date(2026, 10, 17), date(2026, 10, 18),
+    ]
+
+
+def test_grid_days_span_several_days():
+    assert grid_days(_at(17, 22), _at(20, 2)) == [
+        date(2026, 10, d) for d in (16, 17, 18, 19, 20)
+    ]
+
+
+def test_build_grid_keeps_entries_overlapping_the_window():
+    start, end = _at(17, 0), _at(17, 6)
+    spill = _entry(A, _at(16, 23), _at(17, 1))  # started the day before
+    inside = _entry(A, _at(17, 1), _at(17, 2))
+    ends_at_start = _entry(A, _at(16, 22), _at(17, 0))
+    starts_at_end = _entry(A, _at(17, 6), _at(17, 7))
+    days = {
+        date(2026, 10, 17): [inside, starts_at_end],
+        date(2026, 10, 16): [ends_at_start, spill],
+    }
+
+    rows = build_grid(CHANNELS, days, start, end)
+
+    assert rows[0]["entries"] == [spill, inside]
+    assert [r["entries"] for r in rows[1:]] == [[], []]
+
+
+def test_build_grid_filters_channels_in_channel_order():
+    start, end = _at(17, 0), _at(17, 6)
+    a = _entry(A, _at(17, 1), _at(17, 2))
+    b = _entry(B, _at(17, 1), _at(17, 2))
+    c = _entry(C, _at(17, 1), _at(17, 2))
+    days = {date(2026, 10, 17): [a, b, c]}
+
+    rows = build_grid(CHANNELS, days, start, end, channel_ids=[uuid.UUID(C), uuid.UUID(A)])
+
+    assert [r["channel"]["id"] for r in rows] == [A, C]
+    assert [r["entries"] for r in rows] == [[a], [c]]
+
+
+def test_build_grid_ignores_entries_for_unknown_channels():
+    start, end = _at(17, 0), _at(17, 6)
+    stray = _entry(str(uuid.uuid4()), _at(17, 1), _at(17, 2))
+
+    rows = build_grid(CHANNELS, {date(2026, 10, 17): [stray]}, start, end)
+
+    assert all(r["entries"] == [] for r in rows)
+
+
+def _grid(redis, if_none_match="", monkeypatch=None):
+    """Call the grid endpoint for 17 Oct with an empty schedule."""
+    monkeypatch.setattr(epg_grid_cache, "redis", redis)
+    monkeypatch.setattr(epg_service, "get_channels", _no_channels)
+    monkeypatch.setattr(epg_service, "get_grid_days", _no_entries)
+    request = SimpleNamespace(headers={"if-none-match": if_none_match} if if_none_match else {})
+    response = Response()
+    result = asyncio.run(epg_router.get_grid(request, response, None, _at(17, 0), _at(18, 0), None))
+    return result, response
+
+
+async def _no_channels(db):
+    return []
+
+
+async def _no_entries(db, days):
+    return {d: [] for d in days}
+
+
+def test_grid_revalidates_against_the_schedule_version(monkeypatch):
+    redis = FakeRedis()
+    redis.strings[SCHEDULE_VERSION_KEY] = "7"
+
+    result, response = _grid(redis, monkeypatch=monkeypatch)
+    etag = response.headers["ETag"]
+    assert result["channels"] == []
+
+    not_modified, _ = _grid(redis, if_none_match=f'"x", {etag}', monkeypatch=monkeypatch)
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+
+    redis.strings[SCHEDULE_VERSION_KEY] = "8"
+    changed, response = _grid(redis, if_none_match=etag, monkeypatch=monkeypatch)
+    assert isinstance(changed, dict)
+    assert response.headers["ETag"] != etag
+
+
+def test_grid_without_a_readable_version_has_no_etag(monkeypatch):
+    result, response = _grid(FakeRedis(), monkeypatch=monkeypatch)
+    etag = response.headers["ETag"]
+
+    # Redis unavailable: the old tag must not be honoured, nor a new one sent
+    result, response = _grid(None, if_none_match=etag, monkeypatch=monkeypatch)
+    assert isinstance(result, dict)
+    assert "ETag" not in response.headers
+
+
+def test_missing_version_key_is_seeded_once(monkeypatch):
+    monkeypatch.setattr(epg_grid_cache, "redis", FakeRedis())
+
+    first = asyncio.run(epg_grid_cache.schedule_version())
+    assert first not in (None, "0")
+    assert asyncio.run(epg_grid_cache.schedule_version()) == first
@@ -0,0 +1,16 @@
+from app.services.epg_service import schedule_search_filter
+
+
+def _columns(clause):
+    sql = str(clause)
+    return {c for c in ("title", "series_title", "synopsis") if f"schedule_entries.{c}" in sql}
+
+
+def test_default_search_matches_the_programme_title_only():
+    assert _columns(schedule_search_filter("news")) == {"title"}
+
+
+def test_series_title_matching_is_opt_in():
+    assert _columns(schedule_search_filter("news", include_series_title=True)) == {
+        "title", "series_title",
+    }
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import UTC, date, datetime
+
+import pytest
+from sqlalchemy import Select
+
+from app.services.heartbeat_aggregator import INFLIGHT_KEY, HeartbeatAggregator, _parse_inflight
+from tests.fakes import FakeRedis, FakeResult, FakeScript, FakeSession
+
+SESSION_ID = uuid.uuid4()
+PROFILE_ID = uuid.uuid4()
+TAKEN = [
+    0,
+    f"s:{SESSION_ID}", "30|1700000000.5|",
+    f"b:{PROFILE_ID}:2026-10-17", "30|0",
+]
+
+
+def _aggregator(redis, taken=TAKEN):
+    """An aggregator whose take script returns *taken* and indexes the flush."""
+
+    def take(keys, args):
+        if len(taken) > 1:
+            redis.zsets.setdefault(keys[3], {})[args[1]] = args[2]
+        return list(taken)
+
+    agg = HeartbeatAggregator(flush_batch=100, base_ttl=60)
+    agg._redis = redis
+    agg._scripts = {"take": FakeScript(take), "requeue": FakeScript(1)}
+    agg._pruned_at = time.monotonic()  # skip ledger pruning
+    return agg
+
+
+def _session(applied=False, fail_commits=0):
+    """A session whose ledger lookup reports *applied* for every flush id."""
+
+    def handler(stmt, params):
+        if isinstance(stmt, Select):
+            return FakeResult(scalar=applied)
+        return FakeResult()
+
+    return FakeSession(handler, fail_commits=fail_commits)
+
+
+def _flush_id(agg):
+    (keys, args), = agg._scripts["take"].calls
+    return args[1]
+
+
+def test_parse_inflight_splits_sessions_and_balances():
+    paused = f"s:{uuid.UUID(int=1)}", "0||1700000100"
+    sessions, balances = _parse_inflight(TAKEN[1:] + list(paused))
+
+    assert sessions == [
+        (SESSION_ID, 30, datetime.fromtimestamp(1700000000.5, UTC), None),
+        (uuid.UUID(int=1), 0, None, datetime.fromtimestamp(1700000100, UTC)),
+    ]
+    assert balances == [(PROFILE_ID, date(2026, 10, 17), 30, 0)]
+
+
+def test_committed_flush_forgets_its_inflight_state():
+    redis = FakeRedis()
+    agg = _aggregator(redis)
+    db = _session()
+
+    assert asyncio.run(agg.flush(db)) == (2, 3)
+
+    flush_id = _flush_id(agg)
+    assert db.commits == 1
+    assert f"vt:inflight:{flush_id}" in redis.deleted
+    assert redis.zsets[INFLIGHT_KEY] == {}
+    assert agg._scripts["requeue"].calls == []
+
+
+def test_failed_commit_requeues_unapplied_flush():
+    redis = FakeRedis()
+    agg = _aggregator(redis)
+    db = _session(applied=False, fail_commits=1)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(agg.flush(db))
+
+    flush_id = _flush_id(agg)
+    assert db.rollbacks == 1
+    assert db.commits == 1  # the settle's fencing insert
+    (keys, args), = agg._scripts["requeue"].calls
+    assert keys[:2] == [f"vt:inflight:{flush_id}", INFLIGHT_KEY]
+    assert args == [flush_id]
+
+
+def test_failed_commit_that_landed_is_not_requeued():
+    # the commit raised but the ledger shows the flush applied
+    redis = FakeRedis()
+    agg = _aggregator(redis)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(agg.flush(_session(applied=True, fail_commits=1)))
+
+    assert agg._scripts["requeue"].calls == []
+    assert redis.zsets[INFLIGHT_KEY] == {}
+    assert f"vt:inflight:{_flush_id(agg)}" in redis.deleted
+
+
+def test_failed_settle_leaves_flush_for_recovery(caplog):
+    redis = FakeRedis()
+    agg = _aggregator(redis)
+
+    with caplog.at_level(logging.ERROR), pytest.raises(RuntimeError):
+        asyncio.run(agg.flush(_session(fail_commits=2)))
+
+    flush_id = _flush_id(agg)
+    assert agg._scripts["requeue"].calls == []
+    assert flush_id in redis.zsets[INFLIGHT_KEY]
+    assert "Could not settle heartbeat flush" in caplog.text
+
+
+def test_recover_settles_only_stale_flushes():
+    redis = FakeRedis()
+    stale, young = str(uuid.uuid4()), str(uuid.uuid4())
+    redis.zsets[INFLIGHT_KEY] = {stale: time.time() - 3600, young: time.time()}
+    agg = _aggregator(redis)
+    db = _session(applied=False)
+
+    assert asyncio.run(agg.recover(db)) == 1
+
+    (keys, args), = agg._scripts["requeue"].calls
+    assert args == [stale]
+    assert db.commits == 1
+
+
+def test_recover_prunes_the_ledger_periodically():
+    agg = _aggregator(FakeRedis())
+    agg._pruned_at = float("-inf")
+    db = _session()
+
+    asyncio.run(agg.recover(db))
+    asyncio.run(agg.recover(db))
+
+    assert len(db.executed) == 1
+    assert db.commits == 1
+
+
+def test_lost_sessions_are_reported(caplog):
+    agg = _aggregator(FakeRedis(), taken=[2])
+    db = _session()
+
+    with caplog.at_level(logging.WARNING):
+        assert asyncio.run(agg.flush(db)) == (0, 0)
+
+    assert db.executed == []
+    assert "2 dirty viewing sessions had no Redis state" in caplog.text
@@ -0,0 +1,47 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+from app.services.package_index import PackageIndex
+from tests.fakes import FakeResult, FakeSession
+
+BASIC, PREMIUM, NEW = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+T1, T2, T3 = sorted(uuid.uuid4() for _ in range(3))
+
+
+def _index():
+    packages = [
+        SimpleNamespace(id=BASIC, tier="basic", max_streams=1),
+        SimpleNamespace(id=PREMIUM, tier="premium", max_streams=4),
+    ]
+    contents = [
+        SimpleNamespace(package_id=BASIC, content_id=T1),
+        SimpleNamespace(package_id=PREMIUM, content_id=T1),
+        SimpleNamespace(package_id=PREMIUM, content_id=T2),
+    ]
+
+    def handler(stmt, params):
+        return FakeResult(rows=packages if "FROM content_packages" in stmt.text else contents)
+
+    index = PackageIndex()
+    asyncio.run(index.rebuild(FakeSession(handler), version="1"))
+    return index
+
+
+def test_membership_and_limits():
+    index = _index()
+
+    assert index.contains([BASIC], T1)
+    assert not index.contains([BASIC], T2)
+    assert not index.contains([BASIC, PREMIUM], T3)
+    assert sorted(index.packages_for(T1)) == sorted([BASIC, PREMIUM])
+    assert index.titles(PREMIUM) == [T1, T2]
+    assert index.max_streams([BASIC, PREMIUM]) == 4
+
+
+def test_packages_created_after_the_build_are_unknown():
+    index = _index()
+
+    assert index.knows([BASIC, PREMIUM])
+    assert not index.knows([BASIC, NEW])
+    assert index.knows([])
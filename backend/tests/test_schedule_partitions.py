@@ -0,0 +1,80 @@
+import asyncio
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy.sql.elements import TextClause
+
+from app.services.epg_snapshot import SCHEDULE_VERSION_KEY
+from app.services.schedule_partitions import maintain, partition_name
+from tests.fakes import FakeRedis, FakeResult, FakeSession
+
+NOW = datetime(2026, 10, 17, 12, 0, tzinfo=UTC)
+EXPIRED_DAY = date(2026, 9, 1)
+
+
+def _session(recorded: bool, purged: int = 0):
+    """A partitioned schedule with one expired daily partition and every upcoming one."""
+    partitions = [(partition_name(EXPIRED_DAY),)] + [
+        (partition_name(NOW.date() + timedelta(days=d)),) for d in range(60)
+    ]
+
+    def handler(stmt, params):
+        sql = stmt.text if isinstance(stmt, TextClause) else str(stmt)
+        if "relkind" in sql or "pg_try_advisory_xact_lock" in sql:
+            return FakeResult(scalar=True)
+        if "pg_inherits" in sql:
+            return FakeResult(rows=partitions)
+        if "FROM channels" in sql:
+            return FakeResult(scalar=168)
+        if "FROM recordings r JOIN" in sql:
+            return FakeResult(scalar=recorded)
+        if sql.startswith("DELETE FROM schedule_entries_default"):
+            return FakeResult(rowcount=purged)
+        return FakeResult()
+
+    return FakeSession(handler)
+
+
+def _statements(db):
+    return [s.text for s in db.executed if isinstance(s, TextClause)]
+
+
+def test_partition_with_recordings_survives_maintenance():
+    db, redis = _session(recorded=True), FakeRedis()
+
+    assert asyncio.run(maintain(db, NOW, redis=redis)) == (0, 0)
+
+    statements = _statements(db)
+    assert not any(s.startswith("DROP TABLE") or "DETACH PARTITION" in s for s in statements)
+    assert not any(s.startswith("DELETE FROM recordings") for s in statements)
+    assert SCHEDULE_VERSION_KEY not in redis.strings
+
+
+def test_default_partition_purge_keeps_recorded_rows():
+    db = _session(recorded=True)
+
+    asyncio.run(maintain(db, NOW, redis=FakeRedis()))
+
+    purges = [s for s in _statements(db) if s.startswith("DELETE FROM schedule_entries_default")]
+    assert len(purges) == 1
+    assert "NOT EXISTS (SELECT 1 FROM recordings" in purges[0]
+
+
+def test_dropping_a_partition_bumps_the_schedule_version():
+    db, redis = _session(recorded=False), FakeRedis()
+
+    assert asyncio.run(maintain(db, NOW, redis=redis)) == (0, 1)
+
+    name = partition_name(EXPIRED_DAY)
+    statements = _statements(db)
+    assert f'DROP TABLE "{name}"' in statements
+    assert any(s.startswith("DELETE FROM tstv_sessions") for s in statements)
+    assert not any(s.startswith("DELETE FROM recordings") for s in statements)
+    assert redis.strings[SCHEDULE_VERSION_KEY] == "1"
+
+
+def test_purging_the_default_partition_bumps_the_schedule_version():
+    db, redis = _session(recorded=True, purged=3), FakeRedis()
+
+    asyncio.run(maintain(db, NOW, redis=redis))
+
+    assert redis.strings[SCHEDULE_VERSION_KEY] == "1"
@@ -0,0 +1,82 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+from sqlalchemy.sql.elements import TextClause
+
+from app.config import settings
+from app.models.embedding import EMBEDDING_DIM
+from app.services.recommendation_service import get_similar_titles
+from tests.fakes import FakeResult, FakeSession
+
+SOURCE_ID = uuid.uuid4()
+
+
+def _rows(n, similarity):
+    return [
+        SimpleNamespace(
+            id=uuid.uuid4(), title=f"T{i}", title_type="movie", poster_url=None,
+            landscape_url=None, synopsis_short=None, release_year=2020, age_rating="G",
+            similarity=similarity,
+        )
+        for i in range(n)
+    ]
+
+
+def _session(stored_rows, stored_count, live_rows):
+    """Stored neighbours surviving the filter, the unfiltered stored count, and live kNN rows."""
+    live_queries = []
+
+    def handler(stmt, params):
+        if isinstance(stmt, TextClause):
+            if "FROM title_neighbors tn" in stmt.text:
+                return FakeResult(rows=stored_rows)
+            compiled = stmt.compile().params
+            live_queries.append((stmt.text, compiled["lim"]))
+            return FakeResult(rows=live_rows[: compiled["lim"]])
+        if "count(" in str(stmt):
+            return FakeResult(scalar=stored_count)
+        return FakeResult(rows=[([0.1] * EMBEDDING_DIM,)])
+
+    db = FakeSession(handler)
+    db.live_queries = live_queries
+    return db
+
+
+def _similar(db, limit=10):
+    return asyncio.run(get_similar_titles(db, SOURCE_ID, limit, allowed_ratings=["G"]))
+
+
+def test_full_stored_page_needs_no_live_query():
+    db = _session(_rows(10, 0.9), settings.title_neighbor_depth, _rows(10, 0.5))
+
+    assert len(_similar(db)) == 10
+    assert db.live_queries == []
+    assert len(db.executed) == 1
+
+
+def test_filtered_full_depth_list_is_topped_up_for_the_missing_count():
+    db = _session(_rows(4, 0.9), settings.title_neighbor_depth, _rows(10, 0.5))
+
+    items = _similar(db)
+
+    assert [i["similarity_score"] for i in items] == [0.9] * 4 + [0.5] * 6
+    (sql, lim), = db.live_queries
+    assert lim == 6
+    assert "NOT IN (SELECT neighbor_id FROM title_neighbors" in sql
+
+
+def test_short_stored_list_is_exhaustive():
+    db = _session(_rows(4, 0.9), 30, _rows(10, 0.5))
+
+    assert len(_similar(db)) == 4
+    assert db.live_queries == []
+
+
+def test_title_without_stored_neighbours_uses_the_live_query():
+    db = _session([], 0, _rows(10, 0.5))
+
+    assert len(_similar(db)) == 10
+    (sql, lim), = db.live_queries
+    assert lim == 10
+    assert "NOT IN (SELECT neighbor_id" not in sql
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import time
+import uuid
+
+import pytest
+from sqlalchemy.sql.elements import TextClause
+
+from app.services.stream_counter import DIRTY_KEY, INFLIGHT_KEY, StreamCounter
+from tests.fakes import FakeRedis, FakeResult, FakeScript, FakeSession
+
+
+def _counter(redis, pending):
+    """A counter whose take script moves *pending* onto the flush's in-flight list."""
+
+    def take(keys, args):
+        batch = [json.dumps(e) for e in pending]
+        pending.clear()
+        if batch:
+            redis.lists[keys[2]] = list(batch)
+            redis.zsets.setdefault(keys[3], {})[args[1]] = args[2]
+        return batch
+
+    counter = StreamCounter(abandon_seconds=120, flush_batch=100)
+    counter._redis = redis
+    counter._scripts = {"take": FakeScript(take)}
+    return counter
+
+
+def _session(unmatched=(), fail_commits=0):
+    """A session whose heartbeat statement reports *unmatched* session ids."""
+
+    def handler(stmt, params):
+        if isinstance(stmt, TextClause) and "WITH v AS" in stmt.text:
+            return FakeResult(rows=list(unmatched))
+        return FakeResult()
+
+    return FakeSession(handler, fail_commits=fail_commits)
+
+
+def _start(sid, now):
+    return {
+        "op": "start", "id": sid, "user_id": str(uuid.uuid4()), "title_id": None,
+        "content_type": "vod", "started_at": now,
+    }
+
+
+def test_committed_batch_is_released():
+    redis, now = FakeRedis(), time.time()
+    sid = str(uuid.uuid4())
+    counter = _counter(redis, [_start(sid, now), {"op": "hb", "id": sid, "at": now}])
+    db = _session()
+
+    assert asyncio.run(counter.flush(db)) == 2
+    assert db.commits == 1
+    assert redis.zsets[INFLIGHT_KEY] == {}
+    assert not any(k.startswith(f"{INFLIGHT_KEY}:") for k in redis.lists)
+
+
+def test_failed_commit_keeps_batch_for_the_next_flush():
+    redis, now = FakeRedis(), time.time()
+    sid = str(uuid.uuid4())
+    counter = _counter(redis, [_start(sid, now), {"op": "end", "id": sid, "at": now}])
+    db = _session(fail_commits=1)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(counter.flush(db))
+
+    assert db.rollbacks == 1
+    (flush_id, score), = redis.zsets[INFLIGHT_KEY].items()
+    assert score == 0
+    assert len(redis.lists[f"{INFLIGHT_KEY}:{flush_id}"]) == 2
+
+    # the next flush re-applies the retained batch before taking new work
+    retry = _session()
+    assert asyncio.run(counter.flush(retry)) == 2
+    assert retry.commits == 1
+    assert redis.zsets[INFLIGHT_KEY] == {}
+    assert f"{INFLIGHT_KEY}:{flush_id}" not in redis.lists
+
+
+def test_orphaned_batch_is_recovered_only_after_grace_period():
+    redis, now = FakeRedis(), time.time()
+    sid = str(uuid.uuid4())
+    redis.lists[f"{INFLIGHT_KEY}:old"] = [json.dumps({"op": "end", "id": sid, "at": now})]
+    redis.lists[f"{INFLIGHT_KEY}:young"] = [json.dumps({"op": "end", "id": sid, "at": now})]
+    redis.zsets[INFLIGHT_KEY] = {"old": now - 3600, "young": now}
+    counter = _counter(redis, [])
+
+    assert asyncio.run(counter.recover(_session())) == 1
+    assert redis.zsets[INFLIGHT_KEY] == {"young": now}
+    assert f"{INFLIGHT_KEY}:old" not in redis.lists
+
+
+def test_empty_in_flight_entry_is_dropped():
+    redis = FakeRedis()
+    redis.zsets[INFLIGHT_KEY] = {"gone": 0}
+    counter = _counter(redis, [])
+
+    assert asyncio.run(counter.recover(_session())) == 0
+    assert redis.zsets[INFLIGHT_KEY] == {}
+
+
+def test_unmatched_heartbeats_are_requeued_unless_abandoned():
+    redis, now = FakeRedis(), time.time()
+    fresh, stale = str(uuid.uuid4()), str(uuid.uuid4())
+    counter = _counter(redis, [
+        {"op": "hb", "id": fresh, "at": now},
+        {"op": "hb", "id": stale, "at": now - 3600},
+    ])
+
+    asyncio.run(counter.flush(_session(unmatched=[fresh, stale])))
+
+    assert redis.hashes[DIRTY_KEY] == {fresh: str(now)}
+
+
+def test_requeue_does_not_overwrite_a_newer_heartbeat():
+    redis, now = FakeRedis(), time.time()
+    sid = str(uuid.uuid4())
+    counter = _counter(redis, [{"op": "hb", "id": sid, "at": now - 5}])
+    redis.hashes[DIRTY_KEY] = {sid: str(now)}
+
+    asyncio.run(counter.flush(_session(unmatched=[sid])))
+
+    assert redis.hashes[DIRTY_KEY] == {sid: str(now)}
@@ -0,0 +1,86 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+from app.services.suggest_index import SuggestIndex
+from tests.fakes import FakeResult, FakeSession
+
+
+def _title(name, rating="PG", featured=False):
+    return SimpleNamespace(id=uuid.uuid4(), title=name, age_rating=rating, is_featured=featured)
+
+
+def _build(titles=(), people=(), genres=()):
+    """Rebuild a fresh index from catalog rows served by a fake session."""
+
+    def handler(stmt, params):
+        sql = str(stmt)
+        if "FROM titles" in sql:
+            return FakeResult(rows=titles)
+        if "FROM title_cast" in sql:
+            return FakeResult(rows=[SimpleNamespace(person_name=n, n=w) for n, w in people])
+        return FakeResult(rows=[SimpleNamespace(name=n, n=w) for n, w in genres])
+
+    index = SuggestIndex()
+    asyncio.run(index.rebuild(FakeSession(handler), version="v1"))
+    return index
+
+
+def _texts(suggestions):
+    return [s.text for s in suggestions]
+
+
+def test_full_name_match_outranks_mid_name_match():
+    index = _build(titles=[_title("The Dark Knight", featured=True), _title("Dark Waters")])
+
+    for prefix in ("da", "dar", "dark"):
+        assert _texts(index.suggest(prefix)) == ["Dark Waters", "The Dark Knight"]
+
+
+def test_weight_ranks_across_the_whole_matching_range():
+    # The heaviest match sorts after hundreds of lighter keys with the same prefix.
+    people = [(f"Aaron Abbott {i:03d}", 1) for i in range(400)] + [("Abz Star", 50)]
+    index = _build(people=people)
+
+    for prefix in ("a", "ab", "abz", "Ab"):
+        assert index.suggest(prefix, limit=1)[0].text == "Abz Star"
+    assert index.suggest("aaron", limit=3)[0].text == "Aaron Abbott 000"
+
+
+def test_short_and_long_prefixes_rank_alike():
+    index = _build(
+        titles=[_title("Star Trek"), _title("Stargate", featured=True), _title("Lone Star")],
+        people=[("Stanley Tucci", 3)],
+        genres=[("Stand-up", 2)],
+    )
+
+    assert _texts(index.suggest("st", limit=10)) == _texts(index.suggest("sta", limit=10))
+    assert _texts(index.suggest("sta")) == [
+        "Stanley Tucci", "Stargate", "Stand-up", "Star Trek", "Lone Star",
+    ]
+
+
+def test_titles_outside_allowed_ratings_are_skipped():
+    index = _build(
+        titles=[_title("Bloodsport", rating="R", featured=True), _title("Bluey", rating="G")],
+        people=[("Bl Person", 1)],
+    )
+
+    for prefix in ("bl", "blo", "blu"):
+        texts = _texts(index.suggest(prefix, allowed_ratings=["G"]))
+        assert "Bloodsport" not in texts
+    assert _texts(index.suggest("bl", limit=2, allowed_ratings=["G"])) == ["Bluey", "Bl Person"]
+    assert _texts(index.suggest("bl", limit=1)) == ["Bloodsport"]
+
+
+def test_each_suggestion_is_returned_once():
+    index = _build(titles=[_title("Knight Knight")])
+
+    assert _texts(index.suggest("kn")) == ["Knight Knight"]
+    assert _texts(index.suggest("knight")) == ["Knight Knight"]
+
+
+def test_empty_prefix_returns_nothing():
+    index = _build(titles=[_title("Anything")])
+
+    assert index.suggest("   ") == []
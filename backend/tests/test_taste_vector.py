@@ -0,0 +1,92 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+from sqlalchemy import Select
+from sqlalchemy.sql.elements import TextClause
+
+from app.models.embedding import EMBEDDING_DIM
+from app.services import recommendation_service
+from app.services.recommendation_service import get_taste_vector, update_taste_vector
+from tests.fakes import FakeResult, FakeSession
+
+PROFILE_ID, TITLE_ID = uuid.uuid4(), uuid.uuid4()
+
+
+def _session(weight_total_after, stored=None):
+    """A bookmarked title with an embedding; the UPDATE reports *weight_total_after*."""
+
+    def handler(stmt, params):
+        if isinstance(stmt, Select):
+            if stored is not None:
+                return FakeResult(rows=[stored])
+            return FakeResult(scalar=[0.1] * EMBEDDING_DIM)
+        sql = stmt.text if isinstance(stmt, TextClause) else str(stmt)
+        if "UPDATE profile_embeddings" in sql:
+            return FakeResult(scalar=weight_total_after)
+        if "SELECT EXISTS" in sql:
+            return FakeResult(rows=[SimpleNamespace(bookmarked=True, rating=None, watchlisted=False)])
+        if "INSERT INTO profile_embeddings" in sql:
+            return FakeResult(rowcount=1)
+        return FakeResult()
+
+    return FakeSession(handler)
+
+
+def _rebuilt(db):
+    return any(
+        isinstance(s, TextClause) and "INSERT INTO profile_embeddings" in s.text for s in db.executed
+    )
+
+
+def test_increment_applies_to_the_stored_sum():
+    db = _session(weight_total_after=1.0)
+
+    asyncio.run(update_taste_vector(db, PROFILE_ID, TITLE_ID, old_weight=0.0))
+
+    assert not _rebuilt(db)
+
+
+def test_missing_row_is_rebuilt():
+    db = _session(weight_total_after=None)
+
+    asyncio.run(update_taste_vector(db, PROFILE_ID, TITLE_ID, old_weight=0.0))
+
+    assert _rebuilt(db)
+
+
+def test_negative_total_is_rebuilt():
+    # removing a contribution that was never added
+    db = _session(weight_total_after=-1.0)
+
+    asyncio.run(update_taste_vector(db, PROFILE_ID, TITLE_ID, old_weight=2.0))
+
+    assert _rebuilt(db)
+
+
+def test_empty_or_drifted_total_has_no_centroid():
+    for weight_total in (0.0, 1e-9, -0.5):
+        stored = SimpleNamespace(vector_sum=[1.0] * EMBEDDING_DIM, weight_total=weight_total)
+        assert asyncio.run(get_taste_vector(_session(None, stored), PROFILE_ID)) is None
+
+
+def test_centroid_is_the_weighted_mean():
+    stored = SimpleNamespace(vector_sum=[3.0] * EMBEDDING_DIM, weight_total=1.5)
+
+    assert asyncio.run(get_taste_vector(_session(None, stored), PROFILE_ID)) == [2.0] * EMBEDDING_DIM
+
+
+def _fail_own_session(*args, **kwargs):
+    raise AssertionError("opened a dedicated session")
+
+
+def test_backfill_uses_the_given_session(monkeypatch):
+    monkeypatch.setattr(recommendation_service, "_on_own_session", _fail_own_session)
+    db = _session(None, stored=None)
+    db.handler = lambda stmt, params: (
+        FakeResult(rowcount=1) if isinstance(stmt, TextClause) else FakeResult()
+    )
+
+    assert asyncio.run(get_taste_vector(db, PROFILE_ID, backfill_session=db)) is None
+    assert _rebuilt(db)
+    assert db.commits == 1
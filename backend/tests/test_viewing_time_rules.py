@@ -0,0 +1,58 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from app.schemas.viewing_time import EnforcementStatus
+from app.services.viewing_time_service import PAUSE_GRACE_SECONDS, _enforcement, _pause_transition
+
+NOW = datetime(2026, 10, 17, 12, 0, tzinfo=UTC)
+GRACE = timedelta(seconds=PAUSE_GRACE_SECONDS)
+SECOND = timedelta(seconds=1)
+
+
+@pytest.mark.parametrize(
+    ("paused_at", "is_paused", "expected"),
+    [
+        # playing stays playing
+        (None, False, (None, True)),
+        # pausing starts the grace period and still counts
+        (None, True, (NOW, True)),
+        # still paused within the grace period
+        (NOW - GRACE, True, (NOW - GRACE, True)),
+        # still paused past the grace period
+        (NOW - GRACE - SECOND, True, (NOW - GRACE - SECOND, False)),
+        # resuming within the grace period
+        (NOW - GRACE, False, (None, True)),
+        # resuming after the grace period does not count the beat
+        (NOW - GRACE - SECOND, False, (None, False)),
+    ],
+)
+def test_pause_transition(paused_at, is_paused, expected):
+    assert _pause_transition(paused_at, is_paused, NOW) == expected
+
+
+@pytest.mark.parametrize(
+    ("used_seconds", "expected"),
+    [
+        (0, (EnforcementStatus.allowed, 60.0)),
+        (60 * 60 - 15 * 60 - 1, (EnforcementStatus.allowed, 15.02)),
+        (60 * 60 - 15 * 60, (EnforcementStatus.warning_15, 15.0)),
+        (60 * 60 - 5 * 60 - 1, (EnforcementStatus.warning_15, 5.02)),
+        (60 * 60 - 5 * 60, (EnforcementStatus.warning_5, 5.0)),
+        (60 * 60 - 1, (EnforcementStatus.warning_5, 0.02)),
+        (60 * 60, (EnforcementStatus.blocked, 0.0)),
+        (2 * 60 * 60, (EnforcementStatus.blocked, 0.0)),
+    ],
+)
+def test_enforcement_thresholds(used_seconds, expected):
+    assert _enforcement(True, 60, False, used_seconds) == expected
+
+
+@pytest.mark.parametrize(
+    ("has_limits", "limit_minutes", "is_unlimited"),
+    [(False, 60, False), (True, None, False), (True, 60, True)],
+)
+def test_enforcement_without_a_limit(has_limits, limit_minutes, is_unlimited):
+    assert _enforcement(has_limits, limit_minutes, is_unlimited, 10**6) == (
+        EnforcementStatus.allowed, None,
+    )
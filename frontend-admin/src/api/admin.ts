@@ -112,9 +112,16 @@ export interface SchedulePayload {
   is_new: boolean
 }
 
-export interface EmbeddingResult {
-  generated: number
-  total: number
+export interface EmbeddingJob {
+  job_id: string
+  status: 'pending' | 'running' | 'complete' | 'failed'
+  mode: 'missing' | 'refresh' | 'regenerate'
+  total_titles: number
+  processed: number
+  submitted_at: string
+  started_at: string | null
+  completed_at: string | null
+  error_message: string | null
 }
 
 export interface AdminUser {
@@ -230,11 +237,15 @@ export function deleteScheduleEntry(id: string) {
 // ---- Embeddings ----
 
 export function generateEmbeddings() {
-  return apiFetch<EmbeddingResult>('/admin/embeddings/generate', {
+  return apiFetch<EmbeddingJob>('/admin/embeddings/generate', {
     method: 'POST',
   })
 }
 
+export function getEmbeddingJob(jobId: string) {
+  return apiFetch<EmbeddingJob>(`/admin/embeddings/jobs/${jobId}`)
+}
+
 // ---- Genres ----
 
 export function getGenres() {
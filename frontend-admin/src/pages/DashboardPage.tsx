@@ -15,7 +15,7 @@ export default function DashboardPage() {
     mutationFn: generateEmbeddings,
     onSuccess: (result) => {
       showToast(
-        `Generated ${result.generated} embeddings (${result.total} total)`,
+        `Embedding job ${result.status}: ${result.processed}/${result.total_titles} titles`,
         'success',
       )
       queryClient.invalidateQueries({ queryKey: ['admin-stats'] })
@@ -125,9 +125,15 @@ export function getFeatured(profileId?: string): Promise<TitleListItem[]> {
 
 // ── Semantic search ─────────────────────────────────────────────────────────
 
+export interface MatchHighlights {
+  synopsis: string | null
+  cast: string[]
+}
+
 export interface SearchResultItem extends TitleListItem {
   match_reason: string
   match_type: 'keyword' | 'semantic' | 'both'
+  highlights: MatchHighlights | null
   similarity_score: number | null
 }
 
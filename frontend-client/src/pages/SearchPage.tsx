@@ -70,6 +70,7 @@ export default function SearchPage() {
         ...item,
         match_reason: 'Keyword match',
         match_type: 'keyword' as const,
+        highlights: null,
         similarity_score: null,
       }))
     : (semanticData?.items ?? [])
@@ -6,6 +6,7 @@ to AI agents via stdio transport.
 
 import os
 import sys
+import time
 import uuid
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
@@ -38,6 +39,7 @@ from app.models.embedding import ContentEmbedding  # noqa: E402
 from app.models.tstv import TSTVSession, Recording  # noqa: E402
 from app.models.viewing import Rating, WatchlistItem  # noqa: E402
 from app.services import catalog_service, epg_service  # noqa: E402
+from app.services.package_index import package_index  # noqa: E402
 
 from ott_mcp.db import async_session_factory, engine  # noqa: E402
 from ott_mcp.serializers import to_json  # noqa: E402
@@ -87,6 +89,18 @@ def _get_session_factory(ctx: Context) -> async_sessionmaker:
     return app_ctx.session_factory
 
 
+# No Redis here to signal admin changes, so the index is simply reloaded
+# once it is older than this.
+_PACKAGE_INDEX_MAX_AGE = 60  # seconds
+
+
+async def _get_package_index(db: AsyncSession):
+    """Return the package membership index, rebuilding it when stale."""
+    if not package_index.ready or time.time() - package_index.built_at > _PACKAGE_INDEX_MAX_AGE:
+        await package_index.rebuild(db)
+    return package_index
+
+
 def _serialize_title_summary(t: Title) -> dict:
     """Serialize a Title to a compact summary dict."""
     return {
@@ -936,14 +950,11 @@ async def get_package_contents(package_id: str, ctx: Context) -> dict:
             if pkg is None:
                 return {"error": f"Package not found: {package_id}"}
 
-            # VOD titles in package
+            # VOD titles in package — ids from the membership index
+            title_ids = (await _get_package_index(db)).titles(pid)
             vod_q = await db.execute(
                 select(Title)
-                .join(PackageContent, PackageContent.content_id == Title.id)
-                .where(
-                    PackageContent.package_id == pid,
-                    PackageContent.content_type == "vod_title",
-                )
+                .where(Title.id.in_(title_ids))
                 .options(selectinload(Title.genres).selectinload(TitleGenre.genre))
                 .order_by(Title.title)
             )
@@ -1033,19 +1044,30 @@ async def search_schedule(
     query: str,
     ctx: Context,
     date: str = "today",
+    window: str = "all",
+    include_synopsis: bool = False,
     limit: int = 20,
 ) -> dict:
     """Search the EPG schedule by program title or series title across all channels.
 
     Args:
         query: Search keyword (matches program title and series_title)
-        date: Date in YYYY-MM-DD format or "today" (default: "today")
+        date: Date in YYYY-MM-DD format, "today" (default) or "any" to search
+            across days (combine with window to avoid scanning old history)
+        window: "all" (default), "upcoming" (airing or still to air) or
+            "catchup" (ended and still inside the channel's catch-up window)
+        include_synopsis: Also match program synopses (full-text)
         limit: Maximum results (default 20, max 100)
     """
     limit = min(max(1, limit), 100)
     session_factory = _get_session_factory(ctx)
 
-    if date == "today":
+    if window not in epg_service.SEARCH_WINDOWS:
+        return {"error": f"Invalid window: {window}. Use one of {', '.join(epg_service.SEARCH_WINDOWS)}."}
+
+    if date == "any":
+        day = None
+    elif date == "today":
         day = datetime.now(timezone.utc).date()
     else:
         try:
@@ -1055,21 +1077,23 @@ async def search_schedule(
 
     try:
         async with session_factory() as db:
-            day_start = datetime.combine(day, datetime.min.time()).replace(tzinfo=timezone.utc)
-            day_end = datetime.combine(day, datetime.max.time()).replace(tzinfo=timezone.utc)
-            pattern = f"%{query}%"
-
             stmt = (
                 select(ScheduleEntry)
                 .join(Channel, ScheduleEntry.channel_id == Channel.id)
-                .where(
-                    ScheduleEntry.start_time >= day_start,
-                    ScheduleEntry.start_time <= day_end,
-                    (ScheduleEntry.title.ilike(pattern) | ScheduleEntry.series_title.ilike(pattern)),
-                )
+                .where(epg_service.schedule_search_filter(query, include_synopsis))
                 .order_by(ScheduleEntry.start_time)
                 .limit(limit)
             )
+            if day is not None:
+                day_start = datetime.combine(day, datetime.min.time()).replace(tzinfo=timezone.utc)
+                day_end = datetime.combine(day, datetime.max.time()).replace(tzinfo=timezone.utc)
+                stmt = stmt.where(
+                    ScheduleEntry.start_time >= day_start,
+                    ScheduleEntry.start_time <= day_end,
+                )
+            window_filter = epg_service.search_window_filter(window, datetime.now(timezone.utc))
+            if window_filter is not None:
+                stmt = stmt.where(window_filter)
 
             result = await db.execute(stmt)
             entries = result.scalars().all()